@@ -1,23 +1,114 @@
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
 import os
 
-from .extensions import db, migrate, jwt, mail
-from .blueprints.auth.routes import auth_bp
-from .blueprints.jobs.routes import jobs_bp
-from .blueprints.applications.routes import applications_bp
-
+from .extensions import jwt
+from .database import init_database, init_migrations
+from .query_counter import init_query_counter
+from .metrics import init_metrics
+from .cache import init_response_cache
+from .events import init_events
+from .ratelimit import init_rate_limiter
 
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///db.sqlite3')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.getenv('SQLALCHEMY_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('SQLALCHEMY_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.getenv('SQLALCHEMY_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('SQLALCHEMY_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.getenv('SQLALCHEMY_POOL_PRE_PING', 'True').lower() == 'true',
+    }
+    SQLALCHEMY_REPLICA_URI = os.getenv('DATABASE_REPLICA_URL')  # GET requests read from here when set
+    # Applied to every SQLite connection; an empty value leaves SQLite's default
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'),
+        'mmap_size': os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)),
+        'foreign_keys': os.getenv('SQLITE_FOREIGN_KEYS', 'ON'),  # off by default in SQLite
+    }
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'super-secret-key')
+    EMAIL_VERIFICATION_SECRET = os.getenv('EMAIL_VERIFICATION_SECRET', JWT_SECRET_KEY)
+    EMAIL_VERIFICATION_TTL = int(os.getenv('EMAIL_VERIFICATION_TTL', 48 * 3600))  # seconds a link stays valid
+    EMAIL_VERIFICATION_RESEND_INTERVAL = int(os.getenv('EMAIL_VERIFICATION_RESEND_INTERVAL', 60))
     MAIL_SERVER = os.getenv('MAIL_SERVER')
     MAIL_PORT = int(os.getenv('MAIL_PORT', 587))
     MAIL_USERNAME = os.getenv('MAIL_USERNAME')
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
     MAIL_USE_TLS = os.getenv('MAIL_USE_TLS', 'True').lower() == 'true'
     MAIL_USE_SSL = os.getenv('MAIL_USE_SSL', 'False').lower() == 'true'
+    MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', os.getenv('MAIL_USERNAME'))
+    EMAIL_DISPATCHER = os.getenv('EMAIL_DISPATCHER', 'thread')  # thread, or worker for `flask outbox worker`
+    EMAIL_BATCH_SIZE = int(os.getenv('EMAIL_BATCH_SIZE', 50))
+    EMAIL_POLL_INTERVAL = float(os.getenv('EMAIL_POLL_INTERVAL', 2))
+    EMAIL_MAX_ATTEMPTS = int(os.getenv('EMAIL_MAX_ATTEMPTS', 6))
+    EMAIL_RETRY_BASE_SECONDS = int(os.getenv('EMAIL_RETRY_BASE_SECONDS', 30))
+    EMAIL_RETRY_MAX_SECONDS = int(os.getenv('EMAIL_RETRY_MAX_SECONDS', 3600))
+    EMAIL_CLAIM_SECONDS = int(os.getenv('EMAIL_CLAIM_SECONDS', 300))  # a claimed email is retried if its sender dies
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')  # any werkzeug method, e.g. pbkdf2:sha256:600000
+    PASSWORD_HASH_POOL_SIZE = int(os.getenv('PASSWORD_HASH_POOL_SIZE', os.cpu_count() or 1))  # 0 hashes inline
+    PASSWORD_HASH_QUEUE_FACTOR = int(os.getenv('PASSWORD_HASH_QUEUE_FACTOR', 4))
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 10000))
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 60))
+    SQLALCHEMY_QUERY_WARN_THRESHOLD = int(os.getenv('SQLALCHEMY_QUERY_WARN_THRESHOLD', 20))
+    JOBS_PAGE_SIZE = int(os.getenv('JOBS_PAGE_SIZE', 20))
+    JOBS_MAX_PAGE_SIZE = int(os.getenv('JOBS_MAX_PAGE_SIZE', 100))
+    JOBS_BULK_CHUNK_SIZE = int(os.getenv('JOBS_BULK_CHUNK_SIZE', 500))
+    # Cache-Control per endpoint for conditional GET responses
+    CACHE_CONTROL = {
+        'jobs.list_jobs': os.getenv('JOBS_LIST_CACHE_CONTROL', 'public, max-age=30'),
+        'jobs.get_job': os.getenv('JOBS_DETAIL_CACHE_CONTROL', 'public, max-age=60'),
+    }
+    INTERNAL_ENDPOINTS_ENABLED = os.getenv('INTERNAL_ENDPOINTS_ENABLED', 'False').lower() == 'true'
+    RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'memory')  # memory, redis or none
+    RESPONSE_CACHE_REDIS_URL = os.getenv('RESPONSE_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 2048))
+    # Invalidation in one process can't reach another's memory cache, so its entries live briefly
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 300 if RESPONSE_CACHE_BACKEND == 'redis' else 5))
+    SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'auto')  # auto, sqlite, postgresql or ilike
+    SEARCH_RANK_WINDOW = int(os.getenv('SEARCH_RANK_WINDOW', 1000))  # newest matches ranked by SQLite FTS, 0 ranks all
+    RECOMMENDATIONS_FEATURES = int(os.getenv('RECOMMENDATIONS_FEATURES', 1 << 18))  # hashed term slots
+    RECOMMENDATIONS_HISTORY = int(os.getenv('RECOMMENDATIONS_HISTORY', 50))  # recent applications profiled
+    RECOMMENDATIONS_QUERY_TERMS = int(os.getenv('RECOMMENDATIONS_QUERY_TERMS', 64))
+    RECOMMENDATIONS_SYNC_INTERVAL = float(os.getenv('RECOMMENDATIONS_SYNC_INTERVAL', 5))
+    RECOMMENDATIONS_SYNC_OVERLAP = float(os.getenv('RECOMMENDATIONS_SYNC_OVERLAP', 5))
+    OPEN_JOB_CACHE_SIZE = int(os.getenv('OPEN_JOB_CACHE_SIZE', 10000))
+    OPEN_JOB_CACHE_TTL = int(os.getenv('OPEN_JOB_CACHE_TTL', 5))
+    APPLICATION_INTAKE_MODE = os.getenv('APPLICATION_INTAKE_MODE', 'sync')  # sync, or batch for group commit
+    APPLICATION_BATCH_SIZE = int(os.getenv('APPLICATION_BATCH_SIZE', 100))
+    APPLICATION_BATCH_WAIT_MS = int(os.getenv('APPLICATION_BATCH_WAIT_MS', 5))
+    APPLICATION_BATCH_TIMEOUT = float(os.getenv('APPLICATION_BATCH_TIMEOUT', 5))
+    APPLICATIONS_BATCH_MAX_ITEMS = int(os.getenv('APPLICATIONS_BATCH_MAX_ITEMS', 1000))
+    APPLICATION_SYNC_OVERLAP = float(os.getenv('APPLICATION_SYNC_OVERLAP', 5))  # seconds re-read before a `since` cursor
+    APPLICATION_TOMBSTONE_TTL_DAYS = int(os.getenv('APPLICATION_TOMBSTONE_TTL_DAYS', 30))  # also the oldest usable cursor
+    ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', 90))  # closed jobs untouched this long are archived
+    ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', 500))  # jobs moved per transaction
+    EVENTS_BACKEND = os.getenv('EVENTS_BACKEND', 'memory')  # memory, redis (multi-worker) or none
+    EVENTS_REDIS_URL = os.getenv('EVENTS_REDIS_URL', 'redis://localhost:6379/0')
+    EVENTS_HISTORY = int(os.getenv('EVENTS_HISTORY', 100))  # recent events kept per company for resume
+    EVENTS_HEARTBEAT = float(os.getenv('EVENTS_HEARTBEAT', 15))  # seconds between keep-alive comments
+    EVENTS_QUEUE_SIZE = int(os.getenv('EVENTS_QUEUE_SIZE', 1000))  # undelivered events per stream
+    EVENTS_MAX_STREAMS = int(os.getenv('EVENTS_MAX_STREAMS', 100))  # open streams per process (one thread each), 0 = no cap
+    # Reverse proxies in front of the app whose X-Forwarded-For is trusted; 0 uses the socket address
+    PROXY_FIX_X_FOR = int(os.getenv('PROXY_FIX_X_FOR', 0))
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')  # memory (per process), redis (shared) or none
+    RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0')
+    RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000))  # buckets kept by the memory backend
+    # Token buckets per endpoint as (per client IP, per identity), e.g. '10/minute'; empty disables one
+    RATE_LIMITS = {
+        'login': (os.getenv('RATE_LIMIT_LOGIN_IP', '30/minute'), os.getenv('RATE_LIMIT_LOGIN_IDENTITY', '5/minute')),
+        'register': (os.getenv('RATE_LIMIT_REGISTER_IP', '10/hour'), os.getenv('RATE_LIMIT_REGISTER_IDENTITY', '3/hour')),
+        'apply': (os.getenv('RATE_LIMIT_APPLY_IP', '120/minute'), os.getenv('RATE_LIMIT_APPLY_IDENTITY', '30/minute')),
+        'create_job': (os.getenv('RATE_LIMIT_CREATE_JOB_IP', '60/minute'), os.getenv('RATE_LIMIT_CREATE_JOB_IDENTITY', '20/minute')),
+    }
+    # Served at /internal/metrics, which is only registered with INTERNAL_ENDPOINTS_ENABLED=true
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'False').lower() == 'true'
+    PROFILE_SAMPLE_RATE = int(os.getenv('PROFILE_SAMPLE_RATE', 0))  # profile 1 in N requests, 0 disables
+    PROFILE_BACKEND = os.getenv('PROFILE_BACKEND', 'cprofile')  # cprofile, or pyinstrument if installed
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
 
 
 def create_app():
@@ -25,14 +116,55 @@ def create_app():
 
     app = Flask(__name__)
     app.config.from_object(Config)
+    if app.config['PROXY_FIX_X_FOR']:
+        # request.remote_addr becomes the client's address, which the rate limiter keys on
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+
+    init_extensions(app)
+    register_blueprints(app)
+    register_commands(app)
+
+    return app
+
+
+# Models, blueprints and their dependencies are imported by the factory rather than by
+# `import app`, and alembic (via `flask db`) and flask_mail only when first used
+def init_extensions(app):
+    from .serializers import JSONProvider
+    from .outbox import init_outbox
 
-    db.init_app(app)
-    migrate.init_app(app, db)
+    app.json = JSONProvider(app)
+    init_database(app)
+    init_migrations(app)
     jwt.init_app(app)
-    mail.init_app(app)
+    init_query_counter(app)
+    init_metrics(app)
+    init_outbox(app)
+    init_response_cache(app)
+    init_events(app)
+    init_rate_limiter(app)
+
+
+def register_blueprints(app):
+    from .blueprints.auth.routes import auth_bp
+    from .blueprints.jobs.routes import jobs_bp
+    from .blueprints.applications.routes import applications_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
     app.register_blueprint(applications_bp, url_prefix='/api/applications')
+    if app.config['INTERNAL_ENDPOINTS_ENABLED']:
+        from .blueprints.internal.routes import internal_bp
+        app.register_blueprint(internal_bp, url_prefix='/internal')
 
-    return app
+
+def register_commands(app):
+    from .search import search_cli
+    from .blueprints.applications.counters import applications_cli
+    from .blueprints.auth.verification import users_cli
+    from .archive import archive_cli
+
+    app.cli.add_command(search_cli)
+    app.cli.add_command(applications_cli)
+    app.cli.add_command(users_cli)
+    app.cli.add_command(archive_cli)
@@ -0,0 +1,97 @@
+import datetime
+import time
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import delete, exists, insert, literal, select
+from app.extensions import db
+from app.models import Application, ArchivedApplication, ArchivedJob, Job, JobStatus
+from app import search, serializers
+from app.cache import response_cache
+from app.blueprints.applications import counters
+
+archive_cli = AppGroup('archive', help='Move closed jobs out of the hot tables.')
+
+JOB_COLUMNS = ['id', 'title', 'description', 'location', 'status', 'created_by', 'created_at', 'updated_at']
+APPLICATION_COLUMNS = ['id', 'applicant_id', 'job_id', 'resume_link', 'cover_letter', 'status', 'applied_at']
+
+
+def delete_jobs(job_ids):
+    # Jobs and every row that references them, one statement per table in the caller's
+    # transaction; applications are never loaded into the session
+    db.session.execute(delete(Application).where(Application.job_id.in_(job_ids)),
+                       execution_options={"synchronize_session": False})
+    counters.clear_jobs(job_ids)
+    search.remove_jobs(job_ids)
+    db.session.execute(delete(Job).where(Job.id.in_(job_ids)), execution_options={"synchronize_session": False})
+
+
+def delete_archived_jobs(job_ids):
+    db.session.execute(delete(ArchivedApplication).where(ArchivedApplication.job_id.in_(job_ids)),
+                       execution_options={"synchronize_session": False})
+    db.session.execute(delete(ArchivedJob).where(ArchivedJob.id.in_(job_ids)),
+                       execution_options={"synchronize_session": False})
+
+
+def archive_jobs(cutoff, batch_size):
+    # Moves closed jobs last updated before cutoff, with their applications, batch_size jobs per
+    # transaction. Returns (jobs, applications) moved.
+    eligible = (Job.status == JobStatus.CLOSED, Job.updated_at < cutoff)
+    moved_jobs = moved_applications = 0
+    while True:
+        ids = db.session.execute(
+            select(Job.id).where(*eligible).order_by(Job.updated_at).limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not ids:
+            break
+        archived_at = literal(datetime.datetime.utcnow(), db.DateTime)
+        # The copy re-checks eligibility: without row locks (SQLite) a job can be reopened
+        # between the read above and this first write
+        db.session.execute(insert(ArchivedJob).from_select(
+            JOB_COLUMNS + ['archived_at'],
+            select(*[getattr(Job, name) for name in JOB_COLUMNS], archived_at).where(Job.id.in_(ids), *eligible)
+        ))
+        ids = db.session.execute(select(ArchivedJob.id).where(ArchivedJob.id.in_(ids))).scalars().all()
+        result = db.session.execute(insert(ArchivedApplication).from_select(
+            APPLICATION_COLUMNS + ['archived_at'],
+            select(*[getattr(Application, name) for name in APPLICATION_COLUMNS], archived_at)
+            .where(Application.job_id.in_(ids))
+        ))
+        delete_jobs(ids)
+        db.session.commit()
+        moved_jobs += len(ids)
+        moved_applications += result.rowcount
+
+    # Reaches the web workers only through the redis backend; memory caches elsewhere expire on their own
+    cache = response_cache()
+    if moved_jobs and cache is not None:
+        cache.invalidate({f"jobs:status:{JobStatus.CLOSED.value}"})
+    return moved_jobs, moved_applications
+
+
+def archived_job(job_id):
+    return db.session.query(*serializers.ARCHIVED_JOB.select()).filter(ArchivedJob.id == job_id).first()
+
+
+def is_archived_application(application_id):
+    return db.session.query(exists().where(ArchivedApplication.id == application_id)).scalar()
+
+
+@archive_cli.command('jobs')
+@click.option('--older-than-days', type=int, default=None,
+              help='Archive closed jobs not updated for this many days (default ARCHIVE_AFTER_DAYS).')
+@click.option('--batch-size', type=int, default=None, help='Jobs moved per transaction (default ARCHIVE_BATCH_SIZE).')
+@click.option('--interval', type=int, default=0, help='Repeat every N seconds instead of running once.')
+def archive_jobs_command(older_than_days, batch_size, interval):
+    """Move closed jobs and their applications into the archive tables."""
+    if older_than_days is None:
+        older_than_days = current_app.config['ARCHIVE_AFTER_DAYS']
+    batch_size = batch_size or current_app.config['ARCHIVE_BATCH_SIZE']
+    while True:
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=older_than_days)
+        jobs, applications = archive_jobs(cutoff, batch_size)
+        click.echo(f"Archived {jobs} jobs and {applications} applications.")
+        if not interval:
+            return
+        time.sleep(interval)
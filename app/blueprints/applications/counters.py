@@ -0,0 +1,70 @@
+import click
+from flask.cli import AppGroup
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from app.extensions import db
+from app.models import Application, Job, JobApplicationCount
+
+applications_cli = AppGroup('applications', help='Maintain application data.')
+
+UPSERT_DIALECTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+def bump(job_id, company_id, status, delta):
+    # Incremental counter update in the caller's transaction
+    upsert = UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    if upsert is not None:
+        stmt = upsert(JobApplicationCount).values(
+            job_id=job_id, status=status, company_id=company_id, count=delta
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['job_id', 'status'],
+            set_={"count": JobApplicationCount.count + delta}
+        )
+        db.session.execute(stmt)
+        return
+
+    result = db.session.execute(
+        update(JobApplicationCount)
+        .where(JobApplicationCount.job_id == job_id, JobApplicationCount.status == status)
+        .values(count=JobApplicationCount.count + delta)
+    )
+    if result.rowcount == 0:
+        db.session.execute(insert(JobApplicationCount).values(
+            job_id=job_id, status=status, company_id=company_id, count=delta
+        ))
+
+
+def move(job_id, company_id, old_status, new_status):
+    if old_status == new_status:
+        return
+    bump(job_id, company_id, old_status, -1)
+    bump(job_id, company_id, new_status, 1)
+
+
+def clear_jobs(job_ids):
+    db.session.execute(delete(JobApplicationCount).where(JobApplicationCount.job_id.in_(job_ids)))
+
+
+def rebuild():
+    db.session.execute(delete(JobApplicationCount))
+    db.session.execute(
+        insert(JobApplicationCount).from_select(
+            ['job_id', 'status', 'company_id', 'count'],
+            select(Application.job_id, Application.status, Job.created_by, func.count())
+            .join(Job, Application.job_id == Job.id)
+            .group_by(Application.job_id, Application.status, Job.created_by)
+        )
+    )
+    db.session.commit()
+
+
+@applications_cli.command('rebuild-counts')
+def rebuild_counts_command():
+    """Recompute job_application_counts from the applications table."""
+    rebuild()
+    total = db.session.query(func.coalesce(func.sum(JobApplicationCount.count), 0)).scalar()
+    click.echo(f"Rebuilt application counts ({total} applications).")
@@ -0,0 +1,221 @@
+import datetime
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, TimeoutError
+from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from app.cache import TTLCache
+from app.extensions import db
+from app.models import Application, ApplicationStatus, Job, JobStatus, generate_uuid
+from app.blueprints.applications import counters
+
+logger = logging.getLogger(__name__)
+
+_batcher_lock = threading.Lock()
+
+
+class IntakeUnavailable(Exception):
+    pass
+
+
+class JobUnavailable(Exception):
+    pass
+
+
+def open_jobs_cache() -> TTLCache:
+    cache = current_app.extensions.get('open_jobs')
+    if cache is None:
+        cache = current_app.extensions['open_jobs'] = TTLCache(
+            maxsize=current_app.config['OPEN_JOB_CACHE_SIZE'],
+            ttl=current_app.config['OPEN_JOB_CACHE_TTL']
+        )
+    return cache
+
+
+def open_job(job_id):
+    # (job_id, company_id) for jobs open to applications, else None. Misses are cached too, so a
+    # burst against a closed or unknown id doesn't reach the database either.
+    cache = open_jobs_cache()
+    job = cache.get(job_id, False)
+    if job is False:
+        row = db.session.query(Job.id, Job.created_by).filter(
+            Job.id == job_id, Job.status == JobStatus.OPEN
+        ).first()
+        job = tuple(row) if row else None
+        cache.set(job_id, job)
+    return job
+
+
+def forget_job(*job_ids):
+    cache = current_app.extensions.get('open_jobs')
+    if cache is not None:
+        for job_id in job_ids:
+            cache.delete(job_id)
+
+
+def insert_applications(rows):
+    # rows: [(application values, company_id)]. Inserts them in the caller's transaction and bumps
+    # the counters; duplicates are skipped by unique_application_per_job instead of a pre-read.
+    # Returns the ids that were inserted.
+    upsert = counters.UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    if upsert is not None:
+        stmt = upsert(Application).values([values for values, _ in rows]).on_conflict_do_nothing(
+            index_elements=['applicant_id', 'job_id']
+        ).returning(Application.id)
+        inserted = set(db.session.execute(stmt).scalars())
+    else:
+        inserted = set()
+        for values, _ in rows:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(Application).values(values))
+                inserted.add(values['id'])
+            except IntegrityError:
+                pass
+
+    per_job = Counter((values['job_id'], company_id) for values, company_id in rows if values['id'] in inserted)
+    for (job_id, company_id), count in per_job.items():
+        counters.bump(job_id, company_id, ApplicationStatus.APPLIED, count)
+    return inserted
+
+
+def application_values(applicant_id, job_id, resume_link, cover_letter):
+    now = datetime.datetime.utcnow()
+    return {
+        "id": generate_uuid(),
+        "applicant_id": applicant_id,
+        "job_id": job_id,
+        "status": ApplicationStatus.APPLIED,
+        "resume_link": resume_link,
+        "cover_letter": cover_letter,
+        "applied_at": now,
+        "updated_at": now,
+    }
+
+
+def submit(applicant_id, job, resume_link, cover_letter):
+    # Returns the new application id, or None if the applicant already applied to this job
+    job_id, company_id = job
+    values = application_values(applicant_id, job_id, resume_link, cover_letter)
+
+    if current_app.config['APPLICATION_INTAKE_MODE'] == 'batch':
+        future = batcher(current_app._get_current_object()).submit(values, company_id)
+        timeout = current_app.config['APPLICATION_BATCH_TIMEOUT']
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            # Still queued: withdrawn, so the writer skips it and a retry can't end up applied twice.
+            # Already being written: that write is given one more timeout to finish.
+            if not future.cancel():
+                try:
+                    return future.result(timeout=timeout)
+                except TimeoutError:
+                    pass
+            raise IntakeUnavailable(f"Not written within {timeout}s")
+        except JobUnavailable:
+            raise
+        except Exception as e:
+            raise IntakeUnavailable(str(e))
+
+    return write_one(values, company_id)
+
+
+def write_one(values, company_id):
+    # Inserts and commits a single application; an IntegrityError left after duplicates are skipped
+    # is a foreign key failure: the job was deleted after it was cached
+    try:
+        inserted = insert_applications([(values, company_id)])
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        forget_job(values["job_id"])
+        raise JobUnavailable(values["job_id"])
+    return values["id"] if values["id"] in inserted else None
+
+
+class ApplicationBatcher:
+    # Group commit: request threads enqueue and wait, one thread writes whatever has queued up as
+    # a single multi-row INSERT and commit, then resolves each request's future
+    def __init__(self, app):
+        self.app = app
+        self.queue = queue.Queue()
+        self.batch_size = app.config['APPLICATION_BATCH_SIZE']
+        self.max_wait = app.config['APPLICATION_BATCH_WAIT_MS'] / 1000
+        self.thread = threading.Thread(target=self.run, name='application-intake', daemon=True)
+        self.thread.start()
+
+    def submit(self, values, company_id):
+        future = Future()
+        self.queue.put((values, company_id, future))
+        return future
+
+    def next_batch(self):
+        # Requests withdrawn by a timed-out submit() are dropped here, the rest can't be cancelled
+        # any more
+        batch = []
+        while not batch:
+            batch = self.take(self.queue.get())
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch += self.take(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    @staticmethod
+    def take(item):
+        return [item] if item[2].set_running_or_notify_cancel() else []
+
+    def run(self):
+        with self.app.app_context():
+            while True:
+                batch = self.next_batch()
+                try:
+                    self.write(batch)
+                except Exception as e:
+                    # Never lets the thread die: every later submit() would wait out its timeout
+                    logger.exception("Application batch of %d failed", len(batch))
+                    for _, _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                finally:
+                    db.session.remove()
+
+    def write(self, batch):
+        try:
+            inserted = insert_applications([(values, company_id) for values, company_id, _ in batch])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            if len(batch) == 1:
+                raise
+            # One bad row (a job deleted since it was cached, a value the database rejects) must not
+            # fail the others: each row is retried on its own and only the failing ones get the error
+            logger.warning("Application batch of %d failed, retrying row by row", len(batch), exc_info=True)
+            for values, company_id, future in batch:
+                try:
+                    future.set_result(write_one(values, company_id))
+                except Exception as e:
+                    db.session.rollback()
+                    future.set_exception(e)
+            return
+        for values, _, future in batch:
+            future.set_result(values["id"] if values["id"] in inserted else None)
+
+
+def batcher(app):
+    batcher = app.extensions.get('application_batcher')
+    if batcher is None:
+        with _batcher_lock:
+            batcher = app.extensions.get('application_batcher')
+            if batcher is None:
+                batcher = app.extensions['application_batcher'] = ApplicationBatcher(app)
+    return batcher
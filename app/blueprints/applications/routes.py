@@ -1,14 +1,21 @@
-from flask import Blueprint, request, jsonify
+from collections import Counter
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import update
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import Application, Job, User, ApplicationStatus
+from app.models import (Application, ApplicationTombstone, ArchivedApplication, ArchivedJob, Job, User,
+                        ApplicationStatus, JobApplicationCount, parse_uuid)
 from app.extensions import db
+from app import archive, events, serializers
+from app.ratelimit import rate_limit
 from app.blueprints.auth.routes import role_required
+from app.blueprints.applications import counters, intake, sync
 
 applications_bp = Blueprint('applications', __name__, url_prefix='/api/applications')
 
 
 @applications_bp.route('', methods=['POST'])
 @role_required(['applicant'])
+@rate_limit('apply')
 def apply_job():
     data = request.get_json()
     if not data:
@@ -21,78 +28,240 @@ def apply_job():
     if not job_id or not resume_link:
         return jsonify({"error": "job_id and resume_link are required"}), 400
 
-    job = Job.query.get(job_id)
-    if not job or job.status != JobStatus.OPEN:
+    job = intake.open_job(job_id)
+    if not job:
         return jsonify({"error": "Job not found or not open for applications"}), 404
 
     user_id = get_jwt_identity()
 
-    # Check if already applied to this job
-    existing_app = Application.query.filter_by(applicant_id=user_id, job_id=job_id).first()
-    if existing_app:
+    # Duplicates are rejected by unique_application_per_job at insert time, not by a pre-read
+    try:
+        application_id = intake.submit(user_id, job, resume_link, cover_letter)
+    except intake.JobUnavailable:
+        return jsonify({"error": "Job not found or not open for applications"}), 404
+    except intake.IntakeUnavailable:
+        return jsonify({"error": "Could not submit application, please retry"}), 503
+    if application_id is None:
         return jsonify({"error": "Already applied to this job"}), 400
 
-    application = Application(
-        applicant_id=user_id,
-        job_id=job_id,
-        resume_link=resume_link,
-        cover_letter=cover_letter
-    )
-
-    db.session.add(application)
-    db.session.commit()
-
-    return jsonify({"message": "Application submitted", "application_id": application.id}), 201
+    job_id, company_id = job
+    events.publish(company_id, 'application-created', application_id=application_id, job_id=job_id,
+                   applicant_id=user_id, status=ApplicationStatus.APPLIED.value)
+    return jsonify({"message": "Application submitted", "application_id": application_id}), 201
 
 
 @applications_bp.route('/me', methods=['GET'])
 @role_required(['applicant'])
 def my_applications():
+    # Full list, or with `since=<cursor>` only what changed after it: one range probe each on
+    # (applicant_id, updated_at) and the tombstones. Archived applications never change.
     user_id = get_jwt_identity()
-    applications = Application.query.filter_by(applicant_id=user_id).all()
-
-    result = []
-    for app in applications:
-        result.append({
-            "id": app.id,
-            "job_id": app.job_id,
-            "job_title": app.job.title,
-            "status": app.status.value,
-            "applied_at": app.applied_at.isoformat(),
-            "resume_link": app.resume_link,
-            "cover_letter": app.cover_letter
-        })
-
-    return jsonify(result)
+    since = request.args.get('since')
+    try:
+        after = sync.changed_after(since) if since is not None else None
+    except sync.InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
+    except sync.CursorExpired:
+        return jsonify({"error": "Cursor expired, fetch the full list again"}), 410
+    cursor = sync.new_cursor()
+
+    # One joined query instead of a lazy Job load per application
+    query = db.session.query(*serializers.APPLICANT_APPLICATION.select()).join(
+        Job, Application.job_id == Job.id
+    ).filter(Application.applicant_id == user_id)
+
+    if after is not None:
+        applications = query.filter(Application.updated_at > after).all()
+        deleted = sync.deleted_since(after, ApplicationTombstone.applicant_id == user_id)
+        return jsonify({"applications": serializers.APPLICANT_APPLICATION.many(applications),
+                        "deleted": deleted, "next_cursor": cursor})
+
+    applications = query.all()
+    # Applications to archived jobs follow, from an index probe on the archive
+    archived = db.session.query(*serializers.ARCHIVED_APPLICANT_APPLICATION.select()).join(
+        ArchivedJob, ArchivedApplication.job_id == ArchivedJob.id
+    ).filter(ArchivedApplication.applicant_id == user_id).all()
+
+    response = jsonify(serializers.APPLICANT_APPLICATION.many(applications)
+                       + serializers.ARCHIVED_APPLICANT_APPLICATION.many(archived))
+    response.headers['X-Sync-Cursor'] = cursor
+    return response
 
 
 @applications_bp.route('/job/<job_id>', methods=['GET'])
 @role_required(['company'])
 def view_applications_for_job(job_id):
     user_id = get_jwt_identity()
-    job = Job.query.get(job_id)
-
-    if not job:
+    since = request.args.get('since')
+    try:
+        after = sync.changed_after(since) if since is not None else None
+    except sync.InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
+    except sync.CursorExpired:
+        return jsonify({"error": "Cursor expired, fetch the full list again"}), 410
+    cursor = sync.new_cursor()
+
+    job = db.session.query(Job.created_by).filter(Job.id == job_id).first()
+    archived = archive.archived_job(job_id) if not job else None
+
+    if not job and not archived:
         return jsonify({"error": "Job not found"}), 404
 
-    if job.created_by != user_id:
+    if (job or archived).created_by != user_id:
         return jsonify({"error": "Unauthorized to view applications for this job"}), 403
 
-    applications = Application.query.filter_by(job_id=job_id).all()
-
-    result = []
-    for app in applications:
-        result.append({
-            "id": app.id,
-            "applicant_id": app.applicant_id,
-            "applicant_name": app.applicant.name,
-            "status": app.status.value,
-            "applied_at": app.applied_at.isoformat(),
-            "resume_link": app.resume_link,
-            "cover_letter": app.cover_letter
+    if archived:
+        if after is not None:
+            return jsonify({"applications": [], "deleted": [], "next_cursor": cursor})
+        schema, model = serializers.ARCHIVED_JOB_APPLICATION, ArchivedApplication
+    else:
+        schema, model = serializers.JOB_APPLICATION, Application
+
+    # One joined query instead of a lazy User load per application
+    query = db.session.query(*schema.select()).join(
+        User, model.applicant_id == User.id
+    ).filter(model.job_id == job_id)
+
+    if after is not None:
+        applications = query.filter(Application.updated_at > after).all()
+        deleted = sync.deleted_since(after, ApplicationTombstone.job_id == job_id)
+        return jsonify({"applications": schema.many(applications), "deleted": deleted, "next_cursor": cursor})
+
+    response = jsonify(schema.many(query.all()))
+    response.headers['X-Sync-Cursor'] = cursor
+    return response
+
+
+@applications_bp.route('/stats', methods=['GET'])
+@role_required(['company'])
+def application_stats():
+    user_id = get_jwt_identity()
+    # Served from the denormalized counters: one indexed read on company_id
+    rows = db.session.query(
+        JobApplicationCount.job_id,
+        Job.title,
+        JobApplicationCount.status,
+        JobApplicationCount.count
+    ).join(Job, JobApplicationCount.job_id == Job.id).filter(
+        JobApplicationCount.company_id == user_id
+    ).all()
+
+    jobs = {}
+    for row in rows:
+        job = jobs.setdefault(row.job_id, {
+            "job_id": row.job_id,
+            "job_title": row.title,
+            "total": 0,
+            "counts": {s.value: 0 for s in ApplicationStatus}
         })
+        job["counts"][row.status.value] = row.count
+        job["total"] += row.count
+
+    return jsonify(list(jobs.values()))
+
+
+@applications_bp.route('/stream', methods=['GET'])
+@role_required(['company'])
+def stream_events():
+    # Server-sent events for the company's jobs: application-created, status-changed and
+    # application-withdrawn. Browsers resume with Last-Event-ID; `job_id` narrows to one job.
+    broker = events.broker()
+    if broker is None:
+        return jsonify({"error": "Event stream is not available"}), 503
+
+    # Each open stream holds a server thread, so past EVENTS_MAX_STREAMS the client is turned away
+    # rather than starving regular requests
+    subscription = broker.subscribe(get_jwt_identity())
+    if subscription is None:
+        return jsonify({"error": "Too many open event streams, please retry"}), 503
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    body = events.stream(broker, subscription, last_event_id, current_app.config['EVENTS_HEARTBEAT'],
+                         job_id=request.args.get('job_id'))
+    response = current_app.response_class(body, mimetype='text/event-stream')
+    # Also releases the slot when the body is closed before it was ever iterated
+    response.call_on_close(lambda: broker.unsubscribe(subscription))
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # nginx: pass events through unbuffered
+    return response
+
+
+@applications_bp.route('/batch', methods=['PATCH'])
+@role_required(['company'])
+def update_application_statuses():
+    # {"updates": [{"application_id": ..., "status": ...}, ...]}
+    data = request.get_json()
+    updates = data.get('updates') if isinstance(data, dict) else None
+    if not isinstance(updates, list) or not updates:
+        return jsonify({"error": "updates must be a non-empty list"}), 400
+    max_items = current_app.config['APPLICATIONS_BATCH_MAX_ITEMS']
+    if len(updates) > max_items:
+        return jsonify({"error": f"At most {max_items} updates per request"}), 400
+
+    statuses = {s.value for s in ApplicationStatus}
+    results = [None] * len(updates)
+    requested = {}  # canonical application id -> (index, status, id as sent)
+    for index, item in enumerate(updates):
+        application_id = item.get('application_id') if isinstance(item, dict) else None
+        status = item.get('status') if isinstance(item, dict) else None
+        # Keyed like the database compares ids, so case or hyphenation variants of one id are one item
+        key = parse_uuid(application_id) if isinstance(application_id, str) else None
+        if not application_id or not status:
+            results[index] = {"error": "application_id and status are required"}
+        elif not isinstance(application_id, str) or not isinstance(status, str):
+            results[index] = {"error": "application_id and status must be strings"}
+        elif status not in statuses:
+            results[index] = {"application_id": application_id, "error": "Invalid status"}
+        elif key is None:
+            results[index] = {"application_id": application_id, "error": "Application not found"}
+        elif str(key) in requested:
+            results[index] = {"application_id": application_id, "error": "Duplicate application_id in batch"}
+        else:
+            requested[str(key)] = (index, ApplicationStatus(status), application_id)
+
+    # Ownership and current status of every item in one joined read; rows stay locked until commit
+    # where the database supports it, so the counter deltas match what the UPDATEs change
+    user_id = get_jwt_identity()
+    rows = db.session.query(Application.id, Application.job_id, Application.status, Job.created_by).join(
+        Job, Application.job_id == Job.id
+    ).filter(Application.id.in_(list(requested))).with_for_update(of=Application).all() if requested else []
+    found = {row.id: row for row in rows}
+
+    targets = {}  # new status -> application ids
+    deltas = Counter()  # (job_id, company_id, status) -> change in count
+    for application_id, (index, status, sent_id) in requested.items():
+        row = found.get(application_id)
+        if row is None:
+            results[index] = {"application_id": sent_id, "error": "Application not found"}
+            continue
+        if row.created_by != user_id:
+            results[index] = {"application_id": sent_id, "error": "Unauthorized to update this application"}
+            continue
+        results[index] = {"application_id": sent_id, "status": status.value}
+        if row.status != status:
+            targets.setdefault(status, []).append(application_id)
+            deltas[(row.job_id, row.created_by, row.status)] -= 1
+            deltas[(row.job_id, row.created_by, status)] += 1
+
+    # One set-based UPDATE per target status
+    for status, application_ids in targets.items():
+        db.session.execute(
+            update(Application).where(Application.id.in_(application_ids)).values(status=status),
+            execution_options={"synchronize_session": False}
+        )
+    for (job_id, company_id, status), delta in deltas.items():
+        if delta:
+            counters.bump(job_id, company_id, status, delta)
+    db.session.commit()
+
+    for status, application_ids in targets.items():
+        for application_id in application_ids:
+            row = found[application_id]
+            events.publish(user_id, 'status-changed', application_id=application_id, job_id=row.job_id,
+                           status=status.value, previous_status=row.status.value)
 
-    return jsonify(result)
+    failed = sum(1 for result in results if "error" in result)
+    return jsonify({"updated": len(results) - failed, "failed": failed, "results": results})
 
 
 @applications_bp.route('/<application_id>', methods=['PUT'])
@@ -108,14 +277,21 @@ def update_application_status(application_id):
 
     application = Application.query.get(application_id)
     if not application:
+        if archive.is_archived_application(application_id):
+            return jsonify({"error": "Archived applications cannot be changed"}), 409
         return jsonify({"error": "Application not found"}), 404
 
     user_id = get_jwt_identity()
     if application.job.created_by != user_id:
         return jsonify({"error": "Unauthorized to update this application"}), 403
 
+    old_status, job_id = application.status, application.job_id
     application.status = ApplicationStatus(new_status)
+    counters.move(job_id, application.job.created_by, old_status, application.status)
     db.session.commit()
+    if old_status.value != new_status:
+        events.publish(user_id, 'status-changed', application_id=application_id, job_id=job_id,
+                       status=new_status, previous_status=old_status.value)
 
     return jsonify({"message": "Application status updated"})
 
@@ -127,12 +303,18 @@ def withdraw_application(application_id):
     application = Application.query.get(application_id)
 
     if not application:
+        if archive.is_archived_application(application_id):
+            return jsonify({"error": "Archived applications cannot be changed"}), 409
         return jsonify({"error": "Application not found"}), 404
 
     if application.applicant_id != user_id:
         return jsonify({"error": "Unauthorized to withdraw this application"}), 403
 
+    job_id, company_id = application.job_id, application.job.created_by
+    counters.bump(job_id, company_id, application.status, -1)
+    sync.record_deletions(Application, Application.id == application_id)
     db.session.delete(application)
     db.session.commit()
+    events.publish(company_id, 'application-withdrawn', application_id=application_id, job_id=job_id)
 
     return jsonify({"message": "Application withdrawn successfully"})
@@ -0,0 +1,94 @@
+import base64
+import datetime
+import time
+import click
+from flask import current_app
+from sqlalchemy import delete, insert, literal, select
+from app.extensions import db
+from app.models import ApplicationTombstone
+from app.blueprints.applications.counters import applications_cli
+
+# Delta sync for application lists: a client keeps the cursor from its last response and asks
+# for rows updated, and applications deleted, after it.
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorExpired(Exception):
+    pass
+
+
+def encode_cursor(moment):
+    return base64.urlsafe_b64encode(moment.isoformat().encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        return datetime.datetime.fromisoformat(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode())
+    except (ValueError, TypeError):
+        return None
+
+
+def new_cursor():
+    # Taken before the rows are read, so anything committed meanwhile is in the next delta
+    return encode_cursor(datetime.datetime.utcnow())
+
+
+def changed_after(token):
+    # Lower bound for updated_at / deleted_at given a `since` cursor. Rows are re-read from a
+    # little before the cursor, for transactions that committed after the previous response was
+    # built; clients apply changes by id, so a repeat is harmless. Cursors older than the
+    # tombstone retention could miss deletions and are refused.
+    since = decode_cursor(token)
+    if since is None:
+        raise InvalidCursor(token)
+    config = current_app.config
+    if since < datetime.datetime.utcnow() - datetime.timedelta(days=config['APPLICATION_TOMBSTONE_TTL_DAYS']):
+        raise CursorExpired(token)
+    return since - datetime.timedelta(seconds=config['APPLICATION_SYNC_OVERLAP'])
+
+
+def deleted_since(after, *criteria):
+    return db.session.execute(
+        select(ApplicationTombstone.id).where(*criteria, ApplicationTombstone.deleted_at > after)
+    ).scalars().all()
+
+
+def record_deletions(model, *criteria):
+    # Tombstones for the rows of `model` (applications or their archive) matching criteria, set-based
+    # in the caller's transaction; call before deleting them
+    deleted_at = literal(datetime.datetime.utcnow(), db.DateTime)
+    db.session.execute(insert(ApplicationTombstone).from_select(
+        ['id', 'applicant_id', 'job_id', 'deleted_at'],
+        select(model.id, model.applicant_id, model.job_id, deleted_at).where(*criteria)
+    ))
+
+
+def purge_tombstones(cutoff, batch_size):
+    purged = 0
+    while True:
+        ids = db.session.execute(
+            select(ApplicationTombstone.id).where(ApplicationTombstone.deleted_at < cutoff).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return purged
+        db.session.execute(delete(ApplicationTombstone).where(ApplicationTombstone.id.in_(ids)),
+                           execution_options={"synchronize_session": False})
+        db.session.commit()
+        purged += len(ids)
+
+
+@applications_cli.command('purge-tombstones')
+@click.option('--batch-size', type=int, default=1000, help='Tombstones deleted per transaction.')
+@click.option('--interval', type=int, default=0, help='Repeat every N seconds instead of running once.')
+def purge_tombstones_command(batch_size, interval):
+    """Delete tombstones older than APPLICATION_TOMBSTONE_TTL_DAYS."""
+    while True:
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=current_app.config['APPLICATION_TOMBSTONE_TTL_DAYS'])
+        purged = purge_tombstones(cutoff, batch_size)
+        click.echo(f"Purged {purged} tombstones.")
+        if not interval:
+            return
+        time.sleep(interval)
@@ -1,15 +1,19 @@
-import uuid
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from flask_mail import Message
-from app.extensions import db, mail
-from app.models import User, UserRole
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import update
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt
+from app.extensions import db
+from app.database import use_primary
+from app.outbox import enqueue_email
+from app.ratelimit import rate_limit, request_email
+from app.models import User, UserRole, generate_uuid
+from app.blueprints.auth import verification
+from app.blueprints.auth.utils import get_cached_user, invalidate_user, needs_rehash, hash_password
 from functools import wraps
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/register', methods=['POST'])
+@rate_limit('register', identity=request_email)
 def register():
     data = request.get_json()
     if not data:
@@ -30,42 +34,67 @@ def register():
     if User.query.filter_by(email=email).first():
         return jsonify({"error": "Email already registered"}), 400
 
-    # Create user and hash password
-    user = User(name=name, email=email, role=UserRole(role))
+    # Create user and hash password; the id is needed up front for the verification token
+    user = User(id=generate_uuid(), name=name, email=email, role=UserRole(role))
     user.set_password(password)
-
-    # Generate email verification token
-    user.email_verification_token = str(uuid.uuid4())
+    user.token_expiration = verification.expiry()
 
     db.session.add(user)
-    db.session.commit()
 
-    # Send verification email
-    verification_url = f"{request.host_url}api/auth/verify-email/{user.email_verification_token}"
-    try:
-        send_verification_email(user.email, verification_url)
-    except Exception as e:
-        current_app.logger.error(f"Failed to send verification email: {e}")
-        # optionally rollback or handle error
+    # Queue the verification email in the same transaction; the outbox dispatcher sends it
+    send_verification_email(user.email, verification_url(user.id))
+
+    db.session.commit()
 
     return jsonify({"message": "User registered. Please check your email to verify your account."}), 201
 
 
 @auth_bp.route('/verify-email/<token>', methods=['GET'])
+@use_primary
 def verify_email(token):
-    user = User.query.filter_by(email_verification_token=token).first()
-    if not user:
+    # Signed tokens validate without a lookup; unsigned ones are links sent before the switch
+    user_id = verification.load_token(token) or verification.legacy_token_user(token)
+    if not user_id or not verification.mark_verified(user_id):
         return jsonify({"error": "Invalid or expired token"}), 400
 
-    user.is_verified = True
-    user.email_verification_token = None
-
-    db.session.commit()
+    invalidate_user(user_id)
 
     return jsonify({"message": "Email verified successfully. You can now log in."})
 
 
+@auth_bp.route('/resend-verification', methods=['POST'])
+def resend_verification():
+    data = request.get_json()
+    email = data.get('email') if data else None
+    if not email:
+        return jsonify({"error": "Missing email"}), 400
+
+    user = User.query.filter_by(email=email).first()
+    if user and not user.is_verified:
+        wait = verification.resend_wait(user)
+        if wait == 0:
+            # Conditional on the value just read, so concurrent resends can't both get through
+            claimed = db.session.execute(
+                update(User).where(
+                    User.id == user.id, User.token_expiration.is_not_distinct_from(user.token_expiration)
+                ).values(token_expiration=verification.expiry()),
+                execution_options={"synchronize_session": False}
+            ).rowcount
+            wait = 0 if claimed else current_app.config['EMAIL_VERIFICATION_RESEND_INTERVAL']
+        if wait:
+            db.session.rollback()
+            return jsonify({"error": "Verification email already sent, try again later"}), 429, {
+                "Retry-After": str(wait)
+            }
+        send_verification_email(user.email, verification_url(user.id))
+        db.session.commit()
+
+    # Same answer whether or not the address is registered
+    return jsonify({"message": "If this account needs verification, a new email is on its way."})
+
+
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit('login', identity=request_email)
 def login():
     data = request.get_json()
     if not data:
@@ -85,31 +114,39 @@ def login():
     if not user.is_verified:
         return jsonify({"error": "Email not verified"}), 403
 
-    access_token = create_access_token(identity=user.id)
+    # Upgrade hashes created with an older algorithm or cost while we have the plaintext
+    if needs_rehash(user.password):
+        user.password = hash_password(password)
+        db.session.commit()
+
+    # Role and verification state travel in the token so role_required needs no lookup
+    access_token = create_access_token(
+        identity=user.id,
+        additional_claims={"role": user.role.value, "is_verified": user.is_verified}
+    )
     return jsonify({"access_token": access_token})
 
 
+def verification_url(user_id):
+    return f"{request.host_url}api/auth/verify-email/{verification.make_token(user_id)}"
+
+
 def send_verification_email(to_email, verification_url):
-    msg = Message("Verify your email", recipients=[to_email])
-    msg.body = f"Click the link to verify your email: {verification_url}"
-    mail.send(msg)
+    enqueue_email(
+        to_email,
+        "Verify your email",
+        f"Click the link to verify your email: {verification_url}"
+    )
 
     
 @auth_bp.route('/me', methods=['GET'])
 @jwt_required()
 def profile():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_cached_user(get_jwt_identity())
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    return jsonify({
-        "id": user.id,
-        "name": user.name,
-        "email": user.email,
-        "role": user.role.value,
-        "is_verified": user.is_verified
-    })
+    return jsonify(user)
 
 
 def role_required(allowed_roles):
@@ -117,9 +154,12 @@ def role_required(allowed_roles):
         @wraps(fn)
         @jwt_required()
         def wrapper(*args, **kwargs):
-            user_id = get_jwt_identity()
-            user = User.query.get(user_id)
-            if not user or user.role.value not in allowed_roles:
+            role = get_jwt().get('role')
+            if role is None:
+                # Tokens issued before the role claim existed
+                user = get_cached_user(get_jwt_identity())
+                role = user["role"] if user else None
+            if role not in allowed_roles:
                 return jsonify({"error": "Unauthorized access"}), 403
             return fn(*args, **kwargs)
         return wrapper
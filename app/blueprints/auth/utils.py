@@ -1,7 +1,81 @@
+import functools
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
 from werkzeug.security import generate_password_hash, check_password_hash
+from app.cache import TTLCache
+from app.extensions import db
+from app.metrics import timed
 
-def hash_password(password: str) -> str:
-    return generate_password_hash(password)
+_pool = None
+_pool_size = None
+_pool_slots = None
+_pool_lock = threading.Lock()
+
+
+def hashing_pool():
+    # Bounded process pool so slow hashes never run on (or pile up behind) request threads
+    global _pool, _pool_size, _pool_slots
+    size = current_app.config['PASSWORD_HASH_POOL_SIZE']
+    if size <= 0:
+        return None, None
+    with _pool_lock:
+        if _pool is None or _pool_size != size:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=size)
+            _pool_size = size
+            _pool_slots = threading.BoundedSemaphore(size * current_app.config['PASSWORD_HASH_QUEUE_FACTOR'])
+        return _pool, _pool_slots
+
+def run_hash(fn, *args):
+    pool, slots = hashing_pool()
+    with timed('password_hash'):
+        if pool is None:
+            return fn(*args)
+        with slots:
+            return pool.submit(fn, *args).result()
+
+def hash_password(password: str, method: str = None) -> str:
+    method = method or current_app.config['PASSWORD_HASH_METHOD']
+    return run_hash(generate_password_hash, password, method)
 
 def verify_password(hash: str, password: str) -> bool:
-    return check_password_hash(hash, password)
\ No newline at end of file
+    return run_hash(check_password_hash, hash, password)
+
+@functools.lru_cache(maxsize=8)
+def method_parameters(method: str) -> str:
+    # Werkzeug fills in default cost parameters, e.g. 'scrypt' -> 'scrypt:32768:8:1'
+    return generate_password_hash('', method).split('$', 1)[0]
+
+def needs_rehash(hash: str) -> bool:
+    stored = hash.split('$', 1)[0]
+    return stored != method_parameters(current_app.config['PASSWORD_HASH_METHOD'])
+
+
+def user_cache() -> TTLCache:
+    cache = current_app.extensions.get('user_cache')
+    if cache is None:
+        cache = current_app.extensions['user_cache'] = TTLCache(
+            maxsize=current_app.config['USER_CACHE_SIZE'],
+            ttl=current_app.config['USER_CACHE_TTL']
+        )
+    return cache
+
+def get_cached_user(user_id):
+    from app.models import User
+    from app.serializers import USER
+
+    # Plain dict rather than a User instance so cached entries never touch a session
+    cache = user_cache()
+    user = cache.get(user_id)
+    if user is None:
+        row = db.session.query(*USER.select()).filter(User.id == user_id).first()
+        if not row:
+            return None
+        user = USER.one(row)
+        cache.set(user_id, user)
+    return user
+
+def invalidate_user(user_id):
+    user_cache().delete(user_id)
@@ -0,0 +1,100 @@
+import datetime
+import math
+import time
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+from sqlalchemy import delete, exists, select, update
+from app.extensions import db
+from app.models import Application, ArchivedApplication, ArchivedJob, Job, User
+
+users_cli = AppGroup('users', help='Maintain user accounts.')
+
+SALT = 'email-verification'
+
+
+def serializer():
+    return URLSafeTimedSerializer(current_app.config['EMAIL_VERIFICATION_SECRET'], salt=SALT)
+
+
+def make_token(user_id):
+    # Signed and timestamped user id: verifying it needs no lookup, only the primary-key update
+    return serializer().dumps(user_id)
+
+
+def load_token(token):
+    # The user id for a valid, unexpired token, else None
+    try:
+        return serializer().loads(token, max_age=current_app.config['EMAIL_VERIFICATION_TTL'])
+    except (SignatureExpired, BadSignature):
+        return None
+
+
+def expiry():
+    return datetime.datetime.utcnow() + datetime.timedelta(seconds=current_app.config['EMAIL_VERIFICATION_TTL'])
+
+
+def resend_wait(user):
+    # Seconds until another verification email may be sent to this user, 0 if now.
+    # token_expiration is set when an email goes out, so it also records when the last one was sent.
+    if user.token_expiration is None:
+        return 0
+    sent_at = user.token_expiration - datetime.timedelta(seconds=current_app.config['EMAIL_VERIFICATION_TTL'])
+    ready_at = sent_at + datetime.timedelta(seconds=current_app.config['EMAIL_VERIFICATION_RESEND_INTERVAL'])
+    return max(0, math.ceil((ready_at - datetime.datetime.utcnow()).total_seconds()))
+
+
+def mark_verified(user_id):
+    # One primary-key UPDATE; returns False if the user is gone or already verified
+    result = db.session.execute(
+        update(User).where(User.id == user_id, User.is_verified.is_(False)).values(
+            is_verified=True, email_verification_token=None, token_expiration=None
+        ),
+        execution_options={"synchronize_session": False}
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def legacy_token_user(token):
+    # Links sent before tokens were signed carry a random token stored on the user (indexed)
+    return db.session.query(User.id).filter(
+        User.email_verification_token == token,
+        User.is_verified.is_(False)
+    ).scalar()
+
+
+def purge_unverified(batch_size, now=None):
+    # Deletes unverified accounts whose verification window has passed, batch_size rows per
+    # transaction, and returns how many were removed. Accounts that somehow own rows are kept.
+    now = now or datetime.datetime.utcnow()
+    purged = 0
+    while True:
+        ids = select(User.id).where(
+            User.is_verified.is_(False),
+            User.token_expiration < now,
+            ~exists().where(Job.created_by == User.id),
+            ~exists().where(Application.applicant_id == User.id),
+            ~exists().where(ArchivedJob.created_by == User.id),
+            ~exists().where(ArchivedApplication.applicant_id == User.id),
+        ).limit(batch_size)
+        ids = db.session.execute(ids).scalars().all()
+        if not ids:
+            return purged
+        db.session.execute(delete(User).where(User.id.in_(ids)), execution_options={"synchronize_session": False})
+        db.session.commit()
+        purged += len(ids)
+
+
+@users_cli.command('purge-unverified')
+@click.option('--batch-size', type=int, default=1000, help='Accounts deleted per transaction.')
+@click.option('--interval', type=int, default=0, help='Repeat every N seconds instead of running once.')
+def purge_unverified_command(batch_size, interval):
+    """Delete unverified accounts whose verification link has expired."""
+    while True:
+        purged = purge_unverified(batch_size)
+        click.echo(f"Purged {purged} unverified accounts.")
+        if not interval:
+            return
+        time.sleep(interval)
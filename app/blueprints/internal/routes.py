@@ -0,0 +1,31 @@
+from flask import Blueprint, jsonify
+from app import events
+from app.cache import response_cache
+from app.metrics import metrics_registry
+
+# Operational endpoints; only registered when INTERNAL_ENDPOINTS_ENABLED is set
+internal_bp = Blueprint('internal', __name__)
+
+
+@internal_bp.route('/cache', methods=['GET'])
+def cache_stats():
+    cache = response_cache()
+    if cache is None:
+        return jsonify({"error": "Response cache disabled"}), 404
+    return jsonify(cache.stats())
+
+
+@internal_bp.route('/events', methods=['GET'])
+def event_stats():
+    broker = events.broker()
+    if broker is None:
+        return jsonify({"error": "Event stream disabled"}), 404
+    return jsonify(broker.stats())
+
+
+@internal_bp.route('/metrics', methods=['GET'])
+def metrics():
+    registry = metrics_registry()
+    if registry is None:
+        return jsonify({"error": "Metrics disabled"}), 404
+    return registry.render(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
@@ -0,0 +1,106 @@
+import datetime
+import json
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.models import Job, JobStatus, generate_uuid
+from app import search
+
+STATUS_VALUES = [s.value for s in JobStatus]
+UPDATABLE_FIELDS = ('title', 'description', 'location', 'status')
+# Column lengths; checked per line so one bad value can't roll back the whole chunk
+TEXT_FIELDS = {'title': 100, 'description': 2000, 'location': 255}
+
+
+def parse_operation(raw):
+    # Validates one NDJSON line and returns (op, job_id, values); raises ValueError with a client-facing message
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        raise ValueError("Invalid JSON")
+    if not isinstance(data, dict):
+        raise ValueError("Each line must be a JSON object")
+
+    op = data.get('op')
+    status = data.get('status')
+    if status is not None and status not in STATUS_VALUES:
+        raise ValueError("Invalid status")
+    for field, max_length in TEXT_FIELDS.items():
+        value = data.get(field)
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"{field} must be a string")
+        if value is not None and len(value) > max_length:
+            raise ValueError(f"{field} must be at most {max_length} characters")
+
+    if op == 'create':
+        if not data.get('title') or not data.get('description'):
+            raise ValueError("Title and description are required")
+        return op, None, {
+            "title": data['title'],
+            "description": data['description'],
+            "location": data.get('location', ''),
+            "status": JobStatus(status or JobStatus.DRAFT.value),
+        }
+
+    if op in ('update', 'close'):
+        job_id = data.get('id')
+        if not job_id:
+            raise ValueError("id is required")
+        if not isinstance(job_id, str):
+            raise ValueError("id must be a string")
+        if op == 'close':
+            return op, job_id, {"status": JobStatus.CLOSED}
+        values = {field: data[field] for field in UPDATABLE_FIELDS if data.get(field)}
+        if not values:
+            raise ValueError("Nothing to update")
+        if 'status' in values:
+            values['status'] = JobStatus(values['status'])
+        return op, job_id, values
+
+    raise ValueError("op must be one of create, update, close")
+
+
+def apply_chunk(operations, user_id, touched):
+    # operations: [(line, (op, job_id, values))]; applied in a single transaction.
+    # Old and new statuses of committed changes are added to `touched`.
+    results = []
+    new_rows = []
+    changes = []
+
+    changed_ids = {job_id for _, (op, job_id, _) in operations if op != 'create'}
+    owned = {}
+    if changed_ids:
+        owned = dict(db.session.execute(
+            select(Job.id, Job.status).where(Job.id.in_(changed_ids), Job.created_by == user_id)
+        ).all())
+
+    statuses = set()
+    now = datetime.datetime.utcnow()
+    for line, (op, job_id, values) in operations:
+        if op == 'create':
+            row = dict(values, id=generate_uuid(), created_by=user_id, created_at=now)
+            new_rows.append(row)
+            statuses.add(row["status"])
+            results.append({"line": line, "op": op, "id": row["id"]})
+        elif job_id not in owned:
+            results.append({"line": line, "op": op, "id": job_id, "error": "Job not found or not owned"})
+        else:
+            changes.append(dict(values, id=job_id))
+            statuses.update((owned[job_id], values.get('status')))
+            results.append({"line": line, "op": op, "id": job_id})
+
+    try:
+        if new_rows:
+            db.session.execute(insert(Job), new_rows)
+        if changes:
+            # ORM bulk UPDATE by primary key, grouped into executemany batches
+            db.session.execute(update(Job), changes)
+        search.index_jobs([row["id"] for row in new_rows] + [change["id"] for change in changes])
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        message = f"Chunk rolled back: {e.__class__.__name__}"
+        return [dict(result, error=result.get("error", message)) for result in results]
+
+    touched.update(status for status in statuses if status is not None)
+    return results
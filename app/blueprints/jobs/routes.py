@@ -1,13 +1,23 @@
-from flask import Blueprint, request, jsonify
+import base64
+import datetime
+import json
+from flask import Blueprint, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import Job, User, JobStatus
+from sqlalchemy import func, select, tuple_
+from app.models import Application, ArchivedApplication, Job, User, JobStatus
 from app.extensions import db
+from app import archive, search, http_cache, serializers, recommendations
+from app.cache import response_cache
+from app.ratelimit import rate_limit
+from app.blueprints.applications import intake, sync
+from app.blueprints.jobs.bulk import parse_operation, apply_chunk
 from app.blueprints.auth.routes import role_required  # role_required decorator you already have
 
 jobs_bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
 
 @jobs_bp.route('', methods=['POST'])
 @role_required(['company'])
+@rate_limit('create_job')
 def create_job():
     data = request.get_json()
     if not data:
@@ -34,17 +44,106 @@ def create_job():
     )
 
     db.session.add(job)
+    db.session.flush()
+    search.index_job(job)
     db.session.commit()
+    invalidate_listings(job.status)
+    recommendations.jobs_changed()
 
     return jsonify({"message": "Job created successfully", "job_id": job.id}), 201
 
 
+@jobs_bp.route('/bulk', methods=['POST'])
+@role_required(['company'])
+def bulk_jobs():
+    # NDJSON body, one {"op": "create" | "update" | "close", ...} object per line
+    user_id = get_jwt_identity()
+    chunk_size = current_app.config['JOBS_BULK_CHUNK_SIZE']
+
+    results = []
+    chunk = []
+    touched = set()  # statuses affected by committed chunks
+    for line, raw in enumerate(request.stream, start=1):
+        if not raw.strip():
+            continue
+        try:
+            chunk.append((line, parse_operation(raw)))
+        except ValueError as e:
+            results.append({"line": line, "error": str(e)})
+        if len(chunk) >= chunk_size:
+            results.extend(apply_chunk(chunk, user_id, touched))
+            chunk = []
+    if chunk:
+        results.extend(apply_chunk(chunk, user_id, touched))
+    invalidate_listings(*touched)
+    intake.forget_job(*(result["id"] for result in results if "error" not in result and result["op"] != "create"))
+    recommendations.jobs_changed()
+
+    results.sort(key=lambda result: result["line"])
+    summary = {"created": 0, "updated": 0, "closed": 0, "failed": 0}
+    for result in results:
+        if "error" in result:
+            summary["failed"] += 1
+        else:
+            summary[{"create": "created", "update": "updated", "close": "closed"}[result["op"]]] += 1
+
+    return jsonify({**summary, "results": results})
+
+
+@jobs_bp.route('/export', methods=['GET'])
+@role_required(['company'])
+def export_jobs():
+    user_id = get_jwt_identity()
+    query = db.session.query(*serializers.JOB.select()).filter(
+        Job.created_by == user_id
+    ).order_by(Job.created_at, Job.id).execution_options(yield_per=1000)
+    serialize = serializers.JOB.compile()
+
+    # Rows are fetched and written in batches, never materialized as a full list
+    def generate():
+        for row in query:
+            yield current_app.json.dumps(serialize(row)) + '\n'
+
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@jobs_bp.route('/recommended', methods=['GET'])
+@role_required(['applicant'])
+def recommended_jobs():
+    recommender = recommendations.recommender()
+    if recommender is None:
+        return jsonify({"error": "Recommendations are not available"}), 503
+
+    try:
+        limit = int(request.args.get('limit', current_app.config['JOBS_PAGE_SIZE']))
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    if limit < 1:
+        return jsonify({"error": "Invalid limit"}), 400
+    limit = min(limit, current_app.config['JOBS_MAX_PAGE_SIZE'])
+
+    user_id = get_jwt_identity()
+    matches, based_on = recommender.recommend(user_id, limit)
+    scores = dict(matches)
+    rows = db.session.query(*serializers.JOB.select()).filter(
+        *recommendations.unapplied(list(scores), user_id)
+    ).all() if scores else []
+
+    serialize = serializers.JOB.compile()
+    jobs = sorted((dict(serialize(row), score=round(scores[row.id], 4)) for row in rows
+                   if row.status == JobStatus.OPEN),
+                  key=lambda job: -job["score"])[:limit]
+    return jsonify({"jobs": jobs, "based_on": based_on})
+
+
 @jobs_bp.route('/<job_id>', methods=['PUT'])
 @role_required(['company'])
 def update_job(job_id):
     user_id = get_jwt_identity()
     job = Job.query.get(job_id)
     if not job:
+        if archive.archived_job(job_id):
+            return jsonify({"error": "Archived jobs cannot be changed"}), 409
         return jsonify({"error": "Job not found"}), 404
 
     if job.created_by != user_id:
@@ -58,6 +157,7 @@ def update_job(job_id):
     description = data.get('description')
     location = data.get('location')
     status = data.get('status')
+    old_status = job.status
 
     if title:
         job.title = title
@@ -70,7 +170,11 @@ def update_job(job_id):
             return jsonify({"error": "Invalid status"}), 400
         job.status = JobStatus(status)
 
+    search.index_job(job)
     db.session.commit()
+    invalidate_listings(old_status, job.status)
+    intake.forget_job(job.id)
+    recommendations.jobs_changed()
 
     return jsonify({"message": "Job updated successfully"})
 
@@ -79,70 +183,196 @@ def update_job(job_id):
 @role_required(['company'])
 def delete_job(job_id):
     user_id = get_jwt_identity()
-    job = Job.query.get(job_id)
-    if not job:
+    job = db.session.query(Job.created_by, Job.status).filter(Job.id == job_id).first()
+    archived = archive.archived_job(job_id) if not job else None
+    if not job and not archived:
         return jsonify({"error": "Job not found"}), 404
 
-    if job.created_by != user_id:
+    if (job or archived).created_by != user_id:
         return jsonify({"error": "Unauthorized to delete this job"}), 403
 
-    db.session.delete(job)
+    if archived:
+        sync.record_deletions(ArchivedApplication, ArchivedApplication.job_id == job_id)
+        archive.delete_archived_jobs([job_id])
+        db.session.commit()
+        return jsonify({"message": "Job deleted successfully"})
+
+    # Applications, counters and search rows go with the job, set-based; applicants' delta
+    # syncs see the applications as deleted
+    sync.record_deletions(Application, Application.job_id == job_id)
+    archive.delete_jobs([job_id])
     db.session.commit()
+    invalidate_listings(job.status)
+    intake.forget_job(job_id)
+    recommendations.job_removed(job_id)
 
     return jsonify({"message": "Job deleted successfully"})
 
 
+def encode_cursor(sort_key, job_id):
+    if isinstance(sort_key, datetime.datetime):
+        sort_key = sort_key.isoformat()
+    raw = json.dumps([sort_key, job_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token, ranked=False):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        sort_key, job_id = json.loads(raw)
+        if ranked:
+            return float(sort_key), str(job_id)
+        return datetime.datetime.fromisoformat(sort_key), str(job_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def listing_fingerprint():
+    # Any insert, update or delete on jobs moves max(updated_at) or count(*). Kept as separate
+    # subqueries so max() is an index probe and count(*) walks the smallest index, not the table
+    last_modified, total = db.session.execute(select(
+        select(func.max(Job.updated_at)).scalar_subquery(),
+        select(func.count()).select_from(Job).scalar_subquery()
+    )).one()
+    return last_modified, total
+
+
+def listing_tags(status=None):
+    # A listing depends on every non-draft status it can contain
+    if status:
+        return [f"jobs:status:{status}"]
+    return [f"jobs:status:{s.value}" for s in JobStatus if s != JobStatus.DRAFT]
+
+
+def invalidate_listings(*statuses):
+    cache = response_cache()
+    if cache is None:
+        return
+    # Drafts never appear in listings, so draft-only changes leave cached pages alone
+    tags = {f"jobs:status:{s.value}" for s in statuses if s is not None and s != JobStatus.DRAFT}
+    if tags:
+        cache.invalidate(tags)
+
+
+def cached_listing_response(entry):
+    if http_cache.is_not_modified(entry["etag"]):
+        return http_cache.not_modified(entry["etag"])
+    response = current_app.response_class(entry["body"], mimetype='application/json')
+    return http_cache.add_cache_headers(response, entry["etag"])
+
+
 @jobs_bp.route('', methods=['GET'])
 def list_jobs():
     # Optional filters: status, location, keyword in title/description
     status = request.args.get('status')
-    location = request.args.get('location')
-    keyword = request.args.get('keyword')
+    location = request.args.get('location', '').strip().lower() or None
+    keyword = request.args.get('keyword', '').strip().lower() or None
+    cursor = request.args.get('cursor')
+    fields = request.args.get('fields')
+
+    if status and status not in [s.value for s in JobStatus]:
+        return jsonify({"error": "Invalid status filter"}), 400
+
+    try:
+        limit = int(request.args.get('limit', current_app.config['JOBS_PAGE_SIZE']))
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    if limit < 1:
+        return jsonify({"error": "Invalid limit"}), 400
+    limit = min(limit, current_app.config['JOBS_MAX_PAGE_SIZE'])
+
+    if fields:
+        fields = [f.strip() for f in fields.split(',') if f.strip()]
+        unknown = [f for f in fields if f not in serializers.JOB.columns]
+        if unknown:
+            return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+        if 'id' not in fields:
+            fields.insert(0, 'id')
+    else:
+        fields = list(serializers.JOB.columns)
+
+    params = {
+        "status": status or None,
+        "location": location,
+        "keyword": keyword,
+        "cursor": cursor or None,
+        "fields": fields,
+        "limit": limit,
+        # Backends rank and match differently, so switching SEARCH_BACKEND must not reuse pages
+        "search": search.backend() if keyword or location else None,
+    }
 
-    query = Job.query.filter(Job.status != JobStatus.DRAFT)  # By default exclude drafts from listings
+    cache = response_cache()
+    if cache is not None:
+        cache_key = cache.key('jobs:list', params, tags=listing_tags(status))
+        entry = cache.get(cache_key)
+        if entry is not None:
+            return cached_listing_response(entry)
+
+    # Listings are validated by ETag only: deleting a job can leave max(updated_at) unchanged, so a
+    # Last-Modified date would let If-Modified-Since answer 304 for a page that lost a row
+    last_modified, total = listing_fingerprint()
+    etag = http_cache.make_etag(sorted(params.items()), last_modified, total)
+    if http_cache.is_not_modified(etag):
+        return http_cache.not_modified(etag)
+
+    # Only the requested columns are loaded; id and created_at are always needed for the cursor
+    query = db.session.query(*serializers.JOB.select(fields))
+    if 'created_at' not in fields:
+        query = query.add_columns(Job.created_at)
+    query = query.filter(Job.status != JobStatus.DRAFT)  # By default exclude drafts from listings
 
     if status:
-        if status not in [s.value for s in JobStatus]:
-            return jsonify({"error": "Invalid status filter"}), 400
         query = query.filter(Job.status == JobStatus(status))
 
-    if location:
-        query = query.filter(Job.location.ilike(f"%{location}%"))
+    query, rank = search.filter_jobs(query, keyword=keyword, location=location)
+
+    # Keyword searches are ordered by relevance, everything else by recency
+    if rank is not None:
+        query = query.add_columns(rank.label('rank'))
+
+    if cursor:
+        position = decode_cursor(cursor, ranked=rank is not None)
+        if not position:
+            return jsonify({"error": "Invalid cursor"}), 400
+        if rank is not None:
+            query = query.filter(tuple_(rank, Job.id) > position)
+        else:
+            query = query.filter(tuple_(Job.created_at, Job.id) < position)
 
-    if keyword:
-        query = query.filter(
-            (Job.title.ilike(f"%{keyword}%")) | (Job.description.ilike(f"%{keyword}%"))
-        )
+    if rank is not None:
+        query = query.order_by(rank, Job.id)
+    else:
+        query = query.order_by(Job.created_at.desc(), Job.id.desc())
 
-    jobs = query.order_by(Job.created_at.desc()).all()
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
 
-    jobs_list = [{
-        "id": job.id,
-        "title": job.title,
-        "description": job.description,
-        "location": job.location,
-        "status": job.status.value,
-        "created_by": job.created_by,
-        "created_at": job.created_at.isoformat()
-    } for job in jobs]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.rank if rank is not None else last.created_at, last.id)
 
-    return jsonify(jobs_list)
+    jobs_list = serializers.JOB.many(rows, fields)
+
+    response = jsonify({"jobs": jobs_list, "next_cursor": next_cursor})
+    if cache is not None:
+        cache.set(cache_key, {"etag": etag, "body": response.get_data(as_text=True)})
+    return http_cache.add_cache_headers(response, etag)
 
 
 @jobs_bp.route('/<job_id>', methods=['GET'])
 def get_job(job_id):
-    job = Job.query.get(job_id)
+    job = db.session.query(*serializers.JOB.select()).filter(Job.id == job_id).first()
+    if not job:
+        # Archived jobs are only probed after a miss on the hot table
+        job = archive.archived_job(job_id)
     if not job:
         return jsonify({"error": "Job not found"}), 404
 
-    job_data = {
-        "id": job.id,
-        "title": job.title,
-        "description": job.description,
-        "location": job.location,
-        "status": job.status.value,
-        "created_by": job.created_by,
-        "created_at": job.created_at.isoformat()
-    }
+    etag = http_cache.make_etag(job.id, job.updated_at)
+    if http_cache.is_not_modified(etag, job.updated_at):
+        return http_cache.not_modified(etag, job.updated_at)
 
-    return jsonify(job_data)
+    return http_cache.add_cache_headers(jsonify(serializers.JOB.one(job)), etag, job.updated_at)
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+
+_MISSING = object()
+
+
+class TTLCache:
+    # Thread-safe LRU cache whose entries also expire after `ttl` seconds
+
+    def __init__(self, maxsize=1024, ttl=60, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at > self.timer():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        expires_at = self.timer() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+
+class MemoryBackend:
+    # Per-process store; entries expire and are evicted LRU, tag versions live until restart
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.entries.set(key, value, ttl)
+
+    def get_counters(self, keys):
+        with self._lock:
+            return [self.counters.get(key, 0) for key in keys]
+
+    def incr(self, key):
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+            return self.counters[key]
+
+    @property
+    def evictions(self):
+        return self.entries.evictions
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class RedisBackend:
+    # Shared store for multi-worker deployments; `client` is anything with the redis-py API
+
+    def __init__(self, client, prefix='jobboard:', ttl=60):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl or self.ttl)
+
+    def get_counters(self, keys):
+        values = self.client.mget([self.prefix + key for key in keys])
+        return [int(value or 0) for value in values]
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+    # Redis evicts on its own; its INFO stats are the place to look
+    evictions = None
+
+    def __len__(self):
+        return 0
+
+
+class ResponseCache:
+    # Entries are keyed on (namespace, params, tag versions); bumping a tag's version
+    # orphans every entry that depended on it, which then ages out of the backend
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def key(self, namespace, params, tags=()):
+        tags = sorted(tags)
+        versions = self.backend.get_counters([f"tag:{tag}" for tag in tags]) if tags else []
+        raw = json.dumps([params, list(zip(tags, versions))], sort_keys=True, default=str)
+        return f"{namespace}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+    def get(self, key):
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        self.backend.set(key, value, ttl)
+
+    def invalidate(self, tags):
+        for tag in tags:
+            self.backend.incr(f"tag:{tag}")
+            self.invalidations += 1
+
+    def stats(self):
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self.backend),
+        }
+
+
+def init_response_cache(app):
+    backend_name = app.config['RESPONSE_CACHE_BACKEND']
+    ttl = app.config['RESPONSE_CACHE_TTL']
+    if backend_name == 'memory':
+        backend = MemoryBackend(maxsize=app.config['RESPONSE_CACHE_SIZE'], ttl=ttl)
+    elif backend_name == 'redis':
+        import redis  # optional dependency, only needed for the shared backend
+        backend = RedisBackend(redis.Redis.from_url(app.config['RESPONSE_CACHE_REDIS_URL']), ttl=ttl)
+    else:
+        backend = None
+    app.extensions['response_cache'] = ResponseCache(backend) if backend is not None else None
+
+
+def response_cache():
+    return current_app.extensions.get('response_cache')
@@ -0,0 +1,111 @@
+import functools
+import click
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql import Select
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# Not accepted by the single-connection pools used for in-memory SQLite
+QUEUE_POOL_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout')
+
+
+def is_read_request():
+    return has_request_context() and request.method in READ_METHODS and not g.get('use_primary')
+
+
+def use_primary(fn):
+    # For read-method views that write, or must see their own writes
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        g.use_primary = True
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+class RoutingSession(Session):
+    # Sends plain SELECTs issued while serving GET requests to the 'replica' bind when one is
+    # configured; flushes, DML and everything outside GET requests stay on the primary
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and isinstance(clause, Select) and is_read_request():
+            replica = self._db.engines.get('replica')
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+def is_memory_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def sqlite_connect_listener(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            if value not in (None, ''):
+                cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+    return on_connect
+
+
+def init_database(app):
+    from app.extensions import db
+
+    # Copies, so the shared Config class attributes are never modified
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if is_memory_sqlite(make_url(app.config['SQLALCHEMY_DATABASE_URI'])):
+        for option in QUEUE_POOL_OPTIONS:
+            options.pop(option, None)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    replica_uri = app.config.get('SQLALCHEMY_REPLICA_URI')
+    if replica_uri:
+        app.config['SQLALCHEMY_BINDS'] = dict(app.config.get('SQLALCHEMY_BINDS') or {}, replica=replica_uri)
+
+    db.init_app(app)
+
+    pragmas = app.config.get('SQLITE_PRAGMAS', {})
+    with app.app_context():
+        engines = db.engines.values()
+    for engine in engines:
+        if engine.dialect.name == 'sqlite':
+            event.listen(engine, 'connect', sqlite_connect_listener(pragmas))
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # The SQLite search tables are managed by app.search, not by the models
+    return not (type_ == 'table' and name.startswith('jobs_fts'))
+
+
+def compare_type(context, inspected_column, metadata_column, inspected_type, metadata_type):
+    from app.models import CompactUUID
+
+    # SQLite key columns were re-encoded in place by 9e4b7a1c3d68 and keep their declared type
+    if isinstance(metadata_type, CompactUUID) and context.dialect.name == 'sqlite':
+        return False
+    return None
+
+
+class MigrationCommands(click.Group):
+    # Stands in for Flask-Migrate's `flask db` group so alembic is only imported when a
+    # migration command actually runs
+    def __init__(self, app):
+        super().__init__('db', help='Perform database migrations.')
+        self.app = app
+
+    def load(self):
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as commands
+        from app.extensions import db
+
+        if 'migrate' not in self.app.extensions:
+            Migrate(self.app, db, include_object=include_object, compare_type=compare_type)
+        return commands
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        # Parsing and invoking are handed to the real group, options included
+        return self.load().make_context(info_name, args, parent=parent, **extra)
+
+
+def init_migrations(app):
+    app.cli.add_command(MigrationCommands(app))
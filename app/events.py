@@ -0,0 +1,252 @@
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict, deque, namedtuple
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# data is the JSON-encoded payload, ready to be written out
+Event = namedtuple('Event', 'id company_id type data')
+
+
+class Subscription:
+    def __init__(self, company_id, maxsize):
+        self.company_id = company_id
+        self.queue = queue.Queue(maxsize=maxsize)
+        # Set when an event could not be queued; the stream then ends and the client resumes
+        # from its Last-Event-ID
+        self.overflowed = False
+
+
+class MemoryBackend:
+    # Single-process delivery. Ids are unique to this process, so a client resuming against a
+    # restarted worker (or another worker) gets a resync instead of a replay.
+
+    def __init__(self, history=100):
+        self.history = defaultdict(lambda: deque(maxlen=history))  # company_id -> recent events
+        self.prefix = f"{os.getpid()}.{int(time.time())}"
+        self.sequence = itertools.count(1)
+        self._lock = threading.Lock()
+        self.deliver = None
+
+    def start(self, deliver):
+        self.deliver = deliver
+
+    def publish(self, company_id, type, data):
+        with self._lock:
+            event = Event(f"{self.prefix}-{next(self.sequence)}", company_id, type, data)
+            self.history[company_id].append(event)
+        if self.deliver is not None:
+            self.deliver(event)
+
+    def replay(self, company_id, last_event_id):
+        # Events after last_event_id, or None when it is no longer (or never was) in the history
+        with self._lock:
+            events = list(self.history.get(company_id, ()))
+        for index, event in enumerate(events):
+            if event.id == last_event_id:
+                return events[index + 1:]
+        return None
+
+
+class RedisBackend:
+    # Multi-worker delivery: each company's events are appended to a capped Redis stream (for
+    # replay, ids are stream ids) and announced on one pub/sub channel that a listener thread in
+    # every worker fans out locally. `client` is anything with the redis-py API.
+
+    def __init__(self, client, prefix='jobboard:', history=100):
+        self.client = client
+        self.prefix = prefix
+        self.channel = f"{prefix}events"
+        self.history = history
+        self.thread = None
+
+    def start(self, deliver):
+        self.thread = threading.Thread(target=self.listen, args=(deliver,), name='event-listener', daemon=True)
+        self.thread.start()
+
+    def stream_key(self, company_id):
+        return f"{self.prefix}events:{company_id}"
+
+    def publish(self, company_id, type, data):
+        event_id = self.client.xadd(self.stream_key(company_id), {"type": type, "data": data},
+                                    maxlen=self.history, approximate=True)
+        if isinstance(event_id, bytes):
+            event_id = event_id.decode()
+        self.client.publish(self.channel, json.dumps([event_id, company_id, type, data]))
+
+    def replay(self, company_id, last_event_id):
+        try:
+            entries = self.client.xrange(self.stream_key(company_id), min=last_event_id, count=self.history + 2)
+        except Exception:
+            # Not a stream id, e.g. one issued by the memory backend
+            return None
+        entries = [(self.decode(entry_id), fields) for entry_id, fields in entries]
+        # Trimming is approximate, so an id further back than `history` can still be in the stream;
+        # replaying only part of what came after it would leave a silent gap
+        if not entries or entries[0][0] != last_event_id or len(entries) > self.history + 1:
+            return None
+        return [
+            Event(entry_id, company_id, self.decode(fields[b"type"]), self.decode(fields[b"data"]))
+            for entry_id, fields in entries[1:]
+        ]
+
+    def listen(self, deliver):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    deliver(Event(*json.loads(message["data"])))
+            except Exception:
+                # Events published while disconnected reach open streams only through a reconnect
+                logger.exception("Event listener lost its connection, reconnecting")
+                time.sleep(1)
+
+    @staticmethod
+    def decode(value):
+        return value.decode() if isinstance(value, bytes) else value
+
+
+class EventBroker:
+    # Per-process fan-out: every open stream holds a bounded queue registered under its company.
+    # Idle streams cost a blocked thread and a queue, nothing is polled, so max_streams caps how
+    # many server threads streams can take (0: no cap).
+
+    def __init__(self, backend, queue_size=1000, max_streams=0):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.max_streams = max_streams
+        self.subscribers = defaultdict(set)  # company_id -> subscriptions
+        self.streams = 0
+        self.published = 0
+        self.dropped = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self):
+        # Lazily, so forking servers start the backend's listener in each worker
+        if not self._started:
+            with self._lock:
+                if not self._started:
+                    self.backend.start(self.deliver)
+                    self._started = True
+
+    def subscribe(self, company_id):
+        # None when this process already has max_streams open
+        self.start()
+        subscription = Subscription(company_id, self.queue_size)
+        with self._lock:
+            if self.max_streams and self.streams >= self.max_streams:
+                self.rejected += 1
+                return None
+            self.subscribers[company_id].add(subscription)
+            self.streams += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        # Safe to call more than once
+        with self._lock:
+            subscribers = self.subscribers.get(subscription.company_id)
+            if subscribers is not None and subscription in subscribers:
+                subscribers.discard(subscription)
+                self.streams -= 1
+                if not subscribers:
+                    del self.subscribers[subscription.company_id]
+
+    def publish(self, company_id, type, data):
+        self.start()
+        self.backend.publish(company_id, type, data)
+        self.published += 1
+
+    def deliver(self, event):
+        with self._lock:
+            subscribers = list(self.subscribers.get(event.company_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                subscription.overflowed = True
+                self.dropped += 1
+
+    def stats(self):
+        return {
+            "backend": type(self.backend).__name__,
+            "streams": self.streams,
+            "max_streams": self.max_streams,
+            "rejected": self.rejected,
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+def format_event(event):
+    return f"id: {event.id}\nevent: {event.type}\ndata: {event.data}\n\n"
+
+
+def stream(broker, subscription, last_event_id, heartbeat, job_id=None):
+    # text/event-stream body for a subscription taken before the response started, so nothing
+    # published before the replay is missed; events delivered both ways are sent once.
+    company_id = subscription.company_id
+    try:
+        sent = set()
+        if last_event_id:
+            missed = broker.backend.replay(company_id, last_event_id)
+            if missed is None:
+                # The gap can't be replayed: the client should reload, then follow the stream
+                yield "event: resync\ndata: {}\n\n"
+            else:
+                for event in missed:
+                    sent.add(event.id)
+                    if job_id is None or json.loads(event.data).get("job_id") == job_id:
+                        yield format_event(event)
+        yield ": connected\n\n"
+        while not subscription.overflowed:
+            try:
+                event = subscription.queue.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ": heartbeat\n\n"
+                continue
+            if event.id in sent:
+                continue
+            if job_id is None or json.loads(event.data).get("job_id") == job_id:
+                yield format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def init_events(app):
+    backend_name = app.config['EVENTS_BACKEND']
+    history = app.config['EVENTS_HISTORY']
+    if backend_name == 'memory':
+        backend = MemoryBackend(history=history)
+    elif backend_name == 'redis':
+        import redis  # optional dependency, only needed for the shared backend
+        backend = RedisBackend(redis.Redis.from_url(app.config['EVENTS_REDIS_URL']), history=history)
+    else:
+        backend = None
+    app.extensions['events'] = (
+        EventBroker(backend, queue_size=app.config['EVENTS_QUEUE_SIZE'], max_streams=app.config['EVENTS_MAX_STREAMS'])
+        if backend is not None else None
+    )
+
+
+def broker():
+    return current_app.extensions.get('events')
+
+
+def publish(company_id, type, **data):
+    # Called after the change has committed; a failure to publish never fails the request
+    instance = broker()
+    if instance is None:
+        return
+    try:
+        instance.publish(company_id, type, current_app.json.dumps(data))
+    except Exception:
+        logger.exception("Could not publish %s event", type)
@@ -0,0 +1,39 @@
+import datetime
+import hashlib
+from flask import current_app, request
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1('\x1f'.join(str(part) for part in parts).encode()).hexdigest()
+    return digest[:32]
+
+
+def http_date(value):
+    # updated_at columns are naive UTC; HTTP dates have one-second resolution
+    if value is None:
+        return None
+    return value.replace(tzinfo=datetime.timezone.utc, microsecond=0)
+
+
+def is_not_modified(etag, last_modified=None):
+    # If-None-Match wins over If-Modified-Since when both are sent, and uses the weak comparison
+    # (RFC 9110): proxies that compress a response hand its ETag back as W/"..."
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return http_date(last_modified) <= request.if_modified_since
+    return False
+
+
+def add_cache_headers(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = http_date(last_modified)
+    cache_control = current_app.config['CACHE_CONTROL'].get(request.endpoint)
+    if cache_control:
+        response.headers['Cache-Control'] = cache_control
+    return response
+
+
+def not_modified(etag, last_modified=None):
+    return add_cache_headers(current_app.response_class(status=304), etag, last_modified)
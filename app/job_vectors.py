@@ -0,0 +1,185 @@
+import functools
+import math
+import threading
+import zlib
+from collections import Counter
+import numpy as np
+from scipy import sparse
+from app.search import tokenize
+
+# Title words count this many times as often as description words
+TITLE_WEIGHT = 2
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def feature(token, n_features):
+    return zlib.crc32(token.encode()) % n_features
+
+
+def vectorize(title, description, n_features):
+    # Hashed, sublinear term frequencies scaled to unit length: (sorted feature indices, weights)
+    counts = Counter()
+    for token in tokenize(title):
+        counts[feature(token, n_features)] += TITLE_WEIGHT
+    for token in tokenize(description):
+        counts[feature(token, n_features)] += 1
+    if not counts:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+    indices = np.fromiter(sorted(counts), dtype=np.int32, count=len(counts))
+    values = np.array([1.0 + math.log(counts[index]) for index in indices], dtype=np.float32)
+    values /= np.linalg.norm(values)
+    return indices, values
+
+
+class JobIndex:
+    # Unit-length hashed term vectors of open jobs, one row per job. The matrix is stored by column
+    # (CSC), so a query multiplies only the columns of its own terms: one sparse matrix-vector
+    # product that touches a fraction of the matrix. IDF weights come from document frequencies
+    # kept up to date on every change, so they are never stale.
+    #
+    # Changes don't rewrite the matrix: added or updated jobs are appended to a small pending
+    # block and replaced rows are only masked out. Once the pending block or the dead rows grow
+    # past their limits, both are folded back into a new matrix.
+    def __init__(self, n_features=1 << 18, max_terms=64, max_pending=1024, max_dead_ratio=0.25):
+        self.n_features = n_features
+        self.max_terms = max_terms
+        self.max_pending = max_pending
+        self.max_dead_ratio = max_dead_ratio
+        self.df = np.zeros(n_features, dtype=np.int32)
+        self.docs = 0
+        self.main = sparse.csc_matrix((0, n_features), dtype=np.float32)
+        self.main_rows = (np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32))  # CSR indptr, indices
+        self.pending = []  # (indices, values) rows after the main matrix
+        self.pending_matrix = None
+        self.ids = []  # row -> job id
+        self.live = np.zeros(0, dtype=bool)
+        self.rows = {}  # job id -> row
+        self.versions = {}  # job id -> updated_at of the indexed text
+        self._idf = None
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def load(self, jobs):
+        # Bulk build from (job_id, title, description, updated_at) rows
+        with self._lock:
+            start = len(self.ids)
+            indptr, indices, values = [0], [], []
+            for job_id, title, description, updated_at in jobs:
+                if job_id in self.rows:
+                    self._remove(job_id)
+                row_indices, row_values = vectorize(title, description, self.n_features)
+                indices.append(row_indices)
+                values.append(row_values)
+                indptr.append(indptr[-1] + len(row_indices))
+                self._track(job_id, row_indices, updated_at)
+            self.live = np.concatenate([self.live, np.ones(len(self.ids) - start, dtype=bool)])
+            if len(indptr) > 1:
+                block = sparse.csr_matrix(
+                    (np.concatenate(values), np.concatenate(indices), np.array(indptr, dtype=np.int64)),
+                    shape=(len(indptr) - 1, self.n_features)
+                )
+                self._fold(block)
+
+    def upsert(self, job_id, title, description, updated_at=None):
+        with self._lock:
+            if job_id in self.rows:
+                if updated_at is not None and self.versions.get(job_id) == updated_at:
+                    return
+                self._remove(job_id)
+            row_indices, row_values = vectorize(title, description, self.n_features)
+            self.pending.append((row_indices, row_values))
+            self.pending_matrix = None
+            self._track(job_id, row_indices, updated_at)
+            self.live = np.append(self.live, True)
+            if len(self.pending) >= self.max_pending:
+                self._fold()
+
+    def remove(self, job_id):
+        with self._lock:
+            if job_id in self.rows:
+                self._remove(job_id)
+                if len(self.ids) - len(self.rows) > self.max_dead_ratio * max(len(self.ids), 1):
+                    self._fold()
+
+    def query(self, indices, values, k, exclude=()):
+        # Top k (job_id, score) for a query vector given as feature indices and weights
+        with self._lock:
+            if not self.rows or len(indices) == 0:
+                return []
+            indices = np.asarray(indices, dtype=np.int32)
+            idf = self.idf()[indices]
+            weights = np.asarray(values, dtype=np.float32) * idf * idf
+            if len(indices) > self.max_terms:
+                # Only the heaviest terms: the rest are common words that add little to the ranking
+                # but would pull in most of the matrix
+                keep = np.argpartition(-weights, self.max_terms - 1)[:self.max_terms]
+                indices, weights = indices[keep], weights[keep]
+            scores = self.main[:, indices] @ weights
+            if self.pending:
+                scores = np.concatenate([scores, self._pending_matrix()[:, indices] @ weights])
+            scores[~self.live] = -np.inf
+            for job_id in exclude:
+                row = self.rows.get(job_id)
+                if row is not None:
+                    scores[row] = -np.inf
+            k = min(k, len(self.rows))
+            top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [(self.ids[row], float(scores[row])) for row in top if scores[row] > 0]
+
+    def idf(self):
+        if self._idf is None:
+            self._idf = (np.log((1.0 + self.docs) / (1.0 + self.df)) + 1.0).astype(np.float32)
+        return self._idf
+
+    def _track(self, job_id, row_indices, updated_at):
+        self.rows[job_id] = len(self.ids)
+        self.ids.append(job_id)
+        self.versions[job_id] = updated_at
+        self.df[row_indices] += 1
+        self.docs += 1
+        self._idf = None
+
+    def _remove(self, job_id):
+        row = self.rows.pop(job_id)
+        self.versions.pop(job_id, None)
+        self.live[row] = False
+        self.df[self._row_indices(row)] -= 1
+        self.docs -= 1
+        self._idf = None
+
+    def _row_indices(self, row):
+        if row < self.main.shape[0]:
+            indptr, indices = self.main_rows
+            return indices[indptr[row]:indptr[row + 1]]
+        return self.pending[row - self.main.shape[0]][0]
+
+    def _pending_matrix(self):
+        if self.pending_matrix is None:
+            indptr = np.cumsum([0] + [len(indices) for indices, _ in self.pending])
+            self.pending_matrix = sparse.csr_matrix(
+                (np.concatenate([values for _, values in self.pending]),
+                 np.concatenate([indices for indices, _ in self.pending]), indptr),
+                shape=(len(self.pending), self.n_features)
+            )
+        return self.pending_matrix
+
+    def _fold(self, block=None):
+        # One new matrix from the live main rows, the pending rows and `block`, rows renumbered
+        parts = [self.main.tocsr()]
+        if self.pending:
+            parts.append(self._pending_matrix())
+        if block is not None:
+            parts.append(block)
+        combined = sparse.vstack(parts, format='csr', dtype=np.float32)
+        keep = np.flatnonzero(self.live)
+        combined = combined[keep] if len(keep) < combined.shape[0] else combined
+        self.main_rows = (combined.indptr, combined.indices)
+        self.main = combined.tocsc()
+        self.ids = [self.ids[row] for row in keep]
+        self.rows = {job_id: row for row, job_id in enumerate(self.ids)}
+        self.live = np.ones(len(self.ids), dtype=bool)
+        self.pending = []
+        self.pending_matrix = None
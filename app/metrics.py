@@ -0,0 +1,206 @@
+import cProfile
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from flask import current_app, g, has_request_context, request
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the request duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Time spent in these phases is summed per request; see timed()
+PHASES = ('serialization', 'password_hash')
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.duration_sum = 0.0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+
+
+class MetricsRegistry:
+    # Per-process totals keyed by (endpoint, method, status). With several worker processes each
+    # one serves its own numbers, which Prometheus sums across scrape targets.
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key, metrics, duration):
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = EndpointStats()
+            stats.requests += 1
+            stats.duration_sum += duration
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    stats.buckets[index] += 1
+            stats.sql_count += metrics.sql_count
+            stats.sql_seconds += metrics.sql_seconds
+            for phase, seconds in metrics.phases.items():
+                stats.phases[phase] += seconds
+
+    def render(self):
+        # Prometheus text exposition format, version 0.0.4
+        with self._lock:
+            stats = sorted(self._stats.items())
+            lines = [
+                "# HELP http_request_duration_seconds Wall time of requests by endpoint.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for key, stat in stats:
+                labels = format_labels(key)
+                for bound, count in zip(DURATION_BUCKETS, stat.buckets):
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stat.requests}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {stat.duration_sum:.6f}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {stat.requests}")
+
+            totals = [
+                ("sql_statements_total", "SQL statements executed by endpoint.", lambda s: s.sql_count),
+                ("sql_duration_seconds_total", "Time spent executing SQL by endpoint.", lambda s: s.sql_seconds),
+            ] + [
+                (f"{phase}_seconds_total", f"Time spent in {phase.replace('_', ' ')} by endpoint.",
+                 lambda s, phase=phase: s.phases[phase])
+                for phase in PHASES
+            ]
+            for name, help_text, value in totals:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for key, stat in stats:
+                    lines.append(f"{name}{{{format_labels(key)}}} {value(stat):g}")
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(key):
+    endpoint, method, status = key
+    endpoint = endpoint.replace('\\', '\\\\').replace('"', '\\"')
+    return f'endpoint="{endpoint}",method="{method}",status="{status}"'
+
+
+def metrics_registry():
+    return current_app.extensions.get('metrics')
+
+
+def current_metrics():
+    if has_request_context():
+        return g.get('request_metrics')
+    return None
+
+
+@contextmanager
+def timed(phase):
+    # Adds the block's wall time to `phase` for the current request, when metrics are enabled
+    metrics = current_metrics()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.phases[phase] += time.perf_counter() - start
+
+
+class SamplingProfiler:
+    # Profiles one in `rate` requests and writes one file per profiled request to `directory`:
+    # a pstats dump for cProfile, or a speedscope JSON file for pyinstrument
+    def __init__(self, rate, directory, backend='cprofile'):
+        self.rate = rate
+        self.directory = directory
+        self.backend = backend
+        os.makedirs(directory, exist_ok=True)
+        if backend == 'pyinstrument':
+            import pyinstrument  # optional dependency, only needed for this backend
+            self._pyinstrument = pyinstrument
+
+    def start(self):
+        if random.randrange(self.rate):
+            return None
+        if self.backend == 'pyinstrument':
+            profiler = self._pyinstrument.Profiler()
+            profiler.start()
+            return profiler
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another request on this process is being profiled (one cProfile at a time on 3.12+)
+            return None
+        return profiler
+
+    def stop(self, profiler, endpoint, duration):
+        name = f"{endpoint}-{int(time.time() * 1000)}-{duration * 1000:.0f}ms-{os.getpid()}"
+        if self.backend == 'pyinstrument':
+            from pyinstrument.renderers import SpeedscopeRenderer
+
+            profiler.stop()
+            path = os.path.join(self.directory, f"{name}.speedscope.json")
+            with open(path, 'w') as f:
+                f.write(profiler.output(SpeedscopeRenderer()))
+        else:
+            profiler.disable()
+            path = os.path.join(self.directory, f"{name}.prof")
+            profiler.dump_stats(path)
+        logger.info("Profiled %s in %.1f ms: %s", endpoint, duration * 1000, path)
+
+
+def init_metrics(app):
+    app.config.setdefault('METRICS_ENABLED', False)
+    app.config.setdefault('PROFILE_SAMPLE_RATE', 0)
+    if not app.config['METRICS_ENABLED'] and not app.config['PROFILE_SAMPLE_RATE']:
+        return
+
+    profiler = None
+    if app.config['PROFILE_SAMPLE_RATE']:
+        profiler = SamplingProfiler(
+            app.config['PROFILE_SAMPLE_RATE'], app.config['PROFILE_DIR'], app.config['PROFILE_BACKEND']
+        )
+    registry = app.extensions['metrics'] = MetricsRegistry() if app.config['METRICS_ENABLED'] else None
+
+    @app.before_request
+    def start_request_metrics():
+        g.request_start = time.perf_counter()
+        if registry is not None:
+            g.request_metrics = RequestMetrics()
+        if profiler is not None:
+            g.request_profiler = profiler.start()
+
+    @app.teardown_request
+    def record_request_metrics(exc):
+        if 'request_start' not in g:
+            return
+        duration = time.perf_counter() - g.pop('request_start')
+        endpoint = request.endpoint or 'unmatched'
+        request_profiler = g.pop('request_profiler', None)
+        if request_profiler is not None:
+            profiler.stop(request_profiler, endpoint, duration)
+        metrics = g.pop('request_metrics', None)
+        if metrics is None or endpoint == 'internal.metrics':
+            return
+        # SQL is counted and timed once, by app.query_counter
+        counter = g.get('query_counter')
+        if counter is not None:
+            metrics.sql_count = counter.count
+            metrics.sql_seconds = counter.seconds
+        status = g.pop('response_status', 500 if exc is not None else 200)
+        registry.observe((endpoint, request.method, status), metrics, duration)
+
+    @app.after_request
+    def remember_status(response):
+        g.response_status = response.status_code
+        return response
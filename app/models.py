@@ -1,10 +1,11 @@
 import enum
 import datetime
+import os
+import time
 import uuid
-from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
-
-db = SQLAlchemy()
+from sqlalchemy.dialects import postgresql
+from app.extensions import db
+from app.blueprints.auth.utils import hash_password, verify_password
 
 # Enum for User roles
 class UserRole(enum.Enum):
@@ -25,15 +26,69 @@ class ApplicationStatus(enum.Enum):
     REJECTED = "Rejected"
     HIRED = "Hired"
 
+# Enum for outbound email delivery state
+class EmailStatus(enum.Enum):
+    PENDING = "Pending"
+    SENT = "Sent"
+    FAILED = "Failed"
+
+
+def uuid7():
+    # RFC 9562 version 7: 48-bit Unix milliseconds followed by random bits, so new keys sort
+    # by creation time and land at the right edge of the primary key index
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # variant
+    return uuid.UUID(int=value)
+
 
 def generate_uuid():
-    return str(uuid.uuid4())
+    return str(uuid7())
+
+
+def parse_uuid(value):
+    # The UUID an id stands for, whatever its case or hyphenation; None when it isn't one
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        raw = bytes.fromhex(str(value).replace('-', ''))
+    except ValueError:
+        return None
+    return uuid.UUID(bytes=raw) if len(raw) == 16 else None
+
+
+class CompactUUID(db.TypeDecorator):
+    # Stored as 16 raw bytes (native uuid on Postgres) instead of a 36 character string,
+    # still read and written as the canonical string form
+    impl = db.LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(db.LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        value = parse_uuid(value)
+        if value is None:
+            # Malformed ids from URLs or tokens match nothing instead of raising
+            return None
+        return value if dialect.name == 'postgresql' else value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(bytes=bytes(value)))
 
 
 class User(db.Model):
     __tablename__ = "users"
 
-    id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
+    id = db.Column(CompactUUID, primary_key=True, default=generate_uuid)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     password = db.Column(db.String(200), nullable=False)  # hashed password
@@ -45,30 +100,52 @@ class User(db.Model):
     jobs = db.relationship("Job", backref="creator", lazy=True)
     applications = db.relationship("Application", backref="applicant", lazy=True)
 
+    __table_args__ = (
+        # verify_email looks users up by token; only pending verifications carry one
+        db.Index('ix_users_email_verification_token', 'email_verification_token',
+                 sqlite_where=db.text('email_verification_token IS NOT NULL'),
+                 postgresql_where=db.text('email_verification_token IS NOT NULL')),
+        # The unverified-account sweeper walks pending verifications by expiry
+        db.Index('ix_users_token_expiration', 'token_expiration',
+                 sqlite_where=db.text('token_expiration IS NOT NULL'),
+                 postgresql_where=db.text('token_expiration IS NOT NULL')),
+    )
+
     def __repr__(self):
         return f"<User {self.email}>"
 
-    # New: Password hashing and checking methods
+    # Password hashing and checking run on the auth hashing pool
     def set_password(self, plaintext_password):
-        self.password = generate_password_hash(plaintext_password)
+        self.password = hash_password(plaintext_password)
 
     def check_password(self, plaintext_password):
-        return check_password_hash(self.password, plaintext_password)
+        return verify_password(self.password, plaintext_password)
 
 
 class Job(db.Model):
     __tablename__ = "jobs"
 
-    id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
+    id = db.Column(CompactUUID, primary_key=True, default=generate_uuid)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.String(2000), nullable=False)
     location = db.Column(db.String(255), nullable=True)
     status = db.Column(db.Enum(JobStatus), default=JobStatus.DRAFT, nullable=False)
-    created_by = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
+    created_by = db.Column(CompactUUID, db.ForeignKey("users.id"), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow,
+                           onupdate=datetime.datetime.utcnow, nullable=False, index=True)
 
     applications = db.relationship("Application", backref="job", lazy=True)
 
+    __table_args__ = (
+        # Serves the keyset-paginated listing: filter on status, walk (created_at, id)
+        db.Index('ix_jobs_status_created_at_id', 'status', 'created_at', 'id'),
+        # Unfiltered listing (all non-draft statuses) walks this in order and stops at the limit
+        db.Index('ix_jobs_created_at_id', 'created_at', 'id'),
+        # Company ownership lookups and the NDJSON export
+        db.Index('ix_jobs_created_by_created_at_id', 'created_by', 'created_at', 'id'),
+    )
+
     def __repr__(self):
         return f"<Job {self.title} by {self.created_by}>"
 
@@ -76,17 +153,113 @@ class Job(db.Model):
 class Application(db.Model):
     __tablename__ = "applications"
 
-    id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
-    applicant_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
-    job_id = db.Column(db.String(36), db.ForeignKey("jobs.id"), nullable=False)
+    id = db.Column(CompactUUID, primary_key=True, default=generate_uuid)
+    applicant_id = db.Column(CompactUUID, db.ForeignKey("users.id"), nullable=False)
+    job_id = db.Column(CompactUUID, db.ForeignKey("jobs.id"), nullable=False)
     resume_link = db.Column(db.String(500), nullable=False)
     cover_letter = db.Column(db.String(200), nullable=True)
     status = db.Column(db.Enum(ApplicationStatus), default=ApplicationStatus.APPLIED, nullable=False)
     applied_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow,
+                           onupdate=datetime.datetime.utcnow, nullable=False)
 
     __table_args__ = (
         db.UniqueConstraint('applicant_id', 'job_id', name='unique_application_per_job'),
+        # Delta syncs (`since`) of an applicant's or a job's applications are one range probe each;
+        # the job one also serves per-job listings
+        db.Index('ix_applications_applicant_id_updated_at', 'applicant_id', 'updated_at'),
+        db.Index('ix_applications_job_id_updated_at', 'job_id', 'updated_at'),
     )
 
     def __repr__(self):
         return f"<Application {self.id} by {self.applicant_id} for Job {self.job_id}>"
+
+
+class ApplicationTombstone(db.Model):
+    __tablename__ = "application_tombstones"
+
+    # Withdrawn or deleted applications, so delta syncs can report them; purged after
+    # APPLICATION_TOMBSTONE_TTL_DAYS
+    id = db.Column(CompactUUID, primary_key=True)
+    applicant_id = db.Column(CompactUUID, nullable=False)
+    job_id = db.Column(CompactUUID, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=False, index=True)
+
+    __table_args__ = (
+        db.Index('ix_application_tombstones_applicant_id_deleted_at', 'applicant_id', 'deleted_at'),
+        db.Index('ix_application_tombstones_job_id_deleted_at', 'job_id', 'deleted_at'),
+    )
+
+    def __repr__(self):
+        return f"<ApplicationTombstone {self.id}>"
+
+
+class ArchivedJob(db.Model):
+    __tablename__ = "jobs_archive"
+
+    # Closed jobs moved out of jobs by `flask archive jobs`; read-only
+    id = db.Column(CompactUUID, primary_key=True)
+    title = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.String(2000), nullable=False)
+    location = db.Column(db.String(255), nullable=True)
+    status = db.Column(db.Enum(JobStatus), nullable=False)
+    created_by = db.Column(CompactUUID, nullable=False, index=True)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<ArchivedJob {self.title} by {self.created_by}>"
+
+
+class ArchivedApplication(db.Model):
+    __tablename__ = "applications_archive"
+
+    # Applications of archived jobs, moved in the same transaction as their job
+    id = db.Column(CompactUUID, primary_key=True)
+    applicant_id = db.Column(CompactUUID, nullable=False, index=True)
+    job_id = db.Column(CompactUUID, nullable=False, index=True)
+    resume_link = db.Column(db.String(500), nullable=False)
+    cover_letter = db.Column(db.String(200), nullable=True)
+    status = db.Column(db.Enum(ApplicationStatus), nullable=False)
+    applied_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<ArchivedApplication {self.id} by {self.applicant_id} for Job {self.job_id}>"
+
+
+class JobApplicationCount(db.Model):
+    __tablename__ = "job_application_counts"
+
+    # Denormalized per-job, per-status application counts for company dashboards
+    job_id = db.Column(CompactUUID, db.ForeignKey("jobs.id"), primary_key=True)
+    status = db.Column(db.Enum(ApplicationStatus), primary_key=True)
+    company_id = db.Column(CompactUUID, db.ForeignKey("users.id"), nullable=False, index=True)
+    count = db.Column(db.Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<JobApplicationCount {self.job_id} {self.status.value}={self.count}>"
+
+
+class EmailOutbox(db.Model):
+    __tablename__ = "email_outbox"
+
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.Enum(EmailStatus), default=EmailStatus.PENDING, nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.String(500), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # The dispatcher polls for due pending rows
+        db.Index('ix_email_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+    def __repr__(self):
+        return f"<EmailOutbox {self.id} to {self.recipient} ({self.status.value})>"
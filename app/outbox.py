@@ -0,0 +1,228 @@
+import datetime
+import logging
+import smtplib
+import statistics
+import threading
+import time
+from collections import deque
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import func
+from app.extensions import db
+from app.models import EmailOutbox, EmailStatus
+
+logger = logging.getLogger(__name__)
+
+# Errors that reject a single message without breaking the SMTP session
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+outbox_cli = AppGroup('outbox', help='Deliver queued emails.')
+
+
+# Most recent sent emails the latency percentiles are taken over
+STATS_WINDOW = 1000
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    if len(samples) == 1:
+        return round(samples[0] * 1000, 2)
+    return round(statistics.quantiles(samples, n=100)[pct - 1] * 1000, 2)
+
+
+def enqueue_email(recipient, subject, body):
+    # Added to the caller's session so the email commits (or rolls back) with the caller's data
+    email = EmailOutbox(recipient=recipient, subject=subject, body=body)
+    db.session.add(email)
+    return email
+
+
+def mail():
+    # flask_mail is imported by the first process that sends, not by every worker at startup
+    state = current_app.extensions.get('mail')
+    if state is None:
+        from flask_mail import Mail
+        state = Mail().init_app(current_app)
+    return state
+
+
+def retry_delay(attempts):
+    base = current_app.config['EMAIL_RETRY_BASE_SECONDS']
+    return min(base * 2 ** (attempts - 1), current_app.config['EMAIL_RETRY_MAX_SECONDS'])
+
+
+def dispatch_batch(batch_size=None):
+    batch_size = batch_size or current_app.config['EMAIL_BATCH_SIZE']
+    max_attempts = current_app.config['EMAIL_MAX_ATTEMPTS']
+    now = datetime.datetime.utcnow()
+
+    emails = claim_batch(now, batch_size)
+    if not emails:
+        return 0
+
+    from flask_mail import Message
+
+    sent = 0
+    pending = deque(emails)
+    try:
+        # One SMTP session for the whole batch
+        with mail().connect() as connection:
+            while pending:
+                email = pending[0]
+                message = Message(email.subject, recipients=[email.recipient], body=email.body)
+                try:
+                    connection.send(message)
+                except MESSAGE_ERRORS as e:
+                    pending.popleft()
+                    logger.warning("Failed to send email %s: %s", email.id, e)
+                    mark_failed(email, e, max_attempts)
+                    continue
+                pending.popleft()
+                email.status = EmailStatus.SENT
+                email.sent_at = datetime.datetime.utcnow()
+                email.attempts += 1
+                sent += 1
+    except (smtplib.SMTPException, OSError) as e:
+        # Connection-level failure: everything not yet sent is retried later
+        logger.warning("SMTP session failed, retrying %d emails later: %s", len(pending), e)
+        for email in pending:
+            mark_failed(email, e, max_attempts)
+
+    db.session.commit()
+    return sent
+
+
+def claim_batch(now, batch_size):
+    # SKIP LOCKED lets several workers drain the queue on Postgres, but SQLite ignores it, so each
+    # row is also claimed by pushing next_attempt_at out by a lease, conditional on the value read.
+    # Only one dispatcher's update matches; the others skip the row. If the claiming process dies
+    # mid-send, the email is retried once the lease runs out.
+    candidates = db.session.query(EmailOutbox.id, EmailOutbox.next_attempt_at).filter(
+        EmailOutbox.status == EmailStatus.PENDING,
+        EmailOutbox.next_attempt_at <= now
+    ).order_by(EmailOutbox.id).limit(batch_size).with_for_update(skip_locked=True).all()
+    if not candidates:
+        db.session.rollback()
+        return []
+
+    lease = now + datetime.timedelta(seconds=current_app.config['EMAIL_CLAIM_SECONDS'])
+    claimed = []
+    for email_id, next_attempt_at in candidates:
+        if db.session.query(EmailOutbox).filter(
+            EmailOutbox.id == email_id,
+            EmailOutbox.status == EmailStatus.PENDING,
+            EmailOutbox.next_attempt_at == next_attempt_at
+        ).update({EmailOutbox.next_attempt_at: lease}, synchronize_session=False):
+            claimed.append(email_id)
+    db.session.commit()
+    if not claimed:
+        return []
+    return db.session.query(EmailOutbox).filter(EmailOutbox.id.in_(claimed)).order_by(EmailOutbox.id).all()
+
+
+def mark_failed(email, error, max_attempts):
+    email.attempts += 1
+    email.last_error = str(error)[:500]
+    if email.attempts >= max_attempts:
+        email.status = EmailStatus.FAILED
+    else:
+        email.next_attempt_at = datetime.datetime.utcnow() + datetime.timedelta(
+            seconds=retry_delay(email.attempts)
+        )
+
+
+def queue_stats():
+    # Read from the table, so it covers every dispatcher process, not just this one
+    counts = dict(db.session.query(EmailOutbox.status, func.count(EmailOutbox.id)).group_by(EmailOutbox.status).all())
+    oldest = db.session.query(func.min(EmailOutbox.created_at)).filter(
+        EmailOutbox.status == EmailStatus.PENDING
+    ).scalar()
+    queued = [
+        (sent_at - created_at).total_seconds()
+        for sent_at, created_at in db.session.query(EmailOutbox.sent_at, EmailOutbox.created_at).filter(
+            EmailOutbox.status == EmailStatus.SENT
+        ).order_by(EmailOutbox.id.desc()).limit(STATS_WINDOW)
+    ]
+    return {
+        "sent": counts.get(EmailStatus.SENT, 0),
+        "failed": counts.get(EmailStatus.FAILED, 0),
+        "queue_depth": counts.get(EmailStatus.PENDING, 0),
+        "oldest_pending_seconds": round((datetime.datetime.utcnow() - oldest).total_seconds(), 1) if oldest else None,
+        # enqueue -> delivered, over the last STATS_WINDOW sent emails
+        "queued_ms_p50": percentile(queued, 50),
+        "queued_ms_p95": percentile(queued, 95),
+    }
+
+
+def run_dispatcher(stop_event=None):
+    interval = current_app.config['EMAIL_POLL_INTERVAL']
+    while not (stop_event and stop_event.is_set()):
+        try:
+            sent = dispatch_batch()
+        except Exception:
+            logger.exception("Email dispatch failed")
+            db.session.rollback()
+            sent = 0
+        finally:
+            db.session.remove()
+        # Keep draining while batches come back full, otherwise wait for new work
+        if sent < current_app.config['EMAIL_BATCH_SIZE']:
+            if stop_event:
+                stop_event.wait(interval)
+            else:
+                time.sleep(interval)
+
+
+_dispatcher_lock = threading.Lock()
+
+
+def start_dispatcher_thread(app):
+    stop_event = threading.Event()
+
+    def target():
+        with app.app_context():
+            run_dispatcher(stop_event)
+
+    thread = threading.Thread(target=target, name='email-outbox', daemon=True)
+    thread.start()
+    app.extensions['email_dispatcher'] = (thread, stop_event)
+    return thread
+
+
+def init_outbox(app):
+    app.cli.add_command(outbox_cli)
+    if app.config['EMAIL_DISPATCHER'] != 'thread':
+        return
+
+    # Started by the first request so CLI commands and test setups don't spawn a sender
+    @app.before_request
+    def ensure_dispatcher():
+        if 'email_dispatcher' in app.extensions or app.testing:
+            return
+        with _dispatcher_lock:
+            if 'email_dispatcher' not in app.extensions:
+                start_dispatcher_thread(app)
+
+
+@outbox_cli.command('dispatch')
+@click.option('--batch-size', type=int, default=None, help='Emails sent per SMTP connection.')
+def dispatch_command(batch_size):
+    """Send one batch of due emails."""
+    sent = dispatch_batch(batch_size)
+    click.echo(f"Sent {sent} emails.")
+
+
+@outbox_cli.command('worker')
+def worker_command():
+    """Run the dispatcher loop in the foreground."""
+    click.echo("Email outbox worker started.")
+    run_dispatcher()
+
+
+@outbox_cli.command('stats')
+def stats_command():
+    """Show queue depth and delivery latency."""
+    for key, value in queue_stats().items():
+        click.echo(f"{key}: {value}")
@@ -0,0 +1,102 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class QueryCountExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0  # time spent executing, also reported by app.metrics
+        self.statements = []
+        self.parameters = []
+        self._started = None
+
+    def record(self, statement, parameters=None):
+        self.count += 1
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+        self._started = time.perf_counter()
+
+    def finish(self):
+        # A counter belongs to one thread, whose statements run one at a time
+        if self._started is not None:
+            self.seconds += time.perf_counter() - self._started
+            self._started = None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'query_counter' in g:
+        g.query_counter.record(statement)
+    for counter in getattr(_local, 'counters', ()):
+        counter.record(statement, parameters)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'query_counter' in g:
+        g.query_counter.finish()
+    for counter in getattr(_local, 'counters', ()):
+        counter.finish()
+
+
+def request_endpoint():
+    return request.endpoint or request.path
+
+
+@contextmanager
+def count_queries():
+    # Counts every statement run on this thread inside the block, e.g. around a test client call
+    counter = QueryCounter()
+    counters = _local.__dict__.setdefault('counters', [])
+    counters.append(counter)
+    try:
+        yield counter
+    finally:
+        counters.remove(counter)
+
+
+def init_query_counter(app):
+    app.config.setdefault('SQLALCHEMY_QUERY_WARN_THRESHOLD', 20)
+    app.config.setdefault('SQLALCHEMY_MAX_QUERIES_PER_REQUEST', None)
+    app.config.setdefault('SQLALCHEMY_QUERY_COUNT_HEADER', False)
+
+    # Listening on the Engine class covers every engine, including binds created later
+    for name, listener in (('before_cursor_execute', _before_cursor_execute),
+                           ('after_cursor_execute', _after_cursor_execute)):
+        if not event.contains(Engine, name, listener):
+            event.listen(Engine, name, listener)
+
+    @app.before_request
+    def start_query_counter():
+        g.query_counter = QueryCounter()
+
+    @app.after_request
+    def check_query_count(response):
+        # Left on g for app.metrics, which reads it at teardown
+        counter = g.get('query_counter')
+        if counter is None:
+            return response
+
+        if counter.count > app.config['SQLALCHEMY_QUERY_WARN_THRESHOLD']:
+            logger.warning("%s ran %d SQL statements", request_endpoint(), counter.count)
+
+        limit = app.config['SQLALCHEMY_MAX_QUERIES_PER_REQUEST']
+        if limit is not None and counter.count > limit:
+            raise QueryCountExceeded(
+                f"{request_endpoint()} ran {counter.count} SQL statements (limit {limit})"
+            )
+
+        if app.config['SQLALCHEMY_QUERY_COUNT_HEADER']:
+            response.headers['X-Query-Count'] = str(counter.count)
+        return response
@@ -0,0 +1,181 @@
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+LIMIT_RE = re.compile(r'^\s*(\d+)\s*/\s*(second|minute|hour|day)\s*$')
+
+
+def parse_limit(spec):
+    # "10/minute" -> (capacity 10, refill 10/60 tokens per second); empty -> None (no bucket)
+    if not spec or not spec.strip():
+        return None
+    match = LIMIT_RE.match(spec)
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid rate limit {spec!r}, expected e.g. '10/minute'")
+    count = int(match.group(1))
+    return count, count / PERIODS[match.group(2)]
+
+
+class MemoryStore:
+    # Per-process buckets: key -> (tokens, last refill), least recently used evicted first
+
+    def __init__(self, maxsize=100000, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.timer = timer
+        self.buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, limits):
+        # limits: [(key, capacity, refill)]. Takes a token from every bucket and returns 0, or
+        # takes none and returns the seconds until all of them have one
+        now = self.timer()
+        buckets = self.buckets
+        with self._lock:
+            levels = []
+            wait = 0.0
+            for key, capacity, refill in limits:
+                state = buckets.get(key)
+                if state is None:
+                    tokens = capacity
+                else:
+                    tokens = state[0] + (now - state[1]) * refill
+                    if tokens > capacity:
+                        tokens = capacity
+                if tokens < 1:
+                    wait = max(wait, (1 - tokens) / refill)
+                levels.append(tokens)
+            if wait:
+                return wait
+            for (key, capacity, refill), tokens in zip(limits, levels):
+                if key in buckets:
+                    buckets.move_to_end(key)
+                buckets[key] = (tokens - 1, now)
+            while len(buckets) > self.maxsize:
+                buckets.popitem(last=False)
+        return 0.0
+
+    def __len__(self):
+        return len(self.buckets)
+
+
+# MemoryStore.acquire in one round trip: ARGV holds capacity, refill for each key. Runs on the
+# Redis clock so workers agree on elapsed time. Returned as a string: Redis truncates Lua numbers
+# to integers.
+REDIS_ACQUIRE = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+  local capacity, refill = tonumber(ARGV[2 * i - 1]), tonumber(ARGV[2 * i])
+  local state = redis.call('HMGET', key, 'tokens', 'stamp')
+  local tokens = tonumber(state[1]) or capacity
+  local stamp = tonumber(state[2]) or now
+  tokens = math.min(capacity, tokens + math.max(0, now - stamp) * refill)
+  if tokens < 1 then wait = math.max(wait, (1 - tokens) / refill) end
+  levels[i] = tokens
+end
+if wait == 0 then
+  for i, key in ipairs(KEYS) do
+    local capacity, refill = tonumber(ARGV[2 * i - 1]), tonumber(ARGV[2 * i])
+    redis.call('HSET', key, 'tokens', levels[i] - 1, 'stamp', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / refill * 1000))
+  end
+end
+return tostring(wait)
+"""
+
+
+class RedisStore:
+    # Buckets shared by every worker; `client` is anything with the redis-py API. Keys expire
+    # once their bucket would be full again.
+
+    def __init__(self, client, prefix='jobboard:ratelimit:'):
+        self.prefix = prefix
+        self.script = client.register_script(REDIS_ACQUIRE)
+
+    def acquire(self, limits):
+        keys, args = [], []
+        for key, capacity, refill in limits:
+            keys.append(self.prefix + key)
+            args += (capacity, refill)
+        return float(self.script(keys=keys, args=args))
+
+    def __len__(self):
+        return 0
+
+
+class RateLimiter:
+    def __init__(self, store, limits):
+        self.store = store
+        # name -> (per-IP bucket, per-identity bucket), each (capacity, refill) or None
+        self.limits = {name: (parse_limit(ip), parse_limit(identity)) for name, (ip, identity) in limits.items()}
+        self.limited = 0
+
+    def check(self, name, identity=None):
+        # Seconds the client has to wait, 0 when the request may go ahead. Tokens are only taken
+        # when every bucket has one, so a flood the per-IP limit turns away can't also drain (and
+        # lock out) the identity it names.
+        ip_limit, identity_limit = self.limits.get(name, (None, None))
+        limits = []
+        if ip_limit is not None:
+            limits.append((f"{name}:ip:{request.remote_addr}", *ip_limit))
+        if identity_limit is not None and identity:
+            limits.append((f"{name}:id:{identity}", *identity_limit))
+        if not limits:
+            return 0.0
+        try:
+            wait = self.store.acquire(limits)
+        except Exception:
+            # A shared store that is down must not take logins down with it
+            logger.exception("Rate limit store failed, allowing request")
+            return 0.0
+        if wait:
+            self.limited += 1
+        return wait
+
+
+def request_email():
+    # Identity for the unauthenticated auth endpoints: the account being logged into or registered
+    data = request.get_json(silent=True)
+    email = data.get('email') if isinstance(data, dict) else None
+    return email.strip().lower() if isinstance(email, str) else None
+
+
+def rate_limit(name, identity=get_jwt_identity):
+    # Token buckets from RATE_LIMITS[name], per client IP and per identity(). Goes below
+    # role_required so the JWT identity is available.
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            limiter = current_app.extensions.get('rate_limiter')
+            if limiter is not None:
+                wait = limiter.check(name, identity())
+                if wait:
+                    response = jsonify({"error": "Too many requests"})
+                    response.headers['Retry-After'] = str(math.ceil(wait))
+                    return response, 429
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def init_rate_limiter(app):
+    backend_name = app.config['RATE_LIMIT_BACKEND']
+    if backend_name == 'memory':
+        store = MemoryStore(maxsize=app.config['RATE_LIMIT_MAX_KEYS'])
+    elif backend_name == 'redis':
+        import redis  # optional dependency, only needed for the shared store
+        store = RedisStore(redis.Redis.from_url(app.config['RATE_LIMIT_REDIS_URL']))
+    else:
+        store = None
+    app.extensions['rate_limiter'] = RateLimiter(store, app.config['RATE_LIMITS']) if store is not None else None
@@ -0,0 +1,126 @@
+import datetime
+import importlib.util
+import threading
+import time
+from collections import Counter
+from flask import current_app
+from sqlalchemy import exists, func, select
+from app.extensions import db
+from app.models import Application, Job, JobStatus
+
+_recommender_lock = threading.Lock()
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class Recommender:
+    # Per-process JobIndex of open jobs. It is built once from the jobs table, then catches up
+    # with jobs changed by any worker through jobs.updated_at (indexed) at most every
+    # RECOMMENDATIONS_SYNC_INTERVAL seconds; this worker's own changes are picked up right away.
+    def __init__(self, app):
+        from app.job_vectors import JobIndex  # numpy and scipy are only imported here
+
+        self.index = JobIndex(
+            n_features=app.config['RECOMMENDATIONS_FEATURES'], max_terms=app.config['RECOMMENDATIONS_QUERY_TERMS']
+        )
+        self.sync_interval = app.config['RECOMMENDATIONS_SYNC_INTERVAL']
+        # Re-read rows this far behind the watermark, for transactions that committed late
+        self.overlap = datetime.timedelta(seconds=app.config['RECOMMENDATIONS_SYNC_OVERLAP'])
+        self.history = app.config['RECOMMENDATIONS_HISTORY']
+        self.watermark = None
+        self.synced_at = None
+        self._lock = threading.Lock()
+
+    def sync(self):
+        if self.synced_at is not None and time.monotonic() - self.synced_at < self.sync_interval:
+            return
+        with self._lock:
+            if self.synced_at is not None and time.monotonic() - self.synced_at < self.sync_interval:
+                return
+            started = time.monotonic()
+            watermark = db.session.query(func.max(Job.updated_at)).scalar()
+            columns = select(Job.id, Job.title, Job.description, Job.updated_at)
+            if self.watermark is None:
+                rows = db.session.execute(
+                    columns.where(Job.status == JobStatus.OPEN).execution_options(yield_per=5000)
+                )
+                self.index.load(tuple(row) for row in rows)
+            elif watermark is not None:
+                rows = db.session.execute(
+                    columns.add_columns(Job.status).where(Job.updated_at >= self.watermark - self.overlap)
+                )
+                for job_id, title, description, updated_at, status in rows:
+                    if status == JobStatus.OPEN:
+                        self.index.upsert(job_id, title, description, updated_at)
+                    else:
+                        self.index.remove(job_id)
+            self.watermark = watermark or self.watermark or EPOCH
+            self.synced_at = started
+
+    def expire(self):
+        self.synced_at = float('-inf')
+
+    def recommend(self, applicant_id, limit):
+        # (job_id, score) for the open jobs closest to the applicant's recent applications
+        from app.job_vectors import vectorize
+
+        self.sync()
+        history = db.session.query(Job.id, Job.title, Job.description).join(
+            Application, Application.job_id == Job.id
+        ).filter(Application.applicant_id == applicant_id).order_by(
+            Application.applied_at.desc()
+        ).limit(self.history).all()
+        if not history:
+            return [], 0
+
+        profile = Counter()
+        for _, title, description in history:
+            indices, values = vectorize(title, description, self.index.n_features)
+            for index, value in zip(indices.tolist(), values.tolist()):
+                profile[index] += value
+        indices = list(profile)
+        values = [profile[index] for index in indices]
+        # Extra candidates make up for applied-to jobs older than the history window
+        matches = self.index.query(indices, values, limit * 2, exclude=[row.id for row in history])
+        return matches, len(history)
+
+
+def available():
+    return all(importlib.util.find_spec(name) is not None for name in ('numpy', 'scipy'))
+
+
+def recommender():
+    app = current_app._get_current_object()
+    instance = app.extensions.get('recommender')
+    if instance is None:
+        if not available():
+            return None
+        with _recommender_lock:
+            instance = app.extensions.get('recommender')
+            if instance is None:
+                instance = app.extensions['recommender'] = Recommender(app)
+    return instance
+
+
+def jobs_changed():
+    # Called after job writes commit; the next recommendation request syncs first
+    instance = current_app.extensions.get('recommender')
+    if instance is not None:
+        instance.expire()
+
+
+def job_removed(job_id):
+    # Deleted rows leave no updated_at behind for sync() to find
+    instance = current_app.extensions.get('recommender')
+    if instance is not None:
+        instance.index.remove(job_id)
+
+
+def unapplied(job_ids, applicant_id):
+    # Filter for the final read: not applied to since the history was read. Callers check
+    # status on the fetched rows; with status in the WHERE clause SQLite walks the status
+    # index over every open job instead of the primary key.
+    return [
+        Job.id.in_(job_ids),
+        ~exists().where(Application.job_id == Job.id, Application.applicant_id == applicant_id),
+    ]
@@ -0,0 +1,237 @@
+import re
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import DDL, event, text, bindparam, false, func, literal_column, select, Float
+from app.extensions import db
+from app.models import Job
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# SQLite: FTS5 table plus a docs table that gives each job a stable integer rowid
+SQLITE_DDL = [
+    "CREATE TABLE IF NOT EXISTS jobs_fts_docs ("
+    "doc_id INTEGER PRIMARY KEY, job_id BLOB NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+    "title, description, location, tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+]
+
+# Let db.create_all()/drop_all() manage the SQLite search tables alongside jobs
+for statement in SQLITE_DDL:
+    event.listen(Job.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for table in ('jobs_fts', 'jobs_fts_docs'):
+    event.listen(Job.__table__, 'after_drop', DDL(f"DROP TABLE IF EXISTS {table}").execute_if(dialect='sqlite'))
+
+# Postgres: expression GIN indexes, the query expressions below must match them exactly
+PG_KEYWORD_VECTOR = "to_tsvector('simple', coalesce(jobs.title, '') || ' ' || coalesce(jobs.description, ''))"
+PG_LOCATION_VECTOR = "to_tsvector('simple', coalesce(jobs.location, ''))"
+
+# Column weights for bm25(): title, description, location
+SQLITE_RANK = "bm25(jobs_fts, 10.0, 1.0, 0.0)"
+
+search_cli = AppGroup('search', help='Manage the job search index.')
+
+
+def tokenize(value):
+    return TOKEN_RE.findall((value or '').lower())
+
+
+def backend():
+    configured = current_app.config.get('SEARCH_BACKEND', 'auto')
+    if configured != 'auto':
+        return configured
+    dialect = db.engine.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        return dialect
+    return 'ilike'
+
+
+def fts5_match(keyword=None, location=None):
+    clauses = []
+    keyword_tokens = tokenize(keyword)
+    location_tokens = tokenize(location)
+    if keyword_tokens:
+        terms = ' AND '.join(f'"{token}"*' for token in keyword_tokens)
+        clauses.append(f'{{title description}} : ({terms})')
+    if location_tokens:
+        terms = ' AND '.join(f'"{token}"*' for token in location_tokens)
+        clauses.append(f'location : ({terms})')
+    return ' AND '.join(clauses)
+
+
+def tsquery(value):
+    return ' & '.join(f'{token}:*' for token in tokenize(value))
+
+
+def filter_jobs(query, keyword=None, location=None):
+    # Returns the filtered query and, when a keyword was given, a rank expression (lower is better)
+    if not keyword and not location:
+        return query, None
+
+    mode = backend()
+
+    if mode == 'sqlite':
+        match = fts5_match(keyword, location)
+        if not match:
+            return query.filter(false()), None
+        if not keyword:
+            # Recency-ordered, so membership is all that's needed. The unary + keeps SQLite walking
+            # the created_at index and probing the match set rather than sorting every match.
+            return query.filter(text(
+                "+jobs.id IN (SELECT d.job_id FROM jobs_fts JOIN jobs_fts_docs d ON d.doc_id = jobs_fts.rowid "
+                "WHERE jobs_fts MATCH :match)"
+            ).bindparams(match=match)), None
+        # bm25() costs the same for every row it scores, so only the newest SEARCH_RANK_WINDOW matches
+        # are ranked: FTS5 walks doc ids (indexing order) downwards and stops there, instead of a
+        # common term scoring most of the table before ORDER BY ... LIMIT
+        matches = text(
+            f"SELECT d.job_id AS job_id, m.rank AS rank FROM ("
+            f"SELECT rowid AS doc_id, {SQLITE_RANK} AS rank FROM jobs_fts WHERE jobs_fts MATCH :match "
+            "ORDER BY rowid DESC LIMIT :window"
+            ") m JOIN jobs_fts_docs d ON d.doc_id = m.doc_id"
+        ).bindparams(match=match, window=current_app.config['SEARCH_RANK_WINDOW'] or -1)
+        matches = matches.columns(job_id=Job.id.type, rank=Float).subquery('matches')
+        query = query.join(matches, matches.c.job_id == Job.id)
+        return query, matches.c.rank
+
+    if mode == 'postgresql':
+        rank = None
+        if keyword:
+            terms = tsquery(keyword)
+            if not terms:
+                return query.filter(false()), None
+            vector = literal_column(PG_KEYWORD_VECTOR)
+            ts_query = func.to_tsquery(literal_column("'simple'"), terms)
+            query = query.filter(vector.op('@@')(ts_query))
+            rank = -func.ts_rank(vector, ts_query)
+        if location:
+            terms = tsquery(location)
+            if not terms:
+                return query.filter(false()), None
+            vector = literal_column(PG_LOCATION_VECTOR)
+            query = query.filter(vector.op('@@')(func.to_tsquery(literal_column("'simple'"), terms)))
+        return query, rank
+
+    # Fallback for other databases: unindexed substring matching
+    if location:
+        query = query.filter(Job.location.ilike(f"%{location}%"))
+    if keyword:
+        query = query.filter(
+            (Job.title.ilike(f"%{keyword}%")) | (Job.description.ilike(f"%{keyword}%"))
+        )
+    return query, None
+
+
+def job_id_param():
+    # Raw SQL binds job ids through the model's column type so they match the stored form
+    return bindparam('job_id', type_=Job.id.type)
+
+
+def index_job(job):
+    # Runs inside the caller's transaction; the job must already be flushed
+    if backend() != 'sqlite':
+        return
+    db.session.execute(
+        text("INSERT OR IGNORE INTO jobs_fts_docs (job_id) VALUES (:job_id)").bindparams(job_id_param()),
+        {"job_id": job.id}
+    )
+    doc_id = db.session.execute(
+        text("SELECT doc_id FROM jobs_fts_docs WHERE job_id = :job_id").bindparams(job_id_param()),
+        {"job_id": job.id}
+    ).scalar()
+    db.session.execute(text("DELETE FROM jobs_fts WHERE rowid = :doc_id"), {"doc_id": doc_id})
+    db.session.execute(
+        text("INSERT INTO jobs_fts (rowid, title, description, location) "
+             "VALUES (:doc_id, :title, :description, :location)"),
+        {"doc_id": doc_id, "title": job.title, "description": job.description,
+         "location": job.location or ''}
+    )
+
+
+def index_jobs(job_ids):
+    # Set-based variant of index_job for bulk writes; reads the current rows from jobs
+    if backend() != 'sqlite' or not job_ids:
+        return
+    ids = bindparam('ids', expanding=True, type_=Job.id.type)
+    db.session.execute(
+        text("DELETE FROM jobs_fts WHERE rowid IN "
+             "(SELECT doc_id FROM jobs_fts_docs WHERE job_id IN :ids)").bindparams(ids),
+        {"ids": list(job_ids)}
+    )
+    db.session.execute(
+        text("INSERT OR IGNORE INTO jobs_fts_docs (job_id) SELECT id FROM jobs WHERE id IN :ids")
+        .bindparams(ids),
+        {"ids": list(job_ids)}
+    )
+    db.session.execute(
+        text("INSERT INTO jobs_fts (rowid, title, description, location) "
+             "SELECT d.doc_id, j.title, j.description, coalesce(j.location, '') "
+             "FROM jobs j JOIN jobs_fts_docs d ON d.job_id = j.id WHERE j.id IN :ids")
+        .bindparams(ids),
+        {"ids": list(job_ids)}
+    )
+
+
+def remove_job(job_id):
+    if backend() != 'sqlite':
+        return
+    doc_id = db.session.execute(
+        text("SELECT doc_id FROM jobs_fts_docs WHERE job_id = :job_id").bindparams(job_id_param()),
+        {"job_id": job_id}
+    ).scalar()
+    if doc_id is None:
+        return
+    db.session.execute(text("DELETE FROM jobs_fts WHERE rowid = :doc_id"), {"doc_id": doc_id})
+    db.session.execute(text("DELETE FROM jobs_fts_docs WHERE doc_id = :doc_id"), {"doc_id": doc_id})
+
+
+def remove_jobs(job_ids):
+    # Set-based variant of remove_job
+    if backend() != 'sqlite' or not job_ids:
+        return
+    ids = bindparam('ids', expanding=True, type_=Job.id.type)
+    db.session.execute(
+        text("DELETE FROM jobs_fts WHERE rowid IN "
+             "(SELECT doc_id FROM jobs_fts_docs WHERE job_id IN :ids)").bindparams(ids),
+        {"ids": list(job_ids)}
+    )
+    db.session.execute(
+        text("DELETE FROM jobs_fts_docs WHERE job_id IN :ids").bindparams(ids),
+        {"ids": list(job_ids)}
+    )
+
+
+def create_search_tables():
+    for statement in SQLITE_DDL:
+        db.session.execute(text(statement))
+
+
+@search_cli.command('backfill')
+@click.option('--batch-size', default=1000, show_default=True, help='Jobs indexed per transaction.')
+def backfill(batch_size):
+    """Rebuild the search index from the jobs table."""
+    mode = backend()
+    if mode != 'sqlite':
+        click.echo(f"Nothing to backfill: the '{mode}' backend is maintained by the database.")
+        return
+
+    create_search_tables()
+    db.session.execute(text("DELETE FROM jobs_fts"))
+    db.session.execute(text("DELETE FROM jobs_fts_docs"))
+    db.session.commit()
+
+    indexed = 0
+    last_id = None
+    while True:
+        batch = select(Job.id).order_by(Job.id).limit(batch_size)
+        if last_id is not None:
+            batch = batch.where(Job.id > last_id)
+        ids = db.session.execute(batch).scalars().all()
+        if not ids:
+            break
+        index_jobs(ids)
+        db.session.commit()
+        indexed += len(ids)
+        last_id = ids[-1]
+
+    click.echo(f"Indexed {indexed} jobs.")
@@ -0,0 +1,153 @@
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import DateTime, Enum
+from app.models import Application, ArchivedApplication, ArchivedJob, Job, User
+from app.metrics import timed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class Schema:
+    # Output name -> column. Queries select Schema.select(fields) and rows are read by position,
+    # so read-only lists never build ORM instances.
+    def __init__(self, **columns):
+        self.columns = columns
+        self._compiled = {}
+
+    def select(self, fields=None):
+        return [self.columns[field] for field in (fields or self.columns)]
+
+    def compile(self, fields=None):
+        fields = tuple(fields or self.columns)
+        serializer = self._compiled.get(fields)
+        if serializer is None:
+            serializer = self._compiled[fields] = compile_row(fields, self.select(fields))
+        return serializer
+
+    def one(self, row, fields=None):
+        return self.compile(fields)(row)
+
+    def many(self, rows, fields=None):
+        serialize = self.compile(fields)
+        with timed('serialization'):
+            return [serialize(row) for row in rows]
+
+
+def compile_row(names, columns):
+    # Builds `lambda row: {"id": row[0], "status": row[1].value, ...}` once per field list, so
+    # serializing a row is a single dict literal with no per-field type checks
+    items = []
+    for index, (name, column) in enumerate(zip(names, columns)):
+        value = f"row[{index}]"
+        if isinstance(column.type, Enum):
+            value = f"({value}.value if {value} is not None else None)"
+        elif isinstance(column.type, DateTime):
+            value = f"({value}.isoformat() if {value} is not None else None)"
+        items.append(f"{name!r}: {value}")
+    return eval(f"lambda row: {{{', '.join(items)}}}", {})
+
+
+JOB = Schema(
+    id=Job.id,
+    title=Job.title,
+    description=Job.description,
+    location=Job.location,
+    status=Job.status,
+    created_by=Job.created_by,
+    created_at=Job.created_at,
+    updated_at=Job.updated_at,
+)
+
+# An applicant's own applications
+APPLICANT_APPLICATION = Schema(
+    id=Application.id,
+    job_id=Application.job_id,
+    job_title=Job.title,
+    status=Application.status,
+    applied_at=Application.applied_at,
+    resume_link=Application.resume_link,
+    cover_letter=Application.cover_letter,
+)
+
+# Applications to one of a company's jobs
+JOB_APPLICATION = Schema(
+    id=Application.id,
+    applicant_id=Application.applicant_id,
+    applicant_name=User.name,
+    status=Application.status,
+    applied_at=Application.applied_at,
+    resume_link=Application.resume_link,
+    cover_letter=Application.cover_letter,
+)
+
+# Archive fallbacks, same output as their hot-table counterparts
+ARCHIVED_JOB = Schema(
+    id=ArchivedJob.id,
+    title=ArchivedJob.title,
+    description=ArchivedJob.description,
+    location=ArchivedJob.location,
+    status=ArchivedJob.status,
+    created_by=ArchivedJob.created_by,
+    created_at=ArchivedJob.created_at,
+    updated_at=ArchivedJob.updated_at,
+)
+
+ARCHIVED_APPLICANT_APPLICATION = Schema(
+    id=ArchivedApplication.id,
+    job_id=ArchivedApplication.job_id,
+    job_title=ArchivedJob.title,
+    status=ArchivedApplication.status,
+    applied_at=ArchivedApplication.applied_at,
+    resume_link=ArchivedApplication.resume_link,
+    cover_letter=ArchivedApplication.cover_letter,
+)
+
+ARCHIVED_JOB_APPLICATION = Schema(
+    id=ArchivedApplication.id,
+    applicant_id=ArchivedApplication.applicant_id,
+    applicant_name=User.name,
+    status=ArchivedApplication.status,
+    applied_at=ArchivedApplication.applied_at,
+    resume_link=ArchivedApplication.resume_link,
+    cover_letter=ArchivedApplication.cover_letter,
+)
+
+USER = Schema(
+    id=User.id,
+    name=User.name,
+    email=User.email,
+    role=User.role,
+    is_verified=User.is_verified,
+)
+
+
+class JSONProvider(DefaultJSONProvider):
+    # orjson when it is installed, Flask's stdlib encoder otherwise. Output is UTF-8 rather than
+    # ASCII-escaped; anything orjson can't encode natively goes through Flask's default().
+    def dumps(self, obj, **kwargs):
+        if orjson is None or set(kwargs) - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj, indent=kwargs.get('indent')).decode()
+
+    def dumps_bytes(self, obj, indent=None):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        with timed('serialization'):
+            if orjson is None:
+                return super().response(*args, **kwargs)
+            obj = self._prepare_response_obj(args, kwargs)
+            indent = (self.compact is None and self._app.debug) or self.compact is False
+            return self._app.response_class(self.dumps_bytes(obj, indent) + b"\n", mimetype=self.mimetype)
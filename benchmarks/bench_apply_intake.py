@@ -0,0 +1,111 @@
+"""Sustained POST /api/applications throughput from concurrent clients, with the synchronous intake
+path and with group commit (APPLICATION_INTAKE_MODE=batch), against a target of 10x the current peak.
+
+Every client is one applicant applying to a run of open jobs, a share of them twice, so duplicate
+rejection is exercised too. Each mode runs in a fresh interpreter because the settings are read
+from the environment when the app is configured.
+
+Usage: python -m benchmarks.bench_apply_intake [--peak 50] [--clients 32] [--applications 200]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+MODES = ('sync', 'batch')
+
+
+def client(app, token, job_ids, results):
+    headers = {'Authorization': f'Bearer {token}'}
+    statuses = {}
+    with app.test_client() as http:
+        for job_id in job_ids:
+            response = http.post('/api/applications', headers=headers,
+                                 json={'job_id': job_id, 'resume_link': 'https://example.com/cv'})
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    results.append(statuses)
+
+
+def run_mode(clients, applications, duplicates):
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from app.extensions import db
+    from app.models import Application, Job
+    from benchmarks.seed import seed_companies, seed_applicants, seed_jobs
+
+    app = create_app()
+    rng = random.Random(1)
+    with app.app_context():
+        Job.metadata.create_all(db.engine)
+        applicants = seed_applicants(clients)
+        job_ids = seed_jobs(seed_companies(10), applications, rng=rng, draft_ratio=0)
+        tokens = [create_access_token(identity=applicant_id, additional_claims={"role": "applicant"})
+                  for applicant_id in applicants]
+
+    plans = []
+    for _ in applicants:
+        plan = list(job_ids)
+        plan += rng.sample(job_ids, int(len(job_ids) * duplicates))
+        rng.shuffle(plan)
+        plans.append(plan)
+
+    results = []
+    threads = [threading.Thread(target=client, args=(app, token, plan, results)) for token, plan in zip(tokens, plans)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    statuses = {}
+    for result in results:
+        for code, count in result.items():
+            statuses[code] = statuses.get(code, 0) + count
+    with app.app_context():
+        stored = db.session.query(Application).count()
+    return {
+        'requests': sum(statuses.values()),
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        'stored': stored,
+        'applications_per_s': round(statuses.get(201, 0) / elapsed, 1),
+        'requests_per_s': round(sum(statuses.values()) / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--peak', type=float, default=50, help='Current peak applications per second.')
+    parser.add_argument('--clients', type=int, default=32, help='Concurrent applicants.')
+    parser.add_argument('--applications', type=int, default=200, help='Distinct jobs each applicant applies to.')
+    parser.add_argument('--duplicates', type=float, default=0.05, help='Share of applications sent twice.')
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.clients, args.applications, args.duplicates)))
+        return
+
+    target = args.peak * 10
+    print(f"target: {target:.0f} applications/s (10x peak of {args.peak:.0f})")
+    for mode in MODES:
+        env = dict(os.environ, APPLICATION_INTAKE_MODE=mode, EMAIL_DISPATCHER='worker', RATE_LIMIT_BACKEND='none')
+        env['DATABASE_URL'] = f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite3"
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_apply_intake', '--mode', mode,
+             '--clients', str(args.clients), '--applications', str(args.applications),
+             '--duplicates', str(args.duplicates)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        verdict = 'ok' if result['applications_per_s'] >= target else 'below target'
+        print(f"{mode:>6}: {json.dumps(result)} {verdict}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Concurrent apply_job-shaped write transactions against one SQLite file, with SQLite's defaults
+and with the tuned engine settings (WAL, synchronous=NORMAL, busy_timeout, pool).
+
+Each variant runs in a fresh interpreter because the settings are read from the environment when
+the app is configured.
+
+Usage: python -m benchmarks.bench_db_concurrency [--workers 16] [--applications 200]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+VARIANTS = {
+    'defaults': {
+        'SQLITE_JOURNAL_MODE': '',
+        'SQLITE_SYNCHRONOUS': '',
+        'SQLITE_BUSY_TIMEOUT_MS': '',
+        'SQLITE_MMAP_SIZE': '',
+        'SQLALCHEMY_POOL_SIZE': '5',
+        'SQLALCHEMY_MAX_OVERFLOW': '10',
+    },
+    'tuned': {},
+}
+
+
+def apply_once(db, applicant_id, job_id):
+    # Same statements as POST /api/applications: job lookup, insert, counter upsert, commit
+    from app.models import Application, Job, JobStatus, ApplicationStatus
+    from app.blueprints.applications import counters
+
+    job = db.session.query(Job.id, Job.created_by).filter(
+        Job.id == job_id, Job.status == JobStatus.OPEN
+    ).first()
+    db.session.add(Application(applicant_id=applicant_id, job_id=job.id, resume_link='https://example.com/cv'))
+    counters.bump(job.id, job.created_by, ApplicationStatus.APPLIED, 1)
+    db.session.commit()
+
+
+def worker(args):
+    # Runs in its own process, like one gunicorn worker
+    applicant_id, job_ids = args
+    from sqlalchemy.exc import OperationalError
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    committed, errors = 0, []
+    with app.app_context():
+        for job_id in job_ids:
+            try:
+                apply_once(db, applicant_id, job_id)
+                committed += 1
+            except OperationalError as e:
+                db.session.rollback()
+                errors.append(str(e.orig))
+    return committed, errors
+
+
+def run_variant(workers, applications):
+    from app import create_app
+    from app.extensions import db
+    from app.models import Job
+    from benchmarks.seed import seed_companies, seed_applicants, seed_jobs
+
+    app = create_app()
+    with app.app_context():
+        Job.metadata.create_all(db.engine)
+        applicants = seed_applicants(workers)
+        job_ids = seed_jobs(seed_companies(10), applications, rng=random.Random(1), draft_ratio=0)
+        db.engine.dispose()
+
+    context = multiprocessing.get_context('fork')
+    with context.Pool(workers) as pool:
+        start = time.perf_counter()
+        results = pool.map(worker, [(applicant_id, job_ids) for applicant_id in applicants])
+        elapsed = time.perf_counter() - start
+
+    committed = sum(result[0] for result in results)
+    errors = [error for result in results for error in result[1]]
+    return {
+        'committed': committed,
+        'failed': len(errors),
+        'tx_per_s': round(committed / elapsed, 1),
+        'errors': sorted(set(errors))[:3],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=16, help='Concurrent writer processes.')
+    parser.add_argument('--applications', type=int, default=200, help='Applications per worker.')
+    parser.add_argument('--variant', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.workers, args.applications)))
+        return
+
+    for name, overrides in VARIANTS.items():
+        env = dict(os.environ, **overrides)
+        env['DATABASE_URL'] = f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite3"
+        env['EMAIL_DISPATCHER'] = 'worker'
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_db_concurrency', '--variant', name,
+             '--workers', str(args.workers), '--applications', str(args.applications)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        print(f"{name:>9}: {output.strip().splitlines()[-1]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Throughput of GET /api/jobs on a read-heavy mix, with and without the response cache.
+
+Usage: python -m benchmarks.bench_list_cache [--jobs 50000] [--requests 2000] [--write-ratio 0.02]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+READS = [
+    {},
+    {'status': 'Open'},
+    {'status': 'Closed'},
+    {'keyword': 'python'},
+    {'keyword': 'senior engineer'},
+    {'location': 'berlin'},
+    {'location': 'remote', 'keyword': 'data'},
+    {'fields': 'title,location,status'},
+    {'status': 'Open', 'limit': '50'},
+    {'keyword': 'platform', 'status': 'Open'},
+]
+
+
+def run(app, job_ids, token, requests, write_ratio):
+    rng = random.Random(1)
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    start = time.perf_counter()
+    for _ in range(requests):
+        if rng.random() < write_ratio:
+            op = {'op': 'update', 'id': rng.choice(job_ids), 'title': f'Senior Engineer {rng.random():.4f}'}
+            response = client.post('/api/jobs/bulk', data=json.dumps(op), headers=headers)
+        else:
+            response = client.get('/api/jobs', query_string=rng.choice(READS))
+        assert response.status_code == 200, response.get_json()
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--jobs', type=int, default=50000)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--write-ratio', type=float, default=0.02)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite3"
+    os.environ['EMAIL_DISPATCHER'] = 'worker'
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from app.cache import init_response_cache
+    from app.extensions import db
+    from app.models import Job
+    from benchmarks.seed import seed_companies, seed_jobs
+
+    app = create_app()
+    with app.app_context():
+        Job.metadata.create_all(db.engine)
+        companies = seed_companies(1)
+        job_ids = seed_jobs(companies, args.jobs)
+        token = create_access_token(identity=companies[0], additional_claims={"role": "company"})
+    app.test_cli_runner().invoke(args=['search', 'backfill'])
+
+    print(f"{'cache':>8} {'req/s':>10}")
+    for backend in ('none', 'memory'):
+        app.config['RESPONSE_CACHE_BACKEND'] = backend
+        init_response_cache(app)
+        rate = run(app, job_ids, token, args.requests, args.write_ratio)
+        print(f"{backend:>8} {rate:>10.1f}")
+        if app.extensions['response_cache'] is not None:
+            print(json.dumps(app.extensions['response_cache'].stats()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Login throughput for different hashing pool sizes and cost settings.
+
+Usage: python -m benchmarks.bench_password_hashing [--pool-sizes 0,1,2,4] [--threads 16]
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+METHODS = ['pbkdf2:sha256:100000', 'pbkdf2:sha256:600000', 'scrypt:16384:8:1', 'scrypt:32768:8:1']
+PASSWORD = 'correct horse battery staple'
+
+
+def seed_users(app, count):
+    from sqlalchemy import insert
+    from werkzeug.security import generate_password_hash
+    from app.extensions import db
+    from app.models import User, UserRole, generate_uuid
+
+    method = app.config['PASSWORD_HASH_METHOD']
+    with app.app_context():
+        User.metadata.drop_all(db.engine)
+        User.metadata.create_all(db.engine)
+        db.session.execute(insert(User), [{
+            "id": generate_uuid(),
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "password": generate_password_hash(PASSWORD, method),
+            "role": UserRole.APPLICANT,
+            "is_verified": True,
+        } for i in range(count)])
+        db.session.commit()
+
+
+def run(app, logins, threads):
+    def login(i):
+        with app.test_client() as client:
+            response = client.post('/api/auth/login', json={
+                "email": f"user{i % 50}@example.com", "password": PASSWORD
+            })
+            assert response.status_code == 200, response.get_json()
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(login, range(threads)))  # warm the hashing pool
+        start = time.perf_counter()
+        list(executor.map(login, range(logins)))
+    return logins / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pool-sizes', default=f"0,1,2,{os.cpu_count()}")
+    parser.add_argument('--methods', default=','.join(METHODS))
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--logins', type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite3"
+    os.environ['EMAIL_DISPATCHER'] = 'worker'
+    os.environ['RATE_LIMIT_BACKEND'] = 'none'  # every login comes from one address
+    from app import create_app
+    app = create_app()
+
+    print(f"{'method':>24} {'pool':>5} {'logins/s':>10}")
+    for method in args.methods.split(','):
+        app.config['PASSWORD_HASH_METHOD'] = method
+        seed_users(app, 50)
+        for pool_size in [int(s) for s in args.pool_sizes.split(',')]:
+            app.config['PASSWORD_HASH_POOL_SIZE'] = pool_size
+            print(f"{method:>24} {pool_size:>5} {run(app, args.logins, args.threads):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Insert throughput and index size of random UUID4 string keys vs compact UUIDv7 keys.
+
+Builds an applications-shaped table (primary key, two foreign keys, the unique pair and the
+job_id index) once per key scheme and inserts the same number of rows into each.
+
+Usage: python -m benchmarks.bench_primary_keys [--rows 1000000] [--batch-size 5000]
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+import sqlalchemy as sa
+
+SCHEMES = {
+    'uuid4 string': (sa.String(36), lambda: str(uuid.uuid4())),
+    'uuid7 compact': (None, None),  # filled in from app.models in main()
+}
+
+
+def build_table(metadata, key_type):
+    return sa.Table(
+        'applications', metadata,
+        sa.Column('id', key_type, primary_key=True),
+        sa.Column('applicant_id', key_type, nullable=False),
+        sa.Column('job_id', key_type, nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.UniqueConstraint('applicant_id', 'job_id', name='unique_application_per_job'),
+        sa.Index('ix_applications_job_id', 'job_id'),
+    )
+
+
+def index_sizes(connection):
+    # dbstat is optional in SQLite builds; fall back to the whole file
+    try:
+        rows = connection.exec_driver_sql(
+            "SELECT name, sum(pgsize) FROM dbstat GROUP BY name ORDER BY name"
+        ).all()
+    except sa.exc.OperationalError:
+        page_count = connection.exec_driver_sql("PRAGMA page_count").scalar()
+        page_size = connection.exec_driver_sql("PRAGMA page_size").scalar()
+        return {'(database)': page_count * page_size}
+    return dict(rows)
+
+
+def run(key_type, new_key, rows, batch_size):
+    path = os.path.join(tempfile.mkdtemp(), 'keys.sqlite3')
+    engine = sa.create_engine(f"sqlite:///{path}")
+    metadata = sa.MetaData()
+    table = build_table(metadata, key_type)
+    metadata.create_all(engine)
+
+    # A realistic fan-in: a few thousand applicants spread over a few thousand jobs
+    applicants = [new_key() for _ in range(5000)]
+    jobs = [new_key() for _ in range(2000)]
+
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        for offset in range(0, rows, batch_size):
+            connection.execute(table.insert(), [{
+                'id': new_key(),
+                'applicant_id': applicants[i % len(applicants)],
+                'job_id': jobs[(i // len(applicants)) % len(jobs)],
+                'status': 'Applied',
+            } for i in range(offset, min(offset + batch_size, rows))])
+    elapsed = time.perf_counter() - start
+
+    with engine.connect() as connection:
+        sizes = index_sizes(connection)
+    engine.dispose()
+    return rows / elapsed, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    from app.models import CompactUUID, generate_uuid
+    SCHEMES['uuid7 compact'] = (CompactUUID(), generate_uuid)
+
+    for name, (key_type, new_key) in SCHEMES.items():
+        rate, sizes = run(key_type, new_key, args.rows, args.batch_size)
+        print(f"{name}: {rate:,.0f} rows/s")
+        for index, size in sizes.items():
+            print(f"    {index:<40} {size / 1024 / 1024:>8.2f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Per-request cost of the rate limiter: one bucket in the memory store, and a full check (per-IP
+and per-identity buckets) inside a request context, with many distinct clients so lookups and
+evictions are exercised. Exits non-zero when a full check exceeds the budget.
+
+Usage: python -m benchmarks.bench_rate_limit [--calls 200000] [--clients 10000] [--budget-us 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+
+def per_call_us(fn, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=200000)
+    parser.add_argument('--clients', type=int, default=10000, help='Distinct identities cycled through.')
+    parser.add_argument('--budget-us', type=float, default=5.0, help='Allowed microseconds per full check.')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite3"
+    os.environ['EMAIL_DISPATCHER'] = 'worker'
+    os.environ['RATE_LIMIT_BACKEND'] = 'memory'
+    from app import create_app
+    from app.ratelimit import MemoryStore, RateLimiter
+
+    app = create_app()
+    identities = [f"user-{i}" for i in range(args.clients)]
+    store = MemoryStore(maxsize=args.clients // 2)  # smaller than the client set: every call may evict
+    limiter = RateLimiter(store, {'bench': ('1000000/second', '1000/second')})
+
+    bucket = per_call_us(lambda i: store.acquire([(identities[i % args.clients], 1000, 1000.0)]), args.calls)
+    with app.test_request_context('/api/applications', method='POST', environ_base={'REMOTE_ADDR': '10.0.0.1'}):
+        check = per_call_us(lambda i: limiter.check('bench', identities[i % args.clients]), args.calls)
+        limiter.limits['bench'] = (None, None)
+        unlimited = per_call_us(lambda i: limiter.check('bench', identities[i % args.clients]), args.calls)
+
+    print(f"{'operation':>24} {'us/call':>8}")
+    print(f"{'memory bucket':>24} {bucket:>8.2f}")
+    print(f"{'check (ip + identity)':>24} {check:>8.2f}")
+    print(f"{'check (no limits)':>24} {unlimited:>8.2f}")
+    if check > args.budget_us:
+        print(f"over budget: {check:.2f}us > {args.budget_us:.2f}us")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
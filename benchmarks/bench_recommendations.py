@@ -0,0 +1,123 @@
+"""Top-k latency of job recommendations against a large set of open jobs: the index query alone and
+GET /api/jobs/recommended end to end, plus build time and the cost of incremental updates.
+
+Job text is drawn from a Zipf-distributed synthetic vocabulary, so term frequencies look like real
+postings rather than the handful of words benchmarks.seed uses.
+
+Usage: python -m benchmarks.bench_recommendations [--jobs 100000] [--queries 500] [--k 20] [--budget-ms 10]
+"""
+import argparse
+import datetime
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+
+def synthetic_jobs(company_ids, count, rng, vocabulary=20000, length=80):
+    import numpy as np
+    from app.models import JobStatus, generate_uuid
+
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = np.array([''.join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(vocabulary)])
+    weights = 1.0 / np.arange(1, vocabulary + 1)
+    tokens = np.random.default_rng(rng.randrange(1 << 30)).choice(
+        words, size=(count, length + 3), p=weights / weights.sum()
+    )
+    now = datetime.datetime.utcnow()
+    return [{
+        "id": generate_uuid(),
+        "title": ' '.join(row[:3]),
+        "description": ' '.join(row[3:]),
+        "location": "Remote",
+        "status": JobStatus.OPEN,
+        "created_by": rng.choice(company_ids),
+        "created_at": now - datetime.timedelta(seconds=i),
+        # Posted over time, so the periodic sync has only recent changes to re-read
+        "updated_at": now - datetime.timedelta(seconds=i),
+    } for i, row in enumerate(tokens)]
+
+
+def percentiles(samples):
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return f"p50 {cuts[49]:.2f} ms, p95 {cuts[94]:.2f} ms, p99 {cuts[98]:.2f} ms"
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--jobs', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--k', type=int, default=20)
+    parser.add_argument('--budget-ms', type=float, default=10)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite3"
+    os.environ['EMAIL_DISPATCHER'] = 'worker'
+    from flask_jwt_extended import create_access_token
+    from app import create_app, recommendations
+    from app.extensions import db
+    from app.models import Job
+    from benchmarks.seed import bulk_insert, seed_applicants, seed_applications, seed_companies
+
+    rng = random.Random(0)
+    app = create_app()
+    with app.app_context():
+        Job.metadata.create_all(db.engine)
+        jobs = synthetic_jobs(seed_companies(50), args.jobs, rng)
+        bulk_insert(Job, jobs)
+        applicants = seed_applicants(200)
+        # About 20 applications per applicant
+        seed_applications(applicants, [job["id"] for job in jobs], len(applicants) * 20, rng=rng)
+
+        recommender = recommendations.recommender()
+        start = time.perf_counter()
+        recommender.sync()
+        print(f"build: {len(recommender.index)} open jobs in {time.perf_counter() - start:.1f} s")
+
+        from app.job_vectors import vectorize
+        profiles = []
+        for applicant_id in applicants[:min(len(applicants), args.queries)]:
+            matches, _ = recommender.recommend(applicant_id, args.k)
+            assert matches
+        history = [(job["title"], job["description"]) for job in rng.sample(jobs, args.queries)]
+        for title, description in history:
+            profiles.append(vectorize(title, description, recommender.index.n_features))
+
+        queries = iter(profiles)
+        index_ms = timed(lambda: recommender.index.query(*next(queries), args.k), len(profiles))
+        print(f"index top-{args.k}: {percentiles(index_ms)}")
+
+        tokens = [create_access_token(identity=applicant_id, additional_claims={"role": "applicant"})
+                  for applicant_id in applicants]
+    client = app.test_client()
+    headers = iter({'Authorization': f'Bearer {rng.choice(tokens)}'} for _ in range(args.queries))
+    endpoint_ms = timed(lambda: client.get('/api/jobs/recommended', query_string={'limit': args.k},
+                                           headers=next(headers)), args.queries)
+    print(f"GET /api/jobs/recommended: {percentiles(endpoint_ms)}")
+
+    with app.app_context():
+        updates = rng.sample(jobs, 2000)
+        upsert_ms = timed(lambda: recommender.index.upsert(
+            updates.pop()["id"], f"Senior {rng.random()}", "updated description"), 2000)
+        print(f"incremental upsert: mean {statistics.fmean(upsert_ms):.3f} ms, max {max(upsert_ms):.1f} ms "
+              f"(max includes folding the pending rows into the matrix)")
+
+    p95 = statistics.quantiles(index_ms, n=100, method='inclusive')[94]
+    if p95 > args.budget_ms:
+        print(f"Over budget: index p95 {p95:.2f} ms > {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Compare indexed full-text search with the ilike fallback on GET /api/jobs.
+
+Usage: python -m benchmarks.bench_search [--sizes 10000,100000,1000000]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+QUERIES = [
+    {'keyword': 'python'},
+    {'keyword': 'senior data'},
+    {'keyword': 'kube'},
+    {'location': 'san francisco'},
+    {'keyword': 'engineer', 'location': 'berlin'},
+    {'keyword': 'haskell'},  # no matches
+]
+
+
+def run(app, size, repeat):
+    from app.extensions import db
+    from app.models import Job
+    from app.search import backfill
+    from benchmarks.seed import seed_companies, seed_jobs
+
+    with app.app_context():
+        Job.metadata.drop_all(db.engine)
+        Job.metadata.create_all(db.engine)
+        seed_jobs(seed_companies(50), size)
+    result = app.test_cli_runner().invoke(backfill, ['--batch-size', '5000'])
+    assert result.exit_code == 0, result.output
+
+    client = app.test_client()
+    results = {}  # (query, mode) -> (p50 ms, max ms, rows on the first page)
+    for params in QUERIES:
+        for mode in ('ilike', 'sqlite'):
+            app.config['SEARCH_BACKEND'] = mode
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                response = client.get('/api/jobs', query_string=params)
+                timings.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.get_json()
+            rows = len(response.get_json()['jobs'])
+            results[(describe(params), mode)] = (statistics.median(timings) * 1000, max(timings) * 1000, rows)
+    return results
+
+
+def describe(params):
+    return ' '.join(f"{key}={value!r}" for key, value in params.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='10000,100000', help='comma-separated job counts')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite3"
+    os.environ['EMAIL_DISPATCHER'] = 'worker'
+    # Cached pages would be served instead of running either search backend
+    os.environ['RESPONSE_CACHE_BACKEND'] = 'none'
+    from app import create_app
+    app = create_app()
+
+    print(f"{'jobs':>8} {'query':<40} {'backend':>8} {'p50 ms':>8} {'max ms':>8} {'rows':>5}")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        for (query, mode), (median, worst, rows) in run(app, size, args.repeat).items():
+            print(f"{size:>8} {query:<40} {mode:>8} {median:>8.2f} {worst:>8.2f} {rows:>5}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Load-and-encode time for job payloads: ORM objects with hand-built dicts vs row tuples with
+the precompiled schema, each encoded with the stdlib json module and with orjson when installed.
+
+Usage: python -m benchmarks.bench_serialization [--sizes 1000,10000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+
+def hand_built(db, Job, size):
+    jobs = db.session.query(Job).limit(size).all()
+    return [{
+        "id": job.id,
+        "title": job.title,
+        "description": job.description,
+        "location": job.location,
+        "status": job.status.value,
+        "created_by": job.created_by,
+        "created_at": job.created_at.isoformat(),
+        "updated_at": job.updated_at.isoformat()
+    } for job in jobs]
+
+
+def schema_rows(db, JOB, size):
+    return JOB.many(db.session.query(*JOB.select()).limit(size).all())
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='1000,10000')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite3"
+    os.environ['EMAIL_DISPATCHER'] = 'worker'
+    from app import create_app
+    from app.extensions import db
+    from app.models import Job
+    from app import serializers
+    from benchmarks.seed import seed_companies, seed_jobs
+
+    app = create_app()
+    with app.app_context():
+        Job.metadata.create_all(db.engine)
+        seed_jobs(seed_companies(10), max(sizes))
+
+        encoders = {'stdlib': lambda payload: json.dumps(payload).encode()}
+        if serializers.orjson is not None:
+            encoders['orjson'] = lambda payload: app.json.dumps_bytes(payload)
+
+        print(f"{'rows':>7} {'build':<14} {'encoder':<8} {'ms':>9}")
+        for size in sizes:
+            db.session.expunge_all()
+            builders = {
+                'orm + dicts': lambda: hand_built(db, Job, size),
+                'row schema': lambda: schema_rows(db, serializers.JOB, size),
+            }
+            for build_name, build in builders.items():
+                for encoder_name, encode in encoders.items():
+                    def run():
+                        encode(build())
+                        db.session.expunge_all()  # fresh identity map each time, like a new request
+                    print(f"{size:>7} {build_name:<14} {encoder_name:<8} {timed(run, args.repeat):>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
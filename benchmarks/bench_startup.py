@@ -0,0 +1,102 @@
+"""Cold start cost of a worker: import time per package (`python -X importtime`) and
+wall time from interpreter start to the first served request.
+
+Every measurement runs in a fresh interpreter. Exits non-zero when the median time to first
+request exceeds --budget-ms, so it can guard cold start in CI.
+
+Usage: python -m benchmarks.bench_startup [--runs 5] [--budget-ms 1500] [--top 15]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| *(\S+)')
+
+# Runs in the child interpreter; time is measured from the child's own start
+FIRST_REQUEST = """
+import time
+start = time.perf_counter()
+from app import create_app
+app = create_app()
+created = time.perf_counter()
+response = app.test_client().get('/api/jobs')
+assert response.status_code == 200, response.status_code
+done = time.perf_counter()
+import json, sys
+print(json.dumps({'create_app_ms': (created - start) * 1000, 'first_request_ms': (done - start) * 1000,
+                  'modules': len(sys.modules), 'alembic_loaded': 'alembic' in sys.modules}))
+"""
+
+
+def child_env():
+    env = dict(os.environ)
+    env['DATABASE_URL'] = f"sqlite:///{tempfile.mkdtemp()}/startup.sqlite3"
+    env['EMAIL_DISPATCHER'] = 'worker'
+    return env
+
+
+def prepare_database(env):
+    subprocess.run(
+        [sys.executable, '-c', 'from app import create_app\nfrom app.extensions import db\n'
+         'app = create_app()\nwith app.app_context(): db.create_all()'],
+        env=env, check=True, capture_output=True
+    )
+
+
+def import_times(env):
+    # Self time per top-level package for `from app import create_app; create_app()`
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'from app import create_app; create_app()'],
+        env=env, check=True, capture_output=True, text=True
+    ).stderr
+    packages = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            package = match.group(3).split('.')[0]
+            packages[package] = packages.get(package, 0) + int(match.group(1))
+    return packages
+
+
+def first_request(env):
+    output = subprocess.run(
+        [sys.executable, '-c', FIRST_REQUEST], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=1500)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    env = child_env()
+    prepare_database(env)
+
+    packages = import_times(env)
+    print(f"{'package':<24} {'import ms':>10}")
+    for name, micros in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<24} {micros / 1000:>10.1f}")
+    print(f"{'total':<24} {sum(packages.values()) / 1000:>10.1f}")
+
+    runs = [first_request(env) for _ in range(args.runs)]
+    create_ms = statistics.median(run['create_app_ms'] for run in runs)
+    request_ms = statistics.median(run['first_request_ms'] for run in runs)
+    print(f"\nimport + create_app: {create_ms:.0f} ms")
+    print(f"first request served: {request_ms:.0f} ms ({runs[-1]['modules']} modules loaded, "
+          f"alembic loaded: {runs[-1]['alembic_loaded']})")
+
+    if request_ms > args.budget_ms:
+        print(f"Over budget: {request_ms:.0f} ms > {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
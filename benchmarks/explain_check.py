@@ -0,0 +1,121 @@
+"""Assert that every hot route's queries are served by indexes, not full table scans.
+
+Seeds a database, calls each route through the test client, captures the SQL it runs and
+EXPLAINs every statement. Exits non-zero if any hot table is scanned.
+
+Usage: python -m benchmarks.explain_check [--jobs 20000] [--applications 50000]
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+
+HOT_TABLES = {'users', 'jobs', 'applications', 'job_application_counts'}
+SQLITE_SCAN = re.compile(r'^SCAN (\w+)$')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def full_scans(connection, statement, parameters):
+    if connection.dialect.name == 'sqlite':
+        plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        matches = [SQLITE_SCAN.match(row[-1]) for row in plan]
+    else:
+        plan = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).fetchall()
+        matches = [POSTGRES_SCAN.search(row[0]) for row in plan]
+    return {match.group(1) for match in matches if match and match.group(1) in HOT_TABLES}
+
+
+def scenarios(client, ids):
+    company = {'Authorization': f"Bearer {ids['company_token']}"}
+    applicant = {'Authorization': f"Bearer {ids['applicant_token']}"}
+    first_page = client.get('/api/jobs', query_string={'limit': 20}).get_json()
+    return [
+        ('list_jobs', lambda: client.get('/api/jobs')),
+        ('list_jobs status', lambda: client.get('/api/jobs', query_string={'status': 'Open'})),
+        ('list_jobs page 2', lambda: client.get('/api/jobs', query_string={
+            'limit': 20, 'cursor': first_page['next_cursor']})),
+        ('list_jobs keyword', lambda: client.get('/api/jobs', query_string={'keyword': 'python'})),
+        ('get_job', lambda: client.get(f"/api/jobs/{ids['job_id']}")),
+        ('export_jobs', lambda: client.get('/api/jobs/export', headers=company)),
+        ('login', lambda: client.post('/api/auth/login', json={
+            'email': 'applicant0@example.com', 'password': 'wrong'})),
+        ('verify_email', lambda: client.get(f"/api/auth/verify-email/{ids['verification_token']}")),
+        ('my_applications', lambda: client.get('/api/applications/me', headers=applicant)),
+        ('view_applications_for_job', lambda: client.get(
+            f"/api/applications/job/{ids['job_id']}", headers=company)),
+        ('application_stats', lambda: client.get('/api/applications/stats', headers=company)),
+    ]
+
+
+def seed(app, jobs, applications):
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import text
+    from app.extensions import db
+    from app.models import Job, User
+    from benchmarks.seed import seed_companies, seed_applicants, seed_jobs, seed_applications
+
+    with app.app_context():
+        Job.metadata.drop_all(db.engine)
+        Job.metadata.create_all(db.engine)
+        companies = seed_companies(20)
+        applicants = seed_applicants(2000)
+        job_ids = seed_jobs(companies, jobs)
+        seed_applications(applicants, job_ids, applications)
+        app.test_cli_runner().invoke(args=['applications', 'rebuild-counts'])
+        app.test_cli_runner().invoke(args=['search', 'backfill'])
+
+        db.session.execute(
+            text("UPDATE users SET email_verification_token = 'explain-check-token', is_verified = 0 "
+                 "WHERE email = 'applicant1@example.com'")
+        )
+        db.session.commit()
+        # Give the planner real statistics
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+
+        job = db.session.query(Job.id, Job.created_by).filter(Job.created_by == companies[0]).first()
+        applicant_id = db.session.query(User.id).filter(User.email == 'applicant0@example.com').scalar()
+        return {
+            'job_id': job.id,
+            'company_token': create_access_token(identity=job.created_by, additional_claims={"role": "company"}),
+            'applicant_token': create_access_token(identity=applicant_id, additional_claims={"role": "applicant"}),
+            'verification_token': 'explain-check-token',
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--jobs', type=int, default=20000)
+    parser.add_argument('--applications', type=int, default=50000)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DATABASE_URL', f"sqlite:///{tempfile.mkdtemp()}/explain.sqlite3")
+    os.environ['EMAIL_DISPATCHER'] = 'worker'
+    os.environ['RESPONSE_CACHE_BACKEND'] = 'none'
+    from app import create_app
+    from app.extensions import db
+    from app.query_counter import count_queries
+
+    app = create_app()
+    ids = seed(app, args.jobs, args.applications)
+    client = app.test_client()
+
+    failures = 0
+    for name, call in scenarios(client, ids):
+        with count_queries() as queries:
+            response = call()
+        scanned = set()
+        with app.app_context(), db.engine.connect() as connection:
+            for statement, parameters in zip(queries.statements, queries.parameters):
+                if statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+                    scanned |= full_scans(connection, statement, parameters)
+        status = f"FULL SCAN on {', '.join(sorted(scanned))}" if scanned else "ok"
+        print(f"{name:<28} {response.status_code}  {queries.count:>2} queries  {status}")
+        failures += bool(scanned)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+"""Load-test scenarios (browse, apply_storm, triage, login_burst) against a seeded dataset and write
+a JSON report: throughput, p50/p95/p99 latency and SQL statements per request, per scenario and
+per endpoint.
+
+Requests go through the Flask test client in-process (--target test-client), over HTTP to a
+threaded WSGI server forked from this process (--target wsgi), or to an already running server
+sharing DATABASE_URL and JWT_SECRET_KEY (--url). Datasets and request sequences are generated from
+--seed, so two runs with the same arguments send the same requests. --compare prints the change
+against an earlier report.
+
+Usage: python -m benchmarks.load [--scenarios browse,apply_storm,triage,login_burst]
+       [--target test-client|wsgi] [--url http://host:port] [--requests 2000] [--concurrency 8]
+       [--companies 50] [--jobs 20000] [--applicants 2000] [--applications 50000] [--seed 0]
+       [--output report.json] [--compare baseline.json]
+"""
+import argparse
+import datetime
+import http.client
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.parse
+
+
+class TestClientTarget:
+    name = 'test-client'
+
+    def __init__(self, app):
+        self.app = app
+
+    def connect(self):
+        client = self.app.test_client()
+
+        def send(req):
+            response = client.open(req.path, method=req.method, query_string=req.query_string,
+                                   json=req.json, headers=req.headers)
+            response.close()
+            return response.status_code, response.headers.get('X-Query-Count')
+        return send
+
+    def close(self):
+        pass
+
+
+class HTTPTarget:
+    name = 'http'
+
+    def __init__(self, url, process=None):
+        self.url = urllib.parse.urlsplit(url)
+        self.process = process
+
+    def connect(self):
+        # One keep-alive connection per client thread
+        connection = http.client.HTTPConnection(self.url.hostname, self.url.port, timeout=60)
+
+        def send(req):
+            path = req.path
+            if req.query_string:
+                path += '?' + urllib.parse.urlencode(req.query_string)
+            headers = dict(req.headers)
+            body = None
+            if req.json is not None:
+                body = json.dumps(req.json)
+                headers['Content-Type'] = 'application/json'
+            try:
+                connection.request(req.method, path, body=body, headers=headers)
+                response = connection.getresponse()
+            except (ConnectionError, http.client.HTTPException):
+                connection.close()
+                raise
+            response.read()
+            return response.status, response.getheader('X-Query-Count')
+        return send
+
+    def close(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+
+
+def serve(app, port):
+    import logging
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # no access log
+    WSGIRequestHandler.protocol_version = 'HTTP/1.1'  # keep-alive
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def start_wsgi_server(app):
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    # Forked after seeding, so the server process starts with its own fresh connection pool
+    with app.app_context():
+        from app.extensions import db
+        db.engine.dispose()
+    process = multiprocessing.get_context('fork').Process(target=serve, args=(app, port), daemon=True)
+    process.start()
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                process.terminate()
+                raise RuntimeError("WSGI server did not start")
+            time.sleep(0.05)
+    return HTTPTarget(f"http://127.0.0.1:{port}", process)
+
+
+def percentiles(samples):
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return {'p50': value, 'p95': value, 'p99': value}
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return {'p50': cuts[49], 'p95': cuts[94], 'p99': cuts[98]}
+
+
+def summarize(records, elapsed):
+    latencies = [record[2] * 1000 for record in records]
+    queries = [record[3] for record in records if record[3] is not None]
+    statuses = {}
+    for record in records:
+        statuses[str(record[1])] = statuses.get(str(record[1]), 0) + 1
+    return {
+        'requests': len(records),
+        'errors': sum(1 for record in records if record[1] is None or record[1] >= 500),
+        'statuses': dict(sorted(statuses.items())),
+        'throughput_rps': round(len(records) / elapsed, 1) if elapsed else 0.0,
+        'latency_ms': {
+            **{name: round(value, 2) for name, value in percentiles(latencies).items()},
+            'mean': round(statistics.fmean(latencies), 2) if latencies else 0.0,
+            'max': round(max(latencies), 2) if latencies else 0.0,
+        },
+        'queries_per_request': {
+            'mean': round(statistics.fmean(queries), 2) if queries else None,
+            'max': max(queries) if queries else None,
+        },
+    }
+
+
+def run_scenario(target, scenario, context, requests, concurrency, seed):
+    # The request sequence is generated up front from the seed, then drained by the client threads
+    rng = random.Random(seed)
+    planned = [scenario(context, rng) for _ in range(requests)]
+    next_index = iter(range(len(planned)))
+    lock = threading.Lock()
+    records = []
+
+    def client():
+        send = target.connect()
+        local = []
+        while True:
+            with lock:
+                index = next(next_index, None)
+            if index is None:
+                break
+            req = planned[index]
+            start = time.perf_counter()
+            try:
+                status, query_count = send(req)
+            except Exception:
+                status, query_count = None, None
+            local.append((req.name, status, time.perf_counter() - start,
+                          int(query_count) if query_count is not None else None))
+        with lock:
+            records.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    result = summarize(records, elapsed)
+    endpoints = sorted({record[0] for record in records})
+    result['endpoints'] = {
+        name: summarize([record for record in records if record[0] == name], elapsed) for name in endpoints
+    }
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline):
+    print(f"{'scenario':<14} {'rps':>10} {'change':>8} {'p95 ms':>10} {'change':>8} {'queries':>8}")
+    for name, result in report['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if before is None:
+            continue
+
+        def change(new, old):
+            return f"{(new - old) / old * 100:+.1f}%" if old else 'n/a'
+        print(f"{name:<14} {result['throughput_rps']:>10.1f} "
+              f"{change(result['throughput_rps'], before['throughput_rps']):>8} "
+              f"{result['latency_ms']['p95']:>10.2f} "
+              f"{change(result['latency_ms']['p95'], before['latency_ms']['p95']):>8} "
+              f"{result['queries_per_request']['mean'] or 0:>8}")
+
+
+def main():
+    from benchmarks.scenarios import SCENARIOS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--target', choices=('test-client', 'wsgi'), default='test-client')
+    parser.add_argument('--url', help='Send requests to this running server instead.')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per scenario.')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--companies', type=int, default=50)
+    parser.add_argument('--jobs', type=int, default=20000)
+    parser.add_argument('--applicants', type=int, default=2000)
+    parser.add_argument('--applications', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout.')
+    parser.add_argument('--compare', help='An earlier report to compare against.')
+    args = parser.parse_args()
+    names = args.scenarios.split(',')
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    if not args.url:
+        os.environ.setdefault('DATABASE_URL', f"sqlite:///{tempfile.mkdtemp()}/load.sqlite3")
+    os.environ['EMAIL_DISPATCHER'] = 'worker'
+    os.environ['RATE_LIMIT_BACKEND'] = 'none'  # the simulated users all share one address
+    from app import create_app
+    from benchmarks.scenarios import prepare
+    from benchmarks.seed import seed_dataset
+
+    app = create_app()
+    app.config['SQLALCHEMY_QUERY_COUNT_HEADER'] = True
+    started = time.perf_counter()
+    dataset = seed_dataset(app, args.companies, args.jobs, args.applicants, args.applications, seed=args.seed)
+    context = prepare(app, dataset, random.Random(args.seed))
+    seed_seconds = time.perf_counter() - started
+
+    if args.url:
+        target = HTTPTarget(args.url)
+        target.name = args.url
+    elif args.target == 'wsgi':
+        target = start_wsgi_server(app)
+        target.name = 'wsgi'
+    else:
+        target = TestClientTarget(app)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': app.config['SQLALCHEMY_DATABASE_URI'].split(':', 1)[0],
+            'target': target.name,
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'seed': args.seed,
+            'dataset': {'companies': args.companies, 'jobs': args.jobs,
+                        'applicants': args.applicants, 'applications': args.applications},
+            'seed_seconds': round(seed_seconds, 1),
+        },
+        'scenarios': {},
+    }
+    try:
+        for offset, name in enumerate(names):
+            report['scenarios'][name] = run_scenario(
+                target, SCENARIOS[name], context, args.requests, args.concurrency, args.seed + offset
+            )
+    finally:
+        target.close()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Request mixes for benchmarks.load. A scenario is a function `(context, rng) -> Request` that
+returns the next request to send; `prepare` builds the context (ids and tokens) for a seeded
+dataset.
+"""
+from collections import namedtuple
+
+Request = namedtuple('Request', 'name method path query_string json headers')
+
+LISTINGS = [
+    {},
+    {'status': 'Open'},
+    {'status': 'Closed'},
+    {'keyword': 'python'},
+    {'keyword': 'senior engineer'},
+    {'location': 'berlin'},
+    {'location': 'remote', 'keyword': 'data'},
+    {'fields': 'title,location,status'},
+    {'status': 'Open', 'limit': '50'},
+    {'keyword': 'platform', 'status': 'Open'},
+]
+TRIAGE_STATUSES = ['Reviewed', 'Interview', 'Rejected', 'Hired']
+HOT_JOBS = 5
+RECRUITERS = 5
+TOKENS = 1000
+
+
+def request(name, method, path, query_string=None, json=None, token=None):
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    return Request(name, method, path, query_string, json, headers)
+
+
+def prepare(app, dataset, rng):
+    from flask_jwt_extended import create_access_token
+    from app.extensions import db
+    from app.models import Application, Job, JobStatus, User
+
+    with app.app_context():
+        open_jobs = [row.id for row in db.session.query(Job.id).filter(Job.status == JobStatus.OPEN).limit(1000)]
+        recruiters = {}
+        for company_id in dataset['companies'][:RECRUITERS]:
+            rows = db.session.query(Application.id, Application.job_id).join(
+                Job, Application.job_id == Job.id
+            ).filter(Job.created_by == company_id).all()
+            jobs = {}
+            for application_id, job_id in rows:
+                jobs.setdefault(job_id, []).append(application_id)
+            token = create_access_token(identity=company_id, additional_claims={"role": "company"})
+            recruiters[company_id] = {'token': token, 'jobs': jobs}
+        emails = [row.email for row in db.session.query(User.email).filter(
+            User.id.in_(dataset['applicants'][:TOKENS]))]
+        applicant_tokens = [
+            create_access_token(identity=applicant_id, additional_claims={"role": "applicant"})
+            for applicant_id in dataset['applicants'][:TOKENS]
+        ]
+    return {
+        'jobs': dataset['jobs'],
+        'hot_jobs': rng.sample(open_jobs, min(HOT_JOBS, len(open_jobs))),
+        'recruiters': [recruiter for recruiter in recruiters.values() if recruiter['jobs']],
+        'applicant_tokens': applicant_tokens,
+        'emails': emails,
+        'password': dataset['password'],
+    }
+
+
+def browse(context, rng):
+    # Anonymous job seekers: mostly listings, some detail pages
+    if rng.random() < 0.7:
+        return request('list_jobs', 'GET', '/api/jobs', query_string=rng.choice(LISTINGS))
+    return request('get_job', 'GET', f"/api/jobs/{rng.choice(context['jobs'])}")
+
+
+def apply_storm(context, rng):
+    # A few popular postings open at once; repeat applications get a 400
+    return request('apply_job', 'POST', '/api/applications', json={
+        'job_id': rng.choice(context['hot_jobs']),
+        'resume_link': 'https://example.com/resumes/cv.pdf',
+    }, token=rng.choice(context['applicant_tokens']))
+
+
+def triage(context, rng):
+    # Recruiters reading applicant lists and moving applications through the pipeline
+    recruiter = rng.choice(context['recruiters'])
+    job_id, application_ids = rng.choice(list(recruiter['jobs'].items()))
+    roll = rng.random()
+    if roll < 0.4:
+        return request('view_applications_for_job', 'GET', f"/api/applications/job/{job_id}",
+                       token=recruiter['token'])
+    if roll < 0.5:
+        return request('application_stats', 'GET', '/api/applications/stats', token=recruiter['token'])
+    if roll < 0.8:
+        return request('update_application_status', 'PUT', f"/api/applications/{rng.choice(application_ids)}",
+                       json={'status': rng.choice(TRIAGE_STATUSES)}, token=recruiter['token'])
+    updates = [{'application_id': application_id, 'status': rng.choice(TRIAGE_STATUSES)}
+               for application_id in rng.sample(application_ids, min(50, len(application_ids)))]
+    return request('update_application_statuses', 'PATCH', '/api/applications/batch',
+                   json={'updates': updates}, token=recruiter['token'])
+
+
+def login_burst(context, rng):
+    # Everyone signing in at 9am; one in ten has the wrong password
+    password = context['password'] if rng.random() < 0.9 else 'wrong-password'
+    return request('login', 'POST', '/api/auth/login', json={
+        'email': rng.choice(context['emails']), 'password': password,
+    })
+
+
+SCENARIOS = {
+    'browse': browse,
+    'apply_storm': apply_storm,
+    'triage': triage,
+    'login_burst': login_burst,
+}
@@ -0,0 +1,112 @@
+import datetime
+import random
+from sqlalchemy import insert
+from app.extensions import db
+from app.models import User, Job, Application, UserRole, JobStatus, ApplicationStatus, generate_uuid
+
+TITLES = ['Software Engineer', 'Data Engineer', 'Product Manager', 'Designer', 'Data Scientist',
+          'DevOps Engineer', 'Support Specialist', 'Account Executive', 'Recruiter', 'QA Analyst']
+LEVELS = ['Junior', 'Senior', 'Staff', 'Lead', 'Principal']
+CITIES = ['San Francisco, CA', 'New York, NY', 'Austin, TX', 'Berlin', 'London', 'Toronto',
+          'Remote', 'Paris', 'Amsterdam', 'Seattle, WA']
+WORDS = ('python flask postgres kubernetes react analytics billing payments growth platform '
+         'infrastructure mobile security compliance onboarding customers pipelines dashboards '
+         'machine learning experimentation reliability observability distributed systems').split()
+
+CHUNK_SIZE = 5000
+
+
+def bulk_insert(model, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(insert(model), rows[start:start + CHUNK_SIZE])
+    db.session.commit()
+
+
+def seed_users(role, count, password="x"):
+    rows = [{
+        "id": generate_uuid(),
+        "name": f"{role.value.title()} {i}",
+        "email": f"{role.value}{i}@example.com",
+        "password": password,
+        "role": role,
+        "is_verified": True,
+    } for i in range(count)]
+    bulk_insert(User, rows)
+    return [row["id"] for row in rows]
+
+
+def seed_companies(count, password="x"):
+    return seed_users(UserRole.COMPANY, count, password)
+
+
+def seed_applicants(count, password="x"):
+    return seed_users(UserRole.APPLICANT, count, password)
+
+
+def seed_jobs(company_ids, count, rng=None, draft_ratio=0.1):
+    rng = rng or random.Random(0)
+    now = datetime.datetime.utcnow()
+    rows = []
+    for i in range(count):
+        roll = rng.random()
+        status = JobStatus.DRAFT if roll < draft_ratio else (
+            JobStatus.CLOSED if roll < draft_ratio * 3 else JobStatus.OPEN)
+        rows.append({
+            "id": generate_uuid(),
+            "title": f"{rng.choice(LEVELS)} {rng.choice(TITLES)}",
+            "description": ' '.join(rng.choice(WORDS) for _ in range(rng.randint(40, 120))),
+            "location": rng.choice(CITIES),
+            "status": status,
+            "created_by": rng.choice(company_ids),
+            "created_at": now - datetime.timedelta(minutes=i),
+        })
+    bulk_insert(Job, rows)
+    return [row["id"] for row in rows]
+
+
+def seed_applications(applicant_ids, job_ids, count, rng=None):
+    rng = rng or random.Random(0)
+    now = datetime.datetime.utcnow()
+    statuses = list(ApplicationStatus)
+    pairs = set()
+    limit = len(applicant_ids) * len(job_ids)
+    while len(pairs) < min(count, limit):
+        pairs.add((rng.choice(applicant_ids), rng.choice(job_ids)))
+    rows = [{
+        "id": generate_uuid(),
+        "applicant_id": applicant_id,
+        "job_id": job_id,
+        "resume_link": f"https://example.com/resumes/{applicant_id}.pdf",
+        "cover_letter": "I would love to join the team.",
+        "status": rng.choice(statuses),
+        "applied_at": now - datetime.timedelta(seconds=i),
+        "updated_at": now - datetime.timedelta(seconds=i),
+    } for i, (applicant_id, job_id) in enumerate(pairs)]
+    bulk_insert(Application, rows)
+    return [row["id"] for row in rows]
+
+
+def seed_dataset(app, companies, jobs, applicants, applications, seed=0, password="benchmark"):
+    # Everything through Core bulk inserts, then the derived tables (counters, search index).
+    # Every user shares one real password hash, computed once, so logins can be exercised.
+    from werkzeug.security import generate_password_hash
+
+    rng = random.Random(seed)
+    password_hash = generate_password_hash(password, app.config['PASSWORD_HASH_METHOD'])
+    with app.app_context():
+        Job.metadata.drop_all(db.engine)
+        Job.metadata.create_all(db.engine)
+        company_ids = seed_companies(companies, password_hash)
+        applicant_ids = seed_applicants(applicants, password_hash)
+        job_ids = seed_jobs(company_ids, jobs, rng=rng)
+        application_ids = seed_applications(applicant_ids, job_ids, applications, rng=rng)
+    runner = app.test_cli_runner()
+    runner.invoke(args=['applications', 'rebuild-counts'])
+    runner.invoke(args=['search', 'backfill'])
+    return {
+        "companies": company_ids,
+        "applicants": applicant_ids,
+        "jobs": job_ids,
+        "applications": application_ids,
+        "password": password,
+    }
@@ -97,6 +97,12 @@ def run_migrations_online():
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        if connection.dialect.name == 'sqlite':
+            # Table rebuilds and key rewrites leave references dangling mid-migration; the pragma is
+            # ignored inside a transaction, so it is set before the migration's transaction begins
+            connection.exec_driver_sql('PRAGMA foreign_keys = OFF')
+            # Ends the transaction SQLAlchemy began for it, which alembic would otherwise join and never commit
+            connection.commit()
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
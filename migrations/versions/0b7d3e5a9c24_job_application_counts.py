@@ -0,0 +1,44 @@
+"""denormalized job application counts
+
+Revision ID: 0b7d3e5a9c24
+Revises: f2a9c4b80d16
+Create Date: 2026-10-17 15:08:52.613090
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b7d3e5a9c24'
+down_revision = 'f2a9c4b80d16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_application_counts',
+    sa.Column('job_id', sa.String(length=36), nullable=False),
+    sa.Column('status', sa.Enum('APPLIED', 'REVIEWED', 'INTERVIEW', 'REJECTED', 'HIRED', name='applicationstatus', create_type=False), nullable=False),
+    sa.Column('company_id', sa.String(length=36), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['company_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+    sa.PrimaryKeyConstraint('job_id', 'status')
+    )
+    with op.batch_alter_table('job_application_counts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_job_application_counts_company_id'), ['company_id'], unique=False)
+
+    op.execute(
+        "INSERT INTO job_application_counts (job_id, status, company_id, count) "
+        "SELECT a.job_id, a.status, j.created_by, count(*) "
+        "FROM applications a JOIN jobs j ON j.id = a.job_id "
+        "GROUP BY a.job_id, a.status, j.created_by"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('job_application_counts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_job_application_counts_company_id'))
+
+    op.drop_table('job_application_counts')
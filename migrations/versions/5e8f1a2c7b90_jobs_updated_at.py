@@ -0,0 +1,33 @@
+"""jobs.updated_at for conditional GETs
+
+Revision ID: 5e8f1a2c7b90
+Revises: 0b7d3e5a9c24
+Create Date: 2026-10-17 16:31:05.774218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8f1a2c7b90'
+down_revision = '0b7d3e5a9c24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.execute("UPDATE jobs SET updated_at = coalesce(created_at, CURRENT_TIMESTAMP)")
+
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_jobs_updated_at'), ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_jobs_updated_at'))
+        batch_op.drop_column('updated_at')
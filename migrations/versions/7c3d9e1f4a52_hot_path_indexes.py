@@ -0,0 +1,42 @@
+"""indexes for the hot query paths
+
+Revision ID: 7c3d9e1f4a52
+Revises: 5e8f1a2c7b90
+Create Date: 2026-10-17 18:02:44.180356
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3d9e1f4a52'
+down_revision = '5e8f1a2c7b90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_email_verification_token', ['email_verification_token'], unique=False,
+                              sqlite_where=sa.text('email_verification_token IS NOT NULL'),
+                              postgresql_where=sa.text('email_verification_token IS NOT NULL'))
+
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.create_index('ix_jobs_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_jobs_created_by_created_at_id', ['created_by', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('applications', schema=None) as batch_op:
+        batch_op.create_index('ix_applications_job_id', ['job_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('applications', schema=None) as batch_op:
+        batch_op.drop_index('ix_applications_job_id')
+
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_jobs_created_by_created_at_id')
+        batch_op.drop_index('ix_jobs_created_at_id')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_email_verification_token')
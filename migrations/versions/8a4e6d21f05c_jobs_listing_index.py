@@ -0,0 +1,25 @@
+"""composite index for keyset job listing
+
+Revision ID: 8a4e6d21f05c
+Revises: 3c1f0a9d2b7e
+Create Date: 2026-10-17 09:20:07.552913
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4e6d21f05c'
+down_revision = '3c1f0a9d2b7e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.create_index('ix_jobs_status_created_at_id', ['status', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_jobs_status_created_at_id')
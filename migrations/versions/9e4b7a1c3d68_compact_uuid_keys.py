@@ -0,0 +1,204 @@
+"""store uuid keys as 16 bytes
+
+Revision ID: 9e4b7a1c3d68
+Revises: 7c3d9e1f4a52
+Create Date: 2026-10-17 19:10:27.513904
+
+"""
+import uuid
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4b7a1c3d68'
+down_revision = '7c3d9e1f4a52'
+branch_labels = None
+depends_on = None
+
+# Existing ids keep their value, only the stored form changes, so links and issued tokens stay valid
+KEY_COLUMNS = [
+    ('users', 'id'),
+    ('jobs', 'id'),
+    ('jobs', 'created_by'),
+    ('applications', 'id'),
+    ('applications', 'applicant_id'),
+    ('applications', 'job_id'),
+    ('job_application_counts', 'job_id'),
+    ('job_application_counts', 'company_id'),
+]
+
+# Postgres default names for the foreign keys created by the earlier revisions
+FOREIGN_KEYS = [
+    ('jobs_created_by_fkey', 'jobs', 'created_by', 'users'),
+    ('applications_applicant_id_fkey', 'applications', 'applicant_id', 'users'),
+    ('applications_job_id_fkey', 'applications', 'job_id', 'jobs'),
+    ('job_application_counts_company_id_fkey', 'job_application_counts', 'company_id', 'users'),
+    ('job_application_counts_job_id_fkey', 'job_application_counts', 'job_id', 'jobs'),
+]
+
+# Postgres indexes and constraints that contain a key column, rebuilt on the new columns
+INDEXES = [
+    ('ix_jobs_created_at_id', 'jobs', ['created_at', 'id']),
+    ('ix_jobs_created_by_created_at_id', 'jobs', ['created_by', 'created_at', 'id']),
+    ('ix_jobs_status_created_at_id', 'jobs', ['status', 'created_at', 'id']),
+    ('ix_applications_job_id', 'applications', ['job_id']),
+    ('ix_job_application_counts_company_id', 'job_application_counts', ['company_id']),
+]
+CONSTRAINTS = [
+    ('users_pkey', 'users', 'PRIMARY KEY', ['id']),
+    ('jobs_pkey', 'jobs', 'PRIMARY KEY', ['id']),
+    ('applications_pkey', 'applications', 'PRIMARY KEY', ['id']),
+    ('unique_application_per_job', 'applications', 'UNIQUE', ['applicant_id', 'job_id']),
+    ('job_application_counts_pkey', 'job_application_counts', 'PRIMARY KEY', ['job_id', 'status']),
+]
+# Backfill order; job_application_counts has no id of its own, so it goes a job at a time
+BACKFILL_KEYS = {'users': 'id', 'jobs': 'id', 'applications': 'id', 'job_application_counts': 'job_id'}
+
+CHUNK_SIZE = 5000
+TABLES = list(BACKFILL_KEYS)
+
+
+def rewrite_sqlite_values(table, column, stored_type, convert):
+    # SQLite keeps whatever storage class it is given regardless of the declared column type, so the
+    # values are rewritten in place in small chunks instead of rebuilding every table. Only rows still
+    # in the old form are selected, which makes the step safe to resume.
+    bind = op.get_bind()
+    while True:
+        values = bind.execute(sa.text(
+            f"SELECT DISTINCT {column} FROM {table} WHERE typeof({column}) = :stored_type LIMIT :limit"
+        ), {"stored_type": stored_type, "limit": CHUNK_SIZE}).scalars().all()
+        if not values:
+            break
+        bind.execute(
+            sa.text(f"UPDATE {table} SET {column} = :new WHERE {column} = :old"),
+            [{"old": value, "new": convert(value)} for value in values]
+        )
+
+
+def key_columns(table):
+    return [column for name, column in KEY_COLUMNS if name == table]
+
+
+def shadow_list(table, columns):
+    # Column list with the key columns swapped for their uuid copies
+    keys = key_columns(table)
+    return ', '.join(f"{column}_uuid" if column in keys else column for column in columns)
+
+
+def prepare_postgres_shadow_columns():
+    # Online, outside any long transaction: every statement here takes at most a brief lock, and
+    # reads and writes carry on. Safe to re-run after an interruption.
+    bind = op.get_bind()
+    for table in TABLES:
+        columns = key_columns(table)
+        for column in columns:
+            op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column}_uuid uuid")
+        # Rows written by the running app from here on fill their own copies
+        assignments = ' '.join(f"NEW.{column}_uuid := NEW.{column}::uuid;" for column in columns)
+        op.execute(
+            f"CREATE OR REPLACE FUNCTION {table}_uuid_sync() RETURNS trigger AS $$ "
+            f"BEGIN {assignments} RETURN NEW; END $$ LANGUAGE plpgsql"
+        )
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_uuid_sync ON {table}")
+        op.execute(
+            f"CREATE TRIGGER {table}_uuid_sync BEFORE INSERT OR UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {table}_uuid_sync()"
+        )
+
+    # Existing rows, in key order, one short transaction per chunk. The chunk's upper bound comes from
+    # the database so its collation decides the order.
+    for table in TABLES:
+        key = BACKFILL_KEYS[table]
+        assignments = ', '.join(f"{column}_uuid = {column}::uuid" for column in key_columns(table))
+        last = None
+        while True:
+            after = f"WHERE {key} > :after " if last is not None else ""
+            bound = bind.execute(sa.text(
+                f"SELECT {key} FROM {table} {after}ORDER BY {key} OFFSET :offset LIMIT 1"
+            ), {"after": last, "offset": CHUNK_SIZE - 1}).scalar()
+            upto = f"{key} <= :bound" if bound is not None else "TRUE"
+            bind.execute(sa.text(
+                f"UPDATE {table} SET {assignments} WHERE {f'{key} > :after AND ' if last is not None else ''}{upto}"
+            ), {"after": last, "bound": bound})
+            if bound is None:
+                break
+            last = bound
+
+    # NOT NULL proven by a validated CHECK, so the swap's SET NOT NULL doesn't scan the table
+    for table, column in KEY_COLUMNS:
+        name = f"{table}_{column}_uuid_not_null"
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} CHECK ({column}_uuid IS NOT NULL) NOT VALID")
+        op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+
+    # A failed CONCURRENTLY build leaves an invalid index behind, so each one is rebuilt from scratch
+    for name, table, columns in INDEXES:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}_uuid")
+        op.execute(f"CREATE INDEX CONCURRENTLY {name}_uuid ON {table} ({shadow_list(table, columns)})")
+    for name, table, kind, columns in CONSTRAINTS:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}_uuid")
+        op.execute(f"CREATE UNIQUE INDEX CONCURRENTLY {name}_uuid ON {table} ({shadow_list(table, columns)})")
+
+
+def swap_postgres_columns():
+    # One short transaction: catalog changes only, nothing is scanned or rewritten. lock_timeout makes
+    # it give up rather than queue every request behind a long-running transaction; rerun it then.
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute(f"LOCK TABLE {', '.join(TABLES)} IN ACCESS EXCLUSIVE MODE")
+    for name, table, column, referred in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER {table}_uuid_sync ON {table}")
+        op.execute(f"DROP FUNCTION {table}_uuid_sync()")
+    for name, table, kind, columns in CONSTRAINTS:
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {name}")
+    for table, column in KEY_COLUMNS:
+        # Also drops the old indexes on the column
+        op.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+        op.execute(f"ALTER TABLE {table} RENAME COLUMN {column}_uuid TO {column}")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {table}_{column}_uuid_not_null")
+    for name, table, columns in INDEXES:
+        op.execute(f"ALTER INDEX {name}_uuid RENAME TO {name}")
+    for name, table, kind, columns in CONSTRAINTS:
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {kind} USING INDEX {name}_uuid")
+    # Checked for existing rows afterwards, without blocking writes
+    for name, table, column, referred in FOREIGN_KEYS:
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {referred} (id) NOT VALID")
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # Online: uuid copies of the key columns are filled by trigger and a chunked backfill, indexed
+        # concurrently, then swapped in with a catalog-only transaction; foreign keys are validated last.
+        # Needs Postgres 12+ (SET NOT NULL backed by a validated CHECK).
+        context = op.get_context()
+        with context.autocommit_block():
+            prepare_postgres_shadow_columns()
+        swap_postgres_columns()
+        with context.autocommit_block():
+            for name, table, column, referred in FOREIGN_KEYS:
+                op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+        return
+
+    for table, column in KEY_COLUMNS + [('jobs_fts_docs', 'job_id')]:
+        if sa.inspect(op.get_bind()).has_table(table):
+            rewrite_sqlite_values(table, column, 'text', lambda value: uuid.UUID(value).bytes)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # Offline: rewrites every key table under an exclusive lock
+        for name, table, column, referred in FOREIGN_KEYS:
+            op.drop_constraint(name, table, type_='foreignkey')
+        for table, column in KEY_COLUMNS:
+            op.alter_column(table, column, type_=sa.String(length=36), existing_type=sa.Uuid(),
+                            postgresql_using=f'{column}::text')
+        for name, table, column, referred in FOREIGN_KEYS:
+            op.create_foreign_key(name, table, referred, [column], ['id'])
+        return
+
+    for table, column in KEY_COLUMNS + [('jobs_fts_docs', 'job_id')]:
+        if sa.inspect(op.get_bind()).has_table(table):
+            rewrite_sqlite_values(table, column, 'blob', lambda value: str(uuid.UUID(bytes=bytes(value))))
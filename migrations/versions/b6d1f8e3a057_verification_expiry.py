@@ -0,0 +1,39 @@
+"""index pending verifications by expiry, backfill legacy expiries
+
+Revision ID: b6d1f8e3a057
+Revises: 9e4b7a1c3d68
+Create Date: 2026-10-17 21:14:09.512731
+
+"""
+import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6d1f8e3a057'
+down_revision = '9e4b7a1c3d68'
+branch_labels = None
+depends_on = None
+
+# Grace period given to verification links sent before expiries were recorded
+LEGACY_TTL = datetime.timedelta(hours=48)
+
+
+def upgrade():
+    users = sa.table('users', sa.column('is_verified', sa.Boolean), sa.column('token_expiration', sa.DateTime))
+    op.execute(
+        users.update()
+        .where(users.c.is_verified.is_(False) | users.c.is_verified.is_(None), users.c.token_expiration.is_(None))
+        .values(token_expiration=datetime.datetime.utcnow() + LEGACY_TTL)
+    )
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_token_expiration', ['token_expiration'], unique=False,
+                              sqlite_where=sa.text('token_expiration IS NOT NULL'),
+                              postgresql_where=sa.text('token_expiration IS NOT NULL'))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_token_expiration')
@@ -0,0 +1,63 @@
+"""archive tables for closed jobs and their applications
+
+Revision ID: c47e2a9f1b85
+Revises: b6d1f8e3a057
+Create Date: 2026-10-17 22:03:51.208417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c47e2a9f1b85'
+down_revision = 'b6d1f8e3a057'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Same key storage as 9e4b7a1c3d68: native uuid on Postgres, 16 bytes elsewhere
+    key = sa.Uuid() if op.get_bind().dialect.name == 'postgresql' else sa.LargeBinary(length=16)
+
+    op.create_table('jobs_archive',
+    sa.Column('id', key, nullable=False),
+    sa.Column('title', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.String(length=2000), nullable=False),
+    sa.Column('location', sa.String(length=255), nullable=True),
+    sa.Column('status', sa.Enum('DRAFT', 'OPEN', 'CLOSED', name='jobstatus', create_type=False), nullable=False),
+    sa.Column('created_by', key, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('jobs_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_jobs_archive_created_by'), ['created_by'], unique=False)
+
+    op.create_table('applications_archive',
+    sa.Column('id', key, nullable=False),
+    sa.Column('applicant_id', key, nullable=False),
+    sa.Column('job_id', key, nullable=False),
+    sa.Column('resume_link', sa.String(length=500), nullable=False),
+    sa.Column('cover_letter', sa.String(length=200), nullable=True),
+    sa.Column('status', sa.Enum('APPLIED', 'REVIEWED', 'INTERVIEW', 'REJECTED', 'HIRED', name='applicationstatus', create_type=False), nullable=False),
+    sa.Column('applied_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('applications_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_applications_archive_applicant_id'), ['applicant_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_applications_archive_job_id'), ['job_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('applications_archive', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_applications_archive_job_id'))
+        batch_op.drop_index(batch_op.f('ix_applications_archive_applicant_id'))
+
+    op.drop_table('applications_archive')
+    with op.batch_alter_table('jobs_archive', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_jobs_archive_created_by'))
+
+    op.drop_table('jobs_archive')
@@ -0,0 +1,55 @@
+"""full-text search index for jobs
+
+Revision ID: d5b2c7e9a413
+Revises: 8a4e6d21f05c
+Create Date: 2026-10-17 11:02:36.904417
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5b2c7e9a413'
+down_revision = '8a4e6d21f05c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute(
+            "CREATE INDEX ix_jobs_search_keyword ON jobs USING gin "
+            "(to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, '')))"
+        )
+        op.execute(
+            "CREATE INDEX ix_jobs_search_location ON jobs USING gin "
+            "(to_tsvector('simple', coalesce(location, '')))"
+        )
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE TABLE jobs_fts_docs ("
+            "doc_id INTEGER PRIMARY KEY, job_id VARCHAR(36) NOT NULL UNIQUE)"
+        )
+        op.execute(
+            "CREATE VIRTUAL TABLE jobs_fts USING fts5("
+            "title, description, location, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        op.execute("INSERT INTO jobs_fts_docs (job_id) SELECT id FROM jobs")
+        op.execute(
+            "INSERT INTO jobs_fts (rowid, title, description, location) "
+            "SELECT d.doc_id, j.title, j.description, coalesce(j.location, '') "
+            "FROM jobs j JOIN jobs_fts_docs d ON d.job_id = j.id"
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX ix_jobs_search_location")
+        op.execute("DROP INDEX ix_jobs_search_keyword")
+    elif dialect == 'sqlite':
+        op.execute("DROP TABLE jobs_fts")
+        op.execute("DROP TABLE jobs_fts_docs")
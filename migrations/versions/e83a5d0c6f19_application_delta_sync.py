@@ -0,0 +1,58 @@
+"""applications.updated_at and tombstones for delta sync
+
+Revision ID: e83a5d0c6f19
+Revises: c47e2a9f1b85
+Create Date: 2026-10-17 22:48:12.390562
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e83a5d0c6f19'
+down_revision = 'c47e2a9f1b85'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    key = sa.Uuid() if op.get_bind().dialect.name == 'postgresql' else sa.LargeBinary(length=16)
+
+    with op.batch_alter_table('applications', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.execute("UPDATE applications SET updated_at = coalesce(applied_at, CURRENT_TIMESTAMP)")
+
+    # (job_id, updated_at) also serves every lookup ix_applications_job_id did
+    with op.batch_alter_table('applications', schema=None) as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.drop_index('ix_applications_job_id')
+        batch_op.create_index('ix_applications_applicant_id_updated_at', ['applicant_id', 'updated_at'], unique=False)
+        batch_op.create_index('ix_applications_job_id_updated_at', ['job_id', 'updated_at'], unique=False)
+
+    op.create_table('application_tombstones',
+    sa.Column('id', key, nullable=False),
+    sa.Column('applicant_id', key, nullable=False),
+    sa.Column('job_id', key, nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('application_tombstones', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_application_tombstones_deleted_at'), ['deleted_at'], unique=False)
+        batch_op.create_index('ix_application_tombstones_applicant_id_deleted_at', ['applicant_id', 'deleted_at'], unique=False)
+        batch_op.create_index('ix_application_tombstones_job_id_deleted_at', ['job_id', 'deleted_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('application_tombstones', schema=None) as batch_op:
+        batch_op.drop_index('ix_application_tombstones_job_id_deleted_at')
+        batch_op.drop_index('ix_application_tombstones_applicant_id_deleted_at')
+        batch_op.drop_index(batch_op.f('ix_application_tombstones_deleted_at'))
+
+    op.drop_table('application_tombstones')
+    with op.batch_alter_table('applications', schema=None) as batch_op:
+        batch_op.drop_index('ix_applications_job_id_updated_at')
+        batch_op.drop_index('ix_applications_applicant_id_updated_at')
+        batch_op.create_index('ix_applications_job_id', ['job_id'], unique=False)
+        batch_op.drop_column('updated_at')
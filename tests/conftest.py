@@ -0,0 +1,47 @@
+import os
+import pytest
+
+# Config reads the environment when app is first imported
+os.environ.setdefault('EMAIL_DISPATCHER', 'worker')
+os.environ.setdefault('RATE_LIMIT_BACKEND', 'none')
+os.environ.setdefault('RESPONSE_CACHE_BACKEND', 'none')
+os.environ.setdefault('JWT_SECRET_KEY', 'test-secret-key-at-least-32-bytes-long')
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from app import Config, create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models import Job  # noqa: E402
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    # create_app() with Config overrides, on a fresh SQLite file with the full schema
+    def make(**config):
+        config.setdefault('SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path}/test.sqlite3")
+        for name, value in config.items():
+            monkeypatch.setattr(Config, name, value, raising=False)
+        app = create_app()
+        app.config['TESTING'] = True
+        with app.app_context():
+            Job.metadata.create_all(db.engine)
+        return app
+    return make
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(app):
+    def headers(user_id, role):
+        with app.app_context():
+            token = create_access_token(identity=user_id, additional_claims={"role": role})
+        return {'Authorization': f'Bearer {token}'}
+    return headers
@@ -0,0 +1,59 @@
+from app.extensions import db
+from app.models import Application, Job, JobApplicationCount, ApplicationStatus
+from benchmarks.seed import seed_dataset
+
+
+def owned_applications(app):
+    data = seed_dataset(app, companies=1, jobs=5, applicants=4, applications=6)
+    with app.app_context():
+        ids = [row.id for row in db.session.query(Application.id).join(Job, Job.id == Application.job_id)]
+    return data["companies"][0], ids
+
+
+def patch(client, headers, updates):
+    response = client.patch('/api/applications/batch', headers=headers, json={"updates": updates})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_id_variants_are_matched(app, client, auth_headers):
+    company, (first, second, third, *_) = owned_applications(app)
+    body = patch(client, auth_headers(company, 'company'), [
+        {"application_id": first.upper(), "status": "Reviewed"},
+        {"application_id": second.replace('-', ''), "status": "Interview"},
+        {"application_id": third, "status": "Rejected"},
+    ])
+
+    assert body["failed"] == 0
+    # Echoed as sent, so clients can match results to their own ids
+    assert [result["application_id"] for result in body["results"]] == [first.upper(), second.replace('-', ''), third]
+    with app.app_context():
+        statuses = dict(db.session.query(Application.id, Application.status).filter(
+            Application.id.in_([first, second, third])
+        ).all())
+    assert statuses == {first: ApplicationStatus.REVIEWED, second: ApplicationStatus.INTERVIEW,
+                        third: ApplicationStatus.REJECTED}
+
+
+def test_variants_of_one_id_are_duplicates(app, client, auth_headers):
+    company, (first, *_) = owned_applications(app)
+    body = patch(client, auth_headers(company, 'company'), [
+        {"application_id": first, "status": "Reviewed"},
+        {"application_id": first.upper(), "status": "Hired"},
+    ])
+
+    assert body["results"][1] == {"application_id": first.upper(), "error": "Duplicate application_id in batch"}
+    with app.app_context():
+        assert db.session.get(Application, first).status == ApplicationStatus.REVIEWED
+        # Counters moved once, for the one update that was applied
+        total = db.session.query(db.func.sum(JobApplicationCount.count)).scalar()
+        assert total == db.session.query(Application).count()
+
+
+def test_malformed_ids_are_not_found(app, client, auth_headers):
+    company, _ = owned_applications(app)
+    body = patch(client, auth_headers(company, 'company'), [
+        {"application_id": "not-a-uuid", "status": "Reviewed"},
+        {"application_id": "0" * 31, "status": "Reviewed"},
+    ])
+    assert [result["error"] for result in body["results"]] == ["Application not found"] * 2
@@ -0,0 +1,45 @@
+import pytest
+from app.cache import RedisBackend, ResponseCache
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+@pytest.fixture
+def workers():
+    # Two processes' caches sharing one Redis
+    server = fakeredis.FakeServer()
+    return [ResponseCache(RedisBackend(fakeredis.FakeRedis(server=server))) for _ in range(2)]
+
+
+def test_entries_are_shared(workers):
+    first, second = workers
+    key = first.key('jobs', {"status": "open"}, tags=['open'])
+    first.set(key, {"jobs": [1, 2]})
+
+    assert second.key('jobs', {"status": "open"}, tags=['open']) == key
+    assert second.get(key) == {"jobs": [1, 2]}
+
+
+def test_invalidation_reaches_other_workers(workers):
+    first, second = workers
+    open_key = first.key('jobs', {"status": "open"}, tags=['open'])
+    closed_key = first.key('jobs', {"status": "closed"}, tags=['closed'])
+    first.set(open_key, {"jobs": [1]})
+    first.set(closed_key, {"jobs": [2]})
+
+    second.invalidate(['open'])
+
+    # A bumped tag version gives a new key everywhere; the old entry is orphaned
+    new_key = first.key('jobs', {"status": "open"}, tags=['open'])
+    assert new_key != open_key
+    assert first.get(new_key) is None
+    assert second.key('jobs', {"status": "open"}, tags=['open']) == new_key
+    # Entries under other tags are untouched
+    assert second.get(second.key('jobs', {"status": "closed"}, tags=['closed'])) == {"jobs": [2]}
+
+
+def test_entries_expire(workers):
+    first, _ = workers
+    key = first.key('jobs', {}, tags=['open'])
+    first.set(key, {"jobs": []}, ttl=5)
+    assert 0 < first.backend.client.ttl(first.backend.prefix + key) <= 5
@@ -0,0 +1,113 @@
+import json
+import time
+import pytest
+from app.events import EventBroker, MemoryBackend, RedisBackend, stream
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def redis_broker(server, history=100):
+    return EventBroker(RedisBackend(fakeredis.FakeRedis(server=server), history=history))
+
+
+def publish(broker, company_id, type, **data):
+    broker.publish(company_id, type, json.dumps(data))
+
+
+def ids(server, company_id):
+    client = fakeredis.FakeRedis(server=server)
+    return [entry_id.decode() for entry_id, _ in client.xrange(f"jobboard:events:{company_id}")]
+
+
+def test_replay_after_last_event_id(server):
+    broker = redis_broker(server)
+    for n in range(3):
+        publish(broker, 'acme', 'application-created', n=n)
+    publish(broker, 'globex', 'application-created', n=9)
+    first, second, third = ids(server, 'acme')
+
+    # Any worker can replay: the history lives in Redis
+    missed = redis_broker(server).backend.replay('acme', first)
+    assert [(event.id, event.type, json.loads(event.data)) for event in missed] == [
+        (second, 'application-created', {"n": 1}),
+        (third, 'application-created', {"n": 2}),
+    ]
+    assert redis_broker(server).backend.replay('acme', third) == []
+
+
+@pytest.mark.parametrize('last_event_id', ['0-1', 'not-an-id', f"{MemoryBackend().prefix}-1"])
+def test_unknown_last_event_id_needs_resync(server, last_event_id):
+    broker = redis_broker(server)
+    publish(broker, 'acme', 'application-created', n=0)
+    assert broker.backend.replay('acme', last_event_id) is None
+
+
+def test_too_far_behind_needs_resync(server):
+    broker = redis_broker(server, history=2)
+    for n in range(5):
+        publish(broker, 'acme', 'application-created', n=n)
+    entries = ids(server, 'acme')
+    # Approximate trimming can keep more than `history`; a partial replay would skip events
+    assert broker.backend.replay('acme', entries[-3]) is not None
+    assert broker.backend.replay('acme', entries[-4]) is None
+    fakeredis.FakeRedis(server=server).xtrim('jobboard:events:acme', maxlen=2, approximate=False)
+    assert broker.backend.replay('acme', entries[-3]) is None
+
+
+def test_stream_resumes_then_follows_live_events(server):
+    publisher, follower = redis_broker(server), redis_broker(server)
+    publish(publisher, 'acme', 'application-created', n=0, job_id='a')
+    publish(publisher, 'acme', 'application-created', n=1, job_id='a')
+    first, second = ids(server, 'acme')
+
+    body = stream(follower, follower.subscribe('acme'), first, heartbeat=0.05)
+    assert next(body) == f'id: {second}\nevent: application-created\ndata: {{"n": 1, "job_id": "a"}}\n\n'
+    assert next(body) == ": connected\n\n"
+
+    # Published by another worker, fanned out through pub/sub once the listener has subscribed
+    client = fakeredis.FakeRedis(server=server)
+    deadline = time.monotonic() + 5
+    while not client.pubsub_numsub('jobboard:events')[0][1] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    publish(publisher, 'acme', 'status-changed', n=2, job_id='a')
+    publish(publisher, 'globex', 'status-changed', n=3, job_id='b')
+    received = next(line for line in body if not line.startswith(':'))
+    assert received.startswith(f"id: {ids(server, 'acme')[2]}\nevent: status-changed\n")
+
+    body.close()
+    assert follower.stats()["streams"] == 0
+
+
+def test_streams_are_capped_per_process():
+    broker = EventBroker(MemoryBackend(), max_streams=2)
+    first = broker.subscribe('acme')
+    assert broker.subscribe('globex') is not None
+    assert broker.subscribe('acme') is None
+    broker.unsubscribe(first)
+    broker.unsubscribe(first)
+    assert broker.subscribe('acme') is not None
+    assert broker.stats() | {"backend": None} == {
+        "backend": None, "streams": 2, "max_streams": 2, "rejected": 1, "published": 0, "dropped": 0,
+    }
+
+
+def test_stream_endpoint_turns_clients_away_at_the_cap(make_app, auth_headers):
+    app = make_app(EVENTS_BACKEND='memory', EVENTS_MAX_STREAMS=1, EVENTS_HEARTBEAT=0.05)
+    client = app.test_client()
+    headers = auth_headers('acme', 'company')
+
+    open_stream = client.get('/api/applications/stream', headers=headers, buffered=False)
+    assert open_stream.status_code == 200
+    refused = client.get('/api/applications/stream', headers=headers)
+    assert refused.status_code == 503
+    # Closing a stream, even one never read from, frees its slot
+    open_stream.close()
+    assert app.extensions['events'].streams == 0
+    again = client.get('/api/applications/stream', headers=headers, buffered=False)
+    assert again.status_code == 200
+    again.close()
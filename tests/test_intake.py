@@ -0,0 +1,96 @@
+import threading
+import pytest
+from app.extensions import db
+from app.models import Application, Job, generate_uuid
+from app.blueprints.applications import intake
+from benchmarks.seed import seed_applicants, seed_companies, seed_jobs
+
+
+@pytest.fixture
+def batch_app(make_app):
+    return make_app(APPLICATION_INTAKE_MODE='batch', APPLICATION_BATCH_WAIT_MS=50, APPLICATION_BATCH_TIMEOUT=0.5)
+
+
+def seed(app, applicants=3, jobs=3):
+    with app.app_context():
+        company = seed_companies(1)[0]
+        return company, seed_applicants(applicants), seed_jobs([company], jobs, draft_ratio=0)
+
+
+def stored_applications(app):
+    with app.app_context():
+        return {(row.applicant_id, row.job_id) for row in db.session.query(Application)}
+
+
+def test_deleted_job_fails_only_its_row(batch_app):
+    company, applicants, jobs = seed(batch_app)
+    gone = generate_uuid()
+    with batch_app.app_context():
+        writer = intake.batcher(batch_app)
+        values = [intake.application_values(applicant, job, 'https://example.com/cv', '')
+                  for applicant, job in [(applicants[0], jobs[0]), (applicants[1], gone), (applicants[2], jobs[1])]]
+        futures = [writer.submit(row, company) for row in values]
+
+    assert futures[0].result(timeout=5) == values[0]['id']
+    with pytest.raises(intake.JobUnavailable):
+        futures[1].result(timeout=5)
+    assert futures[2].result(timeout=5) == values[2]['id']
+    assert stored_applications(batch_app) == {(applicants[0], jobs[0]), (applicants[2], jobs[1])}
+
+
+def test_writer_survives_unexpected_errors(batch_app, monkeypatch):
+    company, applicants, jobs = seed(batch_app)
+    insert_applications = intake.insert_applications
+    calls = []
+
+    def fail_once(rows):
+        calls.append(rows)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return insert_applications(rows)
+
+    monkeypatch.setattr(intake, 'insert_applications', fail_once)
+    with batch_app.test_request_context():
+        with pytest.raises(intake.IntakeUnavailable):
+            intake.submit(applicants[0], (jobs[0], company), 'https://example.com/cv', '')
+        assert intake.submit(applicants[0], (jobs[0], company), 'https://example.com/cv', '') is not None
+
+
+def test_timed_out_request_is_not_written(batch_app, monkeypatch):
+    company, applicants, jobs = seed(batch_app)
+    insert_applications = intake.insert_applications
+    writing, release = threading.Event(), threading.Event()
+
+    def blocked(rows):
+        writing.set()
+        release.wait(5)
+        return insert_applications(rows)
+
+    monkeypatch.setattr(intake, 'insert_applications', blocked)
+    with batch_app.app_context():
+        first = intake.batcher(batch_app).submit(
+            intake.application_values(applicants[0], jobs[0], 'https://example.com/cv', ''), company)
+    assert writing.wait(5)
+    with batch_app.test_request_context():
+        # Queued behind the blocked batch until submit() gives up and withdraws it
+        with pytest.raises(intake.IntakeUnavailable):
+            intake.submit(applicants[1], (jobs[1], company), 'https://example.com/cv', '')
+    release.set()
+    first.result(timeout=5)
+
+    with batch_app.test_request_context():
+        assert intake.submit(applicants[2], (jobs[2], company), 'https://example.com/cv', '') is not None
+    assert stored_applications(batch_app) == {(applicants[0], jobs[0]), (applicants[2], jobs[2])}
+
+
+def test_job_deleted_after_cached(app, client, auth_headers):
+    company, applicants, jobs = seed(app, applicants=1, jobs=1)
+    with app.test_request_context():
+        assert intake.open_job(jobs[0]) is not None
+        db.session.query(Job).filter(Job.id == jobs[0]).delete()
+        db.session.commit()
+
+    response = client.post('/api/applications', headers=auth_headers(applicants[0], 'applicant'),
+                           json={'job_id': jobs[0], 'resume_link': 'https://example.com/cv'})
+    assert response.status_code == 404
+    assert stored_applications(app) == set()
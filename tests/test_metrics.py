@@ -0,0 +1,26 @@
+import re
+from app.query_counter import count_queries
+from benchmarks.seed import seed_dataset
+
+
+def series(body, name, endpoint):
+    match = re.search(rf'^{name}{{endpoint="{endpoint}",method="GET",status="200"}} (\S+)$', body, re.M)
+    return float(match.group(1))
+
+
+def test_sql_figures_come_from_the_query_counter(make_app):
+    app = make_app(METRICS_ENABLED=True, INTERNAL_ENDPOINTS_ENABLED=True)
+    seed_dataset(app, companies=1, jobs=30, applicants=1, applications=5)
+    client = app.test_client()
+
+    for _ in range(3):
+        with count_queries() as queries:
+            assert client.get('/api/jobs').status_code == 200
+        assert queries.count == 2
+        assert queries.seconds > 0
+
+    body = client.get('/internal/metrics').get_data(as_text=True)
+    assert series(body, 'sql_statements_total', 'jobs.list_jobs') == 6
+    assert series(body, 'sql_duration_seconds_total', 'jobs.list_jobs') > 0
+    assert series(body, 'http_request_duration_seconds_count', 'jobs.list_jobs') == 3
+
@@ -0,0 +1,132 @@
+import datetime
+import socket
+import threading
+import pytest
+from app.extensions import db
+from app.models import EmailOutbox, EmailStatus
+from app import outbox
+
+Controller = pytest.importorskip('aiosmtpd.controller').Controller
+
+
+class Recorder:
+    # Accepts every recipient except those starting with "refused", and keeps what arrives
+    def __init__(self):
+        self.messages = []
+        self.lock = threading.Lock()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith('refused'):
+            return '550 No such user'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        with self.lock:
+            self.messages.append((envelope.rcpt_tos[0], envelope.content.decode()))
+        return '250 Message accepted'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp():
+    recorder = Recorder()
+    controller = Controller(recorder, hostname='127.0.0.1', port=free_port())
+    controller.start()
+    yield controller, recorder
+    controller.stop()
+
+
+@pytest.fixture
+def outbox_app(make_app, smtp):
+    controller, _ = smtp
+    # TESTING would otherwise make Flask-Mail drop every message
+    return make_app(MAIL_SERVER=controller.hostname, MAIL_PORT=controller.port, MAIL_USE_TLS=False,
+                    MAIL_SUPPRESS_SEND=False, MAIL_DEFAULT_SENDER='jobs@example.com',
+                    EMAIL_MAX_ATTEMPTS=3, EMAIL_RETRY_BASE_SECONDS=30)
+
+
+def enqueue(app, *recipients):
+    with app.app_context():
+        emails = [outbox.enqueue_email(recipient, 'Verify your email', f'Hello {recipient}') for recipient in recipients]
+        db.session.commit()
+        return [email.id for email in emails]
+
+
+def test_dispatch_delivers_and_marks_sent(outbox_app, smtp):
+    _, recorder = smtp
+    [email_id] = enqueue(outbox_app, 'ada@example.com')
+
+    with outbox_app.app_context():
+        assert outbox.dispatch_batch() == 1
+        email = db.session.get(EmailOutbox, email_id)
+        assert email.status == EmailStatus.SENT
+        assert email.attempts == 1
+        assert email.sent_at is not None
+        stats = outbox.queue_stats()
+
+    assert [recipient for recipient, _ in recorder.messages] == ['ada@example.com']
+    assert 'Hello ada@example.com' in recorder.messages[0][1]
+    assert stats['sent'] == 1
+    assert stats['queue_depth'] == 0
+    assert stats['queued_ms_p50'] is not None
+
+
+def test_refused_recipient_backs_off_then_fails(outbox_app, smtp):
+    _, recorder = smtp
+    [email_id] = enqueue(outbox_app, 'refused@example.com')
+
+    with outbox_app.app_context():
+        for attempt, delay in [(1, 30), (2, 60)]:
+            before = datetime.datetime.utcnow()
+            assert outbox.dispatch_batch() == 0
+            email = db.session.get(EmailOutbox, email_id)
+            assert (email.status, email.attempts) == (EmailStatus.PENDING, attempt)
+            assert '550' in email.last_error
+            assert email.next_attempt_at >= before + datetime.timedelta(seconds=delay)
+            # Not due yet: nothing is claimed
+            assert outbox.dispatch_batch() == 0
+            assert db.session.get(EmailOutbox, email_id).attempts == attempt
+            email.next_attempt_at = before
+            db.session.commit()
+
+        assert outbox.dispatch_batch() == 0
+        email = db.session.get(EmailOutbox, email_id)
+        assert (email.status, email.attempts) == (EmailStatus.FAILED, 3)
+        assert outbox.queue_stats()['failed'] == 1
+    assert recorder.messages == []
+
+
+def test_concurrent_dispatchers_claim_disjoint_rows(outbox_app, smtp):
+    _, recorder = smtp
+    recipients = [f'user{i}@example.com' for i in range(40)]
+    enqueue(outbox_app, *recipients)
+    start = threading.Barrier(2)
+    errors = []
+
+    def dispatcher():
+        with outbox_app.app_context():
+            start.wait()
+            try:
+                while outbox.dispatch_batch(batch_size=5):
+                    pass
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=dispatcher) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(recipient for recipient, _ in recorder.messages) == sorted(recipients)
+    with outbox_app.app_context():
+        assert db.session.query(EmailOutbox).filter(EmailOutbox.status != EmailStatus.SENT).count() == 0
@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import func
+from app.extensions import db
+from app.models import Application, Job
+from app.query_counter import count_queries
+from benchmarks.seed import seed_dataset
+
+
+@pytest.fixture(params=[1, 10], ids=['small', 'large'])
+def dataset(request, app):
+    # Counts must not grow with the number of rows returned
+    scale = request.param
+    seed_dataset(app, companies=2, jobs=10 * scale, applicants=3, applications=20 * scale)
+    with app.app_context():
+        applicant, applied = db.session.query(Application.applicant_id, func.count()).group_by(
+            Application.applicant_id
+        ).order_by(func.count().desc()).first()
+        job_id, company, received = db.session.query(Application.job_id, Job.created_by, func.count()).join(
+            Job, Job.id == Application.job_id
+        ).group_by(Application.job_id, Job.created_by).order_by(func.count().desc()).first()
+    return {"applicant": applicant, "applied": applied, "job_id": job_id, "company": company, "received": received}
+
+
+def statements(client, url, headers=None):
+    with count_queries() as queries:
+        response = client.get(url, headers=headers or {})
+    assert response.status_code == 200
+    return queries.count, response.get_json()
+
+
+def test_my_applications(client, auth_headers, dataset):
+    count, body = statements(client, '/api/applications/me', auth_headers(dataset["applicant"], 'applicant'))
+    assert len(body) == dataset["applied"]
+    # Live and archived applications, each joined to its job title
+    assert count == 2
+
+
+def test_job_applications(client, auth_headers, dataset):
+    count, body = statements(client, f'/api/applications/job/{dataset["job_id"]}',
+                             auth_headers(dataset["company"], 'company'))
+    assert len(body) == dataset["received"]
+    # Ownership check, then applications joined to their applicants
+    assert count == 2
+
+
+def test_list_jobs(client, dataset):
+    count, body = statements(client, '/api/jobs?limit=50')
+    assert body["jobs"]
+    # ETag fingerprint, then one page
+    assert count == 2
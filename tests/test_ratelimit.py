@@ -0,0 +1,62 @@
+import pytest
+from app.ratelimit import MemoryStore, RateLimiter, RedisStore
+
+fakeredis = pytest.importorskip('fakeredis')
+pytest.importorskip('lupa')  # fakeredis runs Lua scripts through it
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def redis_store(server):
+    return RedisStore(fakeredis.FakeRedis(server=server))
+
+
+def tokens(server, key):
+    level = fakeredis.FakeRedis(server=server).hget('jobboard:ratelimit:' + key, 'tokens')
+    return float(level) if level is not None else None
+
+
+def test_takes_from_every_bucket(server):
+    store = redis_store(server)
+    assert store.acquire([('ip', 3, 1.0), ('id', 5, 1.0)]) == 0
+    assert tokens(server, 'ip') == pytest.approx(2, abs=0.01)
+    assert tokens(server, 'id') == pytest.approx(4, abs=0.01)
+
+
+def test_takes_nothing_when_one_bucket_is_empty(server):
+    store = redis_store(server)
+    assert store.acquire([('ip', 1, 0.1), ('id', 5, 1.0)]) == 0
+
+    # The per-IP bucket is empty: refused, and the identity keeps its tokens
+    wait = store.acquire([('ip', 1, 0.1), ('id', 5, 1.0)])
+    assert 9 < wait <= 10
+    assert tokens(server, 'id') == pytest.approx(4, abs=0.01)
+
+    # The same identity from another address still gets through
+    assert store.acquire([('other-ip', 1, 0.1), ('id', 5, 1.0)]) == 0
+    assert tokens(server, 'id') == pytest.approx(3, abs=0.01)
+
+
+def test_buckets_are_shared_and_expire(server):
+    first, second = redis_store(server), redis_store(server)
+    assert first.acquire([('id', 2, 1.0)]) == 0
+    assert second.acquire([('id', 2, 1.0)]) == 0
+    assert first.acquire([('id', 2, 1.0)]) > 0
+    # Gone once the bucket would be full again
+    assert 0 < fakeredis.FakeRedis(server=server).pttl('jobboard:ratelimit:id') <= 2000
+
+
+@pytest.mark.parametrize('make_store', [lambda server: MemoryStore(), redis_store], ids=['memory', 'redis'])
+def test_flood_from_one_address_does_not_lock_out_the_identity(app, server, make_store):
+    limiter = RateLimiter(make_store(server), {'login': ('2/minute', '5/minute')})
+    with app.test_request_context(environ_base={'REMOTE_ADDR': '10.0.0.1'}):
+        assert [limiter.check('login', 'ada@example.com') == 0 for _ in range(10)] == [True] * 2 + [False] * 8
+    # 2 of the identity's 5 tokens were taken; the 8 refused attempts took none
+    with app.test_request_context(environ_base={'REMOTE_ADDR': '10.0.0.2'}):
+        assert [limiter.check('login', 'ada@example.com') == 0 for _ in range(3)] == [True, True, False]
+    with app.test_request_context(environ_base={'REMOTE_ADDR': '10.0.0.3'}):
+        assert [limiter.check('login', 'ada@example.com') == 0 for _ in range(2)] == [True, False]
+    assert limiter.limited == 10